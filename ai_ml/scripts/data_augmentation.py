@@ -6,11 +6,12 @@
 import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
-from influxdb_client import InfluxDBClient, Point
+from influxdb_client import Point
 from influxdb_client.client.write_api import SYNCHRONOUS
 import time
 import json
 import os
+import sys
 
 # InfluxDB 설정
 INFLUXDB_URL = 'http://localhost:8090'
@@ -35,6 +36,11 @@ WAVE_PROBABILITY = 0.3  # 각 시간대에 파동이 발생할 확률 (30%)
 # 진행률 파일 경로
 PROGRESS_FILE = os.path.join(os.path.dirname(__file__), '..', 'data', 'augment_progress.json')
 
+# 백엔드와 같은 InfluxDB 클라이언트 팩토리/Flux 결과 리더 사용
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'backend'))
+from flux_reader import query_columns  # noqa: E402
+from influx_client import get_client  # noqa: E402
+
 def save_progress(stage, progress, message=""):
     """진행률 저장"""
     try:
@@ -51,8 +57,15 @@ def save_progress(stage, progress, message=""):
         print(f"⚠️ 진행률 저장 실패: {e}")
 
 def get_influx_client():
-    """InfluxDB 클라이언트 생성"""
-    return InfluxDBClient(url=INFLUXDB_URL, token=INFLUXDB_TOKEN, org=INFLUXDB_ORG)
+    """InfluxDB 클라이언트 (백엔드와 같은 팩토리: 연결 재사용, gzip, 타임아웃)"""
+    return get_client(INFLUXDB_URL, INFLUXDB_TOKEN, INFLUXDB_ORG, workers=1)
+
+def query_values(query_api, query):
+    """Flux 조회 결과를 (시각, 값) 목록으로 (값이 없는 행 제외, 시각은 UTC Timestamp)"""
+    result = query_columns(query_api, INFLUXDB_ORG, query, ('_time', '_value'))
+    valid = ~np.isnan(result['_value'])
+    times = pd.to_datetime(result['_time'][valid], utc=True)
+    return list(zip(times, result['_value'][valid].tolist()))
 
 def create_bucket_if_not_exists(client, bucket_name):
     """버킷이 없으면 생성"""
@@ -148,27 +161,22 @@ def copy_bucket_data(source_bucket, target_bucket, measurement, field_name, clie
       |> sort(columns: ["_time"])
     '''
     
-    result = query_api.query(org=INFLUXDB_ORG, query=query)
+    result = query_values(query_api, query)
     
     points = []
     count = 0
     
-    for table in result:
-        for record in table.records:
-            timestamp = record.get_time()
-            value = record.get_value()
-            
-            if value is not None:
-                point = Point(measurement) \
-                    .field(field_name, float(value)) \
-                    .time(timestamp)
-                points.append(point)
-                count += 1
-                
-                # 배치로 저장 (1000개씩)
-                if len(points) >= 1000:
-                    write_api.write(bucket=target_bucket, record=points)
-                    points = []
+    for timestamp, value in result:
+        point = Point(measurement) \
+            .field(field_name, float(value)) \
+            .time(timestamp)
+        points.append(point)
+        count += 1
+
+        # 배치로 저장 (1000개씩)
+        if len(points) >= 1000:
+            write_api.write(bucket=target_bucket, record=points)
+            points = []
     
     # 남은 데이터 저장
     if points:
@@ -195,19 +203,15 @@ def augment_temperature_data(bucket, client):
       |> sort(columns: ["_time"])
     '''
     
-    result = query_api.query(org=INFLUXDB_ORG, query=query)
+    result = query_values(query_api, query)
     
     # 데이터를 리스트로 수집
     data_points = []
-    for table in result:
-        for record in table.records:
-            timestamp = record.get_time()
-            value = record.get_value()
-            if value is not None:
-                data_points.append({
-                    'time': timestamp,
-                    'value': float(value)
-                })
+    for timestamp, value in result:
+        data_points.append({
+            'time': timestamp,
+            'value': float(value)
+        })
     
     print(f"📊 {len(data_points)}개 데이터 포인트 처리 중...")
     
@@ -314,16 +318,12 @@ def augment_vibration_data(bucket, client, temperature_bucket):
       |> sort(columns: ["_time"])
     '''
     
-    temp_result = query_api.query(org=INFLUXDB_ORG, query=temp_query)
+    temp_result = query_values(query_api, temp_query)
     
     # 온도 데이터를 딕셔너리로 저장 (타임스탬프 기준)
     temp_data = {}
-    for table in temp_result:
-        for record in table.records:
-            timestamp = record.get_time()
-            value = record.get_value()
-            if value is not None:
-                temp_data[timestamp] = float(value)
+    for timestamp, value in temp_result:
+        temp_data[timestamp] = float(value)
     
     # 진동 데이터 조회
     vib_start_time = (datetime.utcnow() - timedelta(days=7)).strftime('%Y-%m-%dT%H:%M:%SZ')
@@ -342,7 +342,7 @@ def augment_vibration_data(bucket, client, temperature_bucket):
           |> sort(columns: ["_time"])
         '''
         
-        result = query_api.query(org=INFLUXDB_ORG, query=query)
+        result = query_values(query_api, query)
         
         points_to_write = []
         last_wave_start = None
@@ -351,24 +351,28 @@ def augment_vibration_data(bucket, client, temperature_bucket):
         current_wave_duration = None
         next_wave_interval = None
         
-        for table in result:
-            for record in table.records:
-                timestamp = record.get_time()
-                value = record.get_value()
-                
-                if value is None:
-                    continue
-                
-                # 타임스탬프를 datetime으로 변환
-                if hasattr(timestamp, 'timestamp'):
-                    dt = datetime.fromtimestamp(timestamp.timestamp())
-                else:
-                    dt = timestamp
-                
-                # 큰 파동 시작 시간 확인 (랜덤 간격, 온도와 동기화)
-                start_new_wave = False
-                if last_wave_start is None:
-                    # 첫 파동: 랜덤 확률로 시작
+        for timestamp, value in result:
+            # 타임스탬프를 datetime으로 변환
+            if hasattr(timestamp, 'timestamp'):
+                dt = datetime.fromtimestamp(timestamp.timestamp())
+            else:
+                dt = timestamp
+
+            # 큰 파동 시작 시간 확인 (랜덤 간격, 온도와 동기화)
+            start_new_wave = False
+            if last_wave_start is None:
+                # 첫 파동: 랜덤 확률로 시작
+                if np.random.random() < WAVE_PROBABILITY:
+                    start_new_wave = True
+                    last_wave_start = dt
+                    current_wave_amplitude = np.random.uniform(*WAVE_VIB_AMPLITUDE)
+                    current_wave_direction = 1 if np.random.random() < 0.5 else -1
+                    current_wave_duration = timedelta(minutes=np.random.uniform(WAVE_DURATION_MINUTES_MIN, WAVE_DURATION_MINUTES_MAX))
+                    next_wave_interval = timedelta(hours=np.random.uniform(WAVE_INTERVAL_HOURS_MIN, WAVE_INTERVAL_HOURS_MAX))
+            else:
+                time_since_last_wave = dt - last_wave_start
+                # 다음 파동 간격이 지났고, 랜덤 확률로 새 파동 시작
+                if time_since_last_wave >= next_wave_interval:
                     if np.random.random() < WAVE_PROBABILITY:
                         start_new_wave = True
                         last_wave_start = dt
@@ -376,58 +380,47 @@ def augment_vibration_data(bucket, client, temperature_bucket):
                         current_wave_direction = 1 if np.random.random() < 0.5 else -1
                         current_wave_duration = timedelta(minutes=np.random.uniform(WAVE_DURATION_MINUTES_MIN, WAVE_DURATION_MINUTES_MAX))
                         next_wave_interval = timedelta(hours=np.random.uniform(WAVE_INTERVAL_HOURS_MIN, WAVE_INTERVAL_HOURS_MAX))
+
+            # 파동 효과 계산
+            wave_effect = 0.0
+            if last_wave_start is not None:
+                time_in_wave = dt - last_wave_start
+
+                if time_in_wave < current_wave_duration:
+                    # 파동 진행도 (0 ~ 1)
+                    progress = time_in_wave.total_seconds() / current_wave_duration.total_seconds()
+                    # 사인파 패턴으로 부드러운 파동 생성
+                    # 약간의 랜덤성을 추가하여 완전히 규칙적이지 않게
+                    noise_factor = np.random.uniform(0.9, 1.1)  # 파동 크기에 약간의 변동
+                    wave_effect = current_wave_amplitude * current_wave_direction * np.sin(np.pi * progress) * noise_factor
                 else:
-                    time_since_last_wave = dt - last_wave_start
-                    # 다음 파동 간격이 지났고, 랜덤 확률로 새 파동 시작
-                    if time_since_last_wave >= next_wave_interval:
-                        if np.random.random() < WAVE_PROBABILITY:
-                            start_new_wave = True
-                            last_wave_start = dt
-                            current_wave_amplitude = np.random.uniform(*WAVE_VIB_AMPLITUDE)
-                            current_wave_direction = 1 if np.random.random() < 0.5 else -1
-                            current_wave_duration = timedelta(minutes=np.random.uniform(WAVE_DURATION_MINUTES_MIN, WAVE_DURATION_MINUTES_MAX))
-                            next_wave_interval = timedelta(hours=np.random.uniform(WAVE_INTERVAL_HOURS_MIN, WAVE_INTERVAL_HOURS_MAX))
-                
-                # 파동 효과 계산
-                wave_effect = 0.0
-                if last_wave_start is not None:
-                    time_in_wave = dt - last_wave_start
-                    
-                    if time_in_wave < current_wave_duration:
-                        # 파동 진행도 (0 ~ 1)
-                        progress = time_in_wave.total_seconds() / current_wave_duration.total_seconds()
-                        # 사인파 패턴으로 부드러운 파동 생성
-                        # 약간의 랜덤성을 추가하여 완전히 규칙적이지 않게
-                        noise_factor = np.random.uniform(0.9, 1.1)  # 파동 크기에 약간의 변동
-                        wave_effect = current_wave_amplitude * current_wave_direction * np.sin(np.pi * progress) * noise_factor
-                    else:
-                        wave_effect = 0.0
-                
-                # 증강 적용
-                if field in ['v_rms', 'a_peak', 'a_rms', 'crest']:
-                    # 작은 노이즈 추가
-                    noise = np.random.normal(0, SMALL_NOISE_VIB)
-                    # 최종 증강 값 (파동 + 노이즈)
-                    augmented_value = float(value) + wave_effect + noise
+                    wave_effect = 0.0
+
+            # 증강 적용
+            if field in ['v_rms', 'a_peak', 'a_rms', 'crest']:
+                # 작은 노이즈 추가
+                noise = np.random.normal(0, SMALL_NOISE_VIB)
+                # 최종 증강 값 (파동 + 노이즈)
+                augmented_value = float(value) + wave_effect + noise
+            else:
+                # temperature 필드는 온도 버킷에서 가져온 값 사용
+                if timestamp in temp_data:
+                    augmented_value = temp_data[timestamp]
                 else:
-                    # temperature 필드는 온도 버킷에서 가져온 값 사용
-                    if timestamp in temp_data:
-                        augmented_value = temp_data[timestamp]
-                    else:
-                        augmented_value = float(value)
-                
-                # 포인트 생성
-                point = Point("vibration") \
-                    .tag("sensor_type", "VVB001") \
-                    .field(field, float(augmented_value)) \
-                    .time(timestamp)
-                
-                points_to_write.append(point)
-                
-                # 배치로 저장
-                if len(points_to_write) >= 1000:
-                    write_api.write(bucket=bucket, record=points_to_write)
-                    points_to_write = []
+                    augmented_value = float(value)
+
+            # 포인트 생성
+            point = Point("vibration") \
+                .tag("sensor_type", "VVB001") \
+                .field(field, float(augmented_value)) \
+                .time(timestamp)
+
+            points_to_write.append(point)
+
+            # 배치로 저장
+            if len(points_to_write) >= 1000:
+                write_api.write(bucket=bucket, record=points_to_write)
+                points_to_write = []
         
         # 남은 데이터 저장
         if points_to_write:
@@ -484,25 +477,21 @@ def main():
             '''
             
             try:
-                result = query_api.query(org=INFLUXDB_ORG, query=query)
+                result = query_values(query_api, query)
                 points = []
                 field_count = 0
                 
-                for table in result:
-                    for record in table.records:
-                        timestamp = record.get_time()
-                        value = record.get_value()
-                        if value is not None:
-                            point = Point("vibration") \
-                                .tag("sensor_type", "VVB001") \
-                                .field(field, float(value)) \
-                                .time(timestamp)
-                            points.append(point)
-                            field_count += 1
-                            
-                            if len(points) >= 1000:
-                                write_api.write(bucket=INFLUXDB_BUCKET_AUGMENTED_VIB, record=points)
-                                points = []
+                for timestamp, value in result:
+                    point = Point("vibration") \
+                        .tag("sensor_type", "VVB001") \
+                        .field(field, float(value)) \
+                        .time(timestamp)
+                    points.append(point)
+                    field_count += 1
+
+                    if len(points) >= 1000:
+                        write_api.write(bucket=INFLUXDB_BUCKET_AUGMENTED_VIB, record=points)
+                        points = []
                 
                 if points:
                     write_api.write(bucket=INFLUXDB_BUCKET_AUGMENTED_VIB, record=points)
@@ -6,11 +6,16 @@ AI 예측 스크립트 (PyTorch)
 import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
-from influxdb_client import InfluxDBClient
 import torch
 import torch.nn as nn
 import pickle
 import os
+import sys
+
+# 백엔드와 같은 InfluxDB 클라이언트 팩토리/Flux 결과 리더 사용
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'backend'))
+from flux_reader import query_columns  # noqa: E402
+from influx_client import get_client  # noqa: E402
 
 # InfluxDB 설정
 INFLUXDB_URL = 'http://localhost:8090'
@@ -59,8 +64,8 @@ def setup_device():
     return device
 
 def get_influx_client():
-    """InfluxDB 클라이언트 생성"""
-    return InfluxDBClient(url=INFLUXDB_URL, token=INFLUXDB_TOKEN, org=INFLUXDB_ORG)
+    """InfluxDB 클라이언트 (백엔드와 같은 팩토리: 연결 재사용, gzip, 타임아웃)"""
+    return get_client(INFLUXDB_URL, INFLUXDB_TOKEN, INFLUXDB_ORG, workers=1)
 
 def load_model():
     """학습된 모델과 스케일러 로드 (PyTorch)"""
@@ -131,7 +136,7 @@ def get_recent_data(client, minutes=60):
     import sys
     temp_result = None
     try:
-        temp_result = query_api.query(org=INFLUXDB_ORG, query=temp_query)
+        temp_result = query_columns(query_api, INFLUXDB_ORG, temp_query, ('_time', '_value'))
     except Exception as e:
         # 증강 데이터가 없으면 원본 데이터로 fallback
         print(f"⚠️ {INFLUXDB_BUCKET_TEMP} 버킷 쿼리 실패, 원본 데이터로 시도: {e}", file=sys.stderr)
@@ -143,7 +148,7 @@ def get_recent_data(client, minutes=60):
           |> sort(columns: ["_time"])
         '''
         try:
-            temp_result = query_api.query(org=INFLUXDB_ORG, query=temp_query_fallback)
+            temp_result = query_columns(query_api, INFLUXDB_ORG, temp_query_fallback, ('_time', '_value'))
         except Exception as e2:
             print(f"⚠️ 원본 데이터 쿼리도 실패: {e2}", file=sys.stderr)
             temp_result = None
@@ -151,7 +156,7 @@ def get_recent_data(client, minutes=60):
     # 진동 데이터 쿼리 (증강 데이터 우선)
     vib_result = None
     try:
-        vib_result = query_api.query(org=INFLUXDB_ORG, query=vib_query)
+        vib_result = query_columns(query_api, INFLUXDB_ORG, vib_query, ('_time', '_value'))
     except Exception as e:
         # 증강 데이터가 없으면 원본 데이터로 fallback
         print(f"⚠️ {INFLUXDB_BUCKET_VIB} 버킷 쿼리 실패, 원본 데이터로 시도: {e}", file=sys.stderr)
@@ -163,7 +168,7 @@ def get_recent_data(client, minutes=60):
           |> sort(columns: ["_time"])
         '''
         try:
-            vib_result = query_api.query(org=INFLUXDB_ORG, query=vib_query_fallback1)
+            vib_result = query_columns(query_api, INFLUXDB_ORG, vib_query_fallback1, ('_time', '_value'))
         except Exception as e2:
             # 마지막 fallback: temperature_data 버킷에서 진동 데이터 찾기
             print(f"⚠️ {INFLUXDB_BUCKET_VIB_FALLBACK} 버킷도 실패, temperature_data에서 시도: {e2}", file=sys.stderr)
@@ -175,43 +180,29 @@ def get_recent_data(client, minutes=60):
               |> sort(columns: ["_time"])
             '''
             try:
-                vib_result = query_api.query(org=INFLUXDB_ORG, query=vib_query_fallback2)
+                vib_result = query_columns(query_api, INFLUXDB_ORG, vib_query_fallback2, ('_time', '_value'))
             except Exception as e3:
                 print(f"⚠️ 모든 진동 데이터 쿼리 실패: {e3}", file=sys.stderr)
                 vib_result = None
     
-    temp_data = []
-    if temp_result:
-        for table in temp_result:
-            for record in table.records:
-                timestamp = record.get_time()
-                value = record.get_value()
-                if value is not None:
-                    temp_data.append({'time': timestamp, 'temperature': float(value)})
-    
-    vib_data = []
-    if vib_result:
-        for table in vib_result:
-            for record in table.records:
-                timestamp = record.get_time()
-                value = record.get_value()
-                if value is not None:
-                    vib_data.append({'time': timestamp, 'vibration_crest': float(value)})
+    temp_df = pd.DataFrame()
+    if temp_result is not None:
+        temp_df = pd.DataFrame({
+            'time': pd.to_datetime(temp_result['_time'], utc=True),
+            'temperature': temp_result['_value']
+        }).dropna(subset=['temperature'])
+    
+    vib_df = pd.DataFrame()
+    if vib_result is not None:
+        vib_df = pd.DataFrame({
+            'time': pd.to_datetime(vib_result['_time'], utc=True),
+            'vibration_crest': vib_result['_value']
+        }).dropna(subset=['vibration_crest'])
     
     # 데이터 병합 (타임스탬프가 정확히 일치하지 않을 수 있으므로 가장 가까운 값으로 매칭)
-    if not temp_data or not vib_data:
+    if temp_df.empty or vib_df.empty:
         return pd.DataFrame(columns=['time', 'temperature', 'vibration_crest'])
     
-    # DataFrame으로 변환하여 merge_asof 사용
-    temp_df = pd.DataFrame(temp_data)
-    vib_df = pd.DataFrame(vib_data)
-    
-    # time 컬럼을 datetime으로 변환
-    if not pd.api.types.is_datetime64_any_dtype(temp_df['time']):
-        temp_df['time'] = pd.to_datetime(temp_df['time'])
-    if not pd.api.types.is_datetime64_any_dtype(vib_df['time']):
-        vib_df['time'] = pd.to_datetime(vib_df['time'])
-    
     # time을 인덱스로 설정
     temp_df = temp_df.set_index('time').sort_index()
     vib_df = vib_df.set_index('time').sort_index()
@@ -6,7 +6,6 @@ AI 모델 학습 스크립트 (PyTorch)
 import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
-from influxdb_client import InfluxDBClient
 from sklearn.preprocessing import MinMaxScaler
 from sklearn.model_selection import train_test_split
 import torch
@@ -17,11 +16,17 @@ import os
 import pickle
 import json
 import time
+import sys
 try:
     import psutil
 except ImportError:
     psutil = None
 
+# 백엔드와 같은 InfluxDB 클라이언트 팩토리/Flux 결과 리더 사용
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'backend'))
+from flux_reader import query_columns  # noqa: E402
+from influx_client import get_client  # noqa: E402
+
 # InfluxDB 설정
 INFLUXDB_URL = 'http://localhost:8090'
 INFLUXDB_TOKEN = 'my-super-secret-auth-token'
@@ -55,8 +60,8 @@ def save_progress(stage, progress, message="", estimated_time=None):
         json.dump(progress_data, f)
 
 def get_influx_client():
-    """InfluxDB 클라이언트 생성"""
-    return InfluxDBClient(url=INFLUXDB_URL, token=INFLUXDB_TOKEN, org=INFLUXDB_ORG)
+    """InfluxDB 클라이언트 (백엔드와 같은 팩토리: 연결 재사용, gzip, 타임아웃)"""
+    return get_client(INFLUXDB_URL, INFLUXDB_TOKEN, INFLUXDB_ORG, workers=1)
 
 def load_data_from_influxdb(client, days=7):
     """InfluxDB에서 증강 데이터 로드"""
@@ -88,89 +93,61 @@ def load_data_from_influxdb(client, days=7):
     # 온도 데이터 수집
     print(f"🔍 온도 데이터 쿼리 실행 중... (버킷: {INFLUXDB_BUCKET_TEMP})")
     try:
-        temp_result = query_api.query(org=INFLUXDB_ORG, query=temp_query)
-        temp_data = []
-        table_count = 0
-        record_count = 0
-        
-        for table in temp_result:
-            table_count += 1
-            for record in table.records:
-                record_count += 1
-                timestamp = record.get_time()
-                value = record.get_value()
-                if value is not None:
-                    temp_data.append({
-                        'time': timestamp,
-                        'temperature': float(value)
-                    })
-        
-        print(f"📊 온도 쿼리 결과: 테이블 {table_count}개, 레코드 {record_count}개, 유효 데이터 {len(temp_data)}개")
+        temp_result = query_columns(query_api, INFLUXDB_ORG, temp_query, ('_time', '_value'))
+        record_count = len(temp_result['_time'])
+        temp_df = pd.DataFrame({
+            'time': pd.to_datetime(temp_result['_time'], utc=True),
+            'temperature': temp_result['_value']
+        }).dropna(subset=['temperature'])
+        
+        print(f"📊 온도 쿼리 결과: 레코드 {record_count}개, 유효 데이터 {len(temp_df)}개")
     except Exception as e:
         print(f"❌ 온도 데이터 쿼리 오류: {e}")
-        temp_data = []
+        temp_df = pd.DataFrame(columns=['time', 'temperature'])
     
     # 진동 데이터 수집
     print(f"🔍 진동 데이터 쿼리 실행 중... (버킷: {INFLUXDB_BUCKET_VIB})")
     try:
-        vib_result = query_api.query(org=INFLUXDB_ORG, query=vib_query)
-        vib_data = {}
-        table_count = 0
-        record_count = 0
-        
-        for table in vib_result:
-            table_count += 1
-            for record in table.records:
-                record_count += 1
-                timestamp = record.get_time()
-                field = record.get_field()
-                value = record.get_value()
-                
-                if value is not None:
-                    if timestamp not in vib_data:
-                        vib_data[timestamp] = {}
-                    vib_data[timestamp][field] = float(value)
-        
-        print(f"📊 진동 쿼리 결과: 테이블 {table_count}개, 레코드 {record_count}개, 타임스탬프 {len(vib_data)}개")
+        vib_result = query_columns(query_api, INFLUXDB_ORG, vib_query, ('_time', '_field', '_value'))
+        record_count = len(vib_result['_time'])
+        # 필드별 행을 시각당 한 행으로 펼침 (같은 시각의 같은 필드는 마지막 값)
+        vib_long = pd.DataFrame({
+            'time': pd.to_datetime(vib_result['_time'], utc=True),
+            'field': vib_result['_field'],
+            'value': vib_result['_value']
+        }).dropna(subset=['value'])
+        vib_wide = vib_long.pivot_table(index='time', columns='field', values='value', aggfunc='last')
+        
+        print(f"📊 진동 쿼리 결과: 레코드 {record_count}개, 타임스탬프 {len(vib_wide)}개")
     except Exception as e:
         print(f"❌ 진동 데이터 쿼리 오류: {e}")
-        vib_data = {}
+        vib_wide = pd.DataFrame()
     
-    print(f"✅ 온도 데이터: {len(temp_data)}개, 진동 데이터: {len(vib_data)}개")
+    print(f"✅ 온도 데이터: {len(temp_df)}개, 진동 데이터: {len(vib_wide)}개")
     
     # 데이터 병합 (타임스탬프 기준 - pandas merge_asof 사용)
-    if not temp_data:
+    if temp_df.empty:
         error_msg = f"온도 데이터가 없습니다. '{INFLUXDB_BUCKET_TEMP}' 버킷에 증강 데이터가 있는지 확인하세요. 데이터 증강을 먼저 실행해주세요."
         print(f"⚠️ {error_msg}")
         raise ValueError(error_msg)
     
     # 진동 데이터에서 crest 필드가 있는 데이터만 추출
-    vib_data_list = []
-    for ts, fields in vib_data.items():
-        if 'crest' in fields and fields['crest'] is not None:
-            vib_data_list.append({
-                'time': ts,
-                'vibration_crest': fields['crest'],
-                'vibration_temp': fields.get('temperature')
-            })
-    
-    print(f"📊 온도 데이터: {len(temp_data)}개, 진동 데이터(crest 포함): {len(vib_data_list)}개")
-    
-    if not vib_data_list:
+    if 'crest' in vib_wide.columns:
+        vib_df = pd.DataFrame({
+            'time': vib_wide.index,
+            'vibration_crest': vib_wide['crest'].to_numpy(),
+            'vibration_temp': vib_wide['temperature'].to_numpy() if 'temperature' in vib_wide.columns else np.nan
+        }).dropna(subset=['vibration_crest'])
+    else:
+        vib_df = pd.DataFrame(columns=['time', 'vibration_crest', 'vibration_temp'])
+    
+    print(f"📊 온도 데이터: {len(temp_df)}개, 진동 데이터(crest 포함): {len(vib_df)}개")
+    
+    if vib_df.empty:
         error_msg = f"진동 데이터에 'crest' 필드가 없습니다. '{INFLUXDB_BUCKET_VIB}' 버킷의 데이터 구조를 확인하세요."
         print(f"⚠️ {error_msg}")
         raise ValueError(error_msg)
     
-    # DataFrame 생성
-    temp_df = pd.DataFrame(temp_data)
-    vib_df = pd.DataFrame(vib_data_list)
-    
-    # time 컬럼을 datetime으로 변환 (이미 datetime이면 그대로 사용)
-    if not pd.api.types.is_datetime64_any_dtype(temp_df['time']):
-        temp_df['time'] = pd.to_datetime(temp_df['time'])
-    if not pd.api.types.is_datetime64_any_dtype(vib_df['time']):
-        vib_df['time'] = pd.to_datetime(vib_df['time'])
-    
     # time을 인덱스로 설정
     temp_df = temp_df.set_index('time').sort_index()
     vib_df = vib_df.set_index('time').sort_index()
@@ -195,10 +172,10 @@ def load_data_from_influxdb(client, days=7):
     
     merged_data = merged_df.to_dict('records')
     
-    print(f"✅ 매칭된 데이터: {len(merged_data)}개 (온도 {len(temp_data)}개, 진동 {len(vib_data_list)}개 중)")
+    print(f"✅ 매칭된 데이터: {len(merged_data)}개 (온도 {len(temp_df)}개, 진동 {len(vib_df)}개 중)")
     
     if not merged_data:
-        error_msg = f"병합할 데이터가 없습니다. 타임스탬프 매칭 실패 (최대 {MAX_TIME_DIFF.total_seconds()}초 차이 허용). 온도: {len(temp_data)}개, 진동(crest): {len(vib_data_list)}개"
+        error_msg = f"병합할 데이터가 없습니다. 타임스탬프 매칭 실패 (최대 {MAX_TIME_DIFF.total_seconds()}초 차이 허용). 온도: {len(temp_df)}개, 진동(crest): {len(vib_df)}개"
         print(f"⚠️ {error_msg}")
         raise ValueError(error_msg)
     
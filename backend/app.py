@@ -1,19 +1,36 @@
-from flask import Flask, jsonify, Response, stream_with_context, request, make_response
+from flask import Flask, jsonify, Response, stream_with_context, request, send_file
 from flask_cors import CORS
-import paho.mqtt.client as mqtt
 import json
-import threading
-import queue
 import time
-import csv
-import io
 import socket
 import requests
 import re
+import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from influxdb_client import InfluxDBClient, Point
+from influxdb_client import Point
 from influxdb_client.client.write_api import SYNCHRONOUS
 from iolink_sensor_info import extract_sensor_info_from_mqtt, get_sensor_info, sensor_device_info, get_iolink_master_info
+from influx_client import get_client as get_influx_client, get_stats as get_influx_client_stats
+from influx_writer import BatchingWriteApi
+from write_spool import WriteAheadSpool
+from sse_hub import BroadcastHub
+from vvb001_decoder import decode_vvb001
+from mqtt_router import MqttRouter
+from ingest_pipeline import IngestPipeline
+from downsampler import StreamingDownsampler
+from rollup import RollupAggregator, make_tiers, provision_rollup_buckets
+from ingest_manager import IngestManager, load_connection_config
+from query_cache import QueryCache
+from columnar import COLUMNAR_MIMETYPE
+from visual_downsample import DEFAULT_METHOD as DEFAULT_DOWNSAMPLE_METHOD, METHODS as DOWNSAMPLE_METHODS
+from flux_reader import stream_columns
+from time_columns import range_mask
+from asof_join import asof_join_blocks
+from export_formats import ExportColumn, available_formats, check_format, content_type_for, encode_blocks, filename_for
+from export_jobs import ExportEmptyError, ExportJobManager
+from history_query import HistoryQueryEngine, plan_query, TEMPERATURE_FIELDS, VIBRATION_FIELDS as HISTORY_VIBRATION_FIELDS, empty_vibration_json
+from log_config import setup_logging, get_logger, lazy, get_stats as get_logging_stats
 try:
     from dateutil import parser
 except ImportError:
@@ -22,26 +39,110 @@ except ImportError:
 app = Flask(__name__)
 CORS(app)
 
-# MQTT 설정
-MQTT_BROKER = '192.168.1.3'
-MQTT_PORT = 1883
+# 카테고리별 레벨/속도 제한 로깅 (LOG_LEVEL, LOG_LEVELS, LOG_RATE_LIMIT, LOG_SAMPLE 환경 변수)
+setup_logging()
+ingest_log = get_logger('ingest')
+influx_log = get_logger('influx')
+sse_log = get_logger('sse')
+
+# MQTT 설정 (환경 변수로 덮어쓰기 가능 - 벤치마크/테스트용)
+MQTT_BROKER = os.environ.get('MQTT_BROKER', '192.168.1.3')
+MQTT_PORT = int(os.environ.get('MQTT_PORT', 1883))
 MQTT_TOPIC = 'TP3237'  # 온도 센서 토픽
 VIBRATION_MQTT_TOPIC = 'VVB001'  # 진동 센서 토픽
 
 # IO-Link IP 설정
 IOLINK_IP = '192.168.1.4'
 
-# InfluxDB 설정
-INFLUXDB_URL = 'http://localhost:8090'
-INFLUXDB_TOKEN = 'my-super-secret-auth-token'
-INFLUXDB_ORG = 'my-org'
+# MQTT 수집 연결 목록 (MQTT_CONNECTIONS 환경 변수 JSON 또는 MQTT_CONNECTIONS_FILE로 교체 가능)
+# 마스터가 여러 대면 "topics": ["+/TP3237", "+/VVB001"]처럼 구독하고 첫 토픽 레벨을 마스터 ID로 사용
+DEFAULT_MQTT_CONNECTIONS = [
+    {
+        'name': 'default',
+        'host': MQTT_BROKER,
+        'port': MQTT_PORT,
+        'topics': [MQTT_TOPIC, VIBRATION_MQTT_TOPIC],
+        'master': IOLINK_IP
+    }
+]
+
+# InfluxDB 설정 (환경 변수로 덮어쓰기 가능 - 벤치마크/테스트용)
+INFLUXDB_URL = os.environ.get('INFLUXDB_URL', 'http://localhost:8090')
+INFLUXDB_TOKEN = os.environ.get('INFLUXDB_TOKEN', 'my-super-secret-auth-token')
+INFLUXDB_ORG = os.environ.get('INFLUXDB_ORG', 'my-org')
 INFLUXDB_BUCKET = 'temperature_data'
 VIBRATION_INFLUXDB_BUCKET = 'vibration_data'
-VIBRATION_SAMPLING_INTERVAL = 1  # 샘플링 간격 (초)
+VIBRATION_SAMPLING_INTERVAL = 1  # 샘플링 간격 (초) - 구간마다 min/max/mean/last/count 집계 포인트 하나 기록
+# 센서별 다운샘플링 구간 (초), 없으면 VIBRATION_SAMPLING_INTERVAL 사용
+DOWNSAMPLE_INTERVALS = {
+    'VVB001': VIBRATION_SAMPLING_INTERVAL
+}
+# 구간이 끝난 뒤 기록하기 전에 늦은 샘플을 기다리는 시간 (초, 디코드/저장 큐 지연 p99 약 1.1초보다 길게)
+DOWNSAMPLE_FLUSH_GRACE = float(os.environ.get('DOWNSAMPLE_FLUSH_GRACE', 2.0))
+# 다운샘플링 대상 진동 필드
+VIBRATION_FIELDS = ['v_rms', 'a_peak', 'a_rms', 'temperature', 'crest']
+
+# InfluxDB HTTP 클라이언트 설정 (influx_client.py)
+INFLUXDB_QUERY_WORKERS = int(os.environ.get('INFLUXDB_QUERY_WORKERS', 16))  # 동시에 조회하는 요청 처리 스레드 수 (연결 풀 크기 기준)
+INFLUXDB_ENABLE_GZIP = os.environ.get('INFLUXDB_ENABLE_GZIP', '1') != '0'  # 조회 응답/배치 쓰기 본문 gzip 압축
+INFLUXDB_TIMEOUT = (  # (연결, 읽기) 타임아웃 (ms)
+    int(os.environ.get('INFLUXDB_CONNECT_TIMEOUT_MS', 5000)),
+    int(os.environ.get('INFLUXDB_READ_TIMEOUT_MS', 60000))
+)
+
+# InfluxDB 배치 쓰기 설정
+INFLUXDB_WRITE_BATCH_SIZE = 500  # 한 번에 기록할 최대 포인트 수
+INFLUXDB_WRITE_FLUSH_INTERVAL = 1.0  # 배치가 차지 않아도 기록하는 최대 지연 (초)
+INFLUXDB_WRITE_QUEUE_SIZE = 10000  # 쓰기 대기 큐 최대 크기 (초과 시 드롭)
+INFLUXDB_WRITE_MAX_RETRIES = 5  # 쓰기 실패 시 최대 재시도 횟수
+
+# InfluxDB 장애 시 디스크 스풀 설정
+SPOOL_DIR = os.environ.get('SPOOL_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'spool'))
+SPOOL_MAX_BYTES = 512 * 1024 * 1024  # 스풀 최대 디스크 사용량 (초과 시 오래된 세그먼트 삭제)
+SPOOL_SEGMENT_BYTES = 8 * 1024 * 1024  # 세그먼트 파일 하나의 최대 크기
+SPOOL_REPLAY_BATCH_SIZE = 5000  # 복구 후 재생 시 한 번에 기록할 포인트 수
+
+# MQTT 수집 파이프라인 설정
+INGEST_DECODE_WORKERS = 2  # 디코딩 워커 수 (토픽별로 같은 워커가 처리하여 순서 유지)
+INGEST_QUEUE_SIZE = 10000  # 스테이지 워커별 대기 큐 최대 크기 (초과 시 드롭)
+
+# SSE 브로드캐스트 설정
+SSE_SUBSCRIBER_BUFFER_SIZE = 256  # 구독자별 링 버퍼 크기 (초과 시 오래된 샘플부터 버림)
+SSE_REPLAY_SIZE = 30  # 새 구독자에게 재전송할 최근 샘플 수
+
+# 히스토리 조회 결과 캐시 설정 (최근 집계 구간이 닫힐 때까지 재사용)
+HISTORY_CACHE_MAX_ENTRIES = 256  # 캐시 항목 수 상한 (초과 시 LRU 제거)
+HISTORY_CACHE_MAX_CELLS = 2000000  # 캐시에 보관할 값 개수 상한 (행 x 컬럼)
+
+# 히스토리 묶음 조회 설정 (/api/history/batch)
+HISTORY_BATCH_WORKERS = 8  # 시리즈별 조회를 동시에 실행하는 스레드 수 (INFLUXDB_QUERY_WORKERS 이하)
+HISTORY_BATCH_MAX_SERIES = 16  # 한 요청에 담을 수 있는 최대 시리즈 수
 
-# MQTT 메시지를 저장할 큐
-mqtt_queue = queue.Queue()
-vibration_queue = queue.Queue()
+# CSV 내보내기 설정
+EXPORT_CHUNK_ROWS = 8192  # 쿼리 결과를 읽어 CSV로 보내는 블록 크기 (첫 바이트 지연시간과 메모리 사용량 상한)
+EXPORT_JOIN_TOLERANCE = 60  # 온도+진동 결합 내보내기에서 온도 행과 진동 행을 맞추는 최대 시간 차이 (초)
+
+# 내보내기 작업 설정 (/api/export/jobs, 요청 스레드 밖에서 실행하고 파일로 보관)
+EXPORT_JOB_DIR = os.environ.get('EXPORT_JOB_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'exports'))
+EXPORT_JOB_WORKERS = 2  # 동시에 실행하는 내보내기 작업 수 (나머지는 대기)
+EXPORT_JOB_MAX_BYTES = 2 * 1024 * 1024 * 1024  # 보관하는 결과 파일 전체 크기 상한 (초과 시 오래된 것부터 삭제)
+EXPORT_JOB_TTL = 24 * 3600  # 결과 파일 보관 시간 (초)
+EXPORT_JOB_CACHE_GRACE = 60  # 범위 종료 후 이 시간(초)이 지나서 실행한 작업만 같은 요청에 결과 재사용
+
+# 롤업 계층 설정 (구간 이름, 구간 초, 보존 기간 초 - 0이면 무기한)
+# 수집 시점에 계층별 mean/min/max/count를 집계해 <원본 버킷>_<구간 이름> 버킷에 기록하고
+# 히스토리 조회는 집계 구간을 만족하는 가장 굵은 계층에서 읽음
+ROLLUP_TIERS = [
+    ('10s', 10, 7 * 24 * 3600),
+    ('1m', 60, 30 * 24 * 3600),
+    ('5m', 300, 180 * 24 * 3600),
+    ('30m', 1800, 0)
+]
+ROLLUP_FLUSH_GRACE = 2.0  # 구간 종료 후 늦게 도착하는 샘플을 기다리는 시간 (초)
+
+# MQTT 메시지를 모든 SSE 구독자에게 전달하는 허브
+temperature_hub = BroadcastHub('temperature', buffer_size=SSE_SUBSCRIBER_BUFFER_SIZE, replay_size=SSE_REPLAY_SIZE)
+vibration_hub = BroadcastHub('vibration', buffer_size=SSE_SUBSCRIBER_BUFFER_SIZE, replay_size=SSE_REPLAY_SIZE)
 
 # 최신 진동 데이터 저장
 latest_vibration_data = {
@@ -58,23 +159,62 @@ latest_vibration_data = {
 
 # 센서 디바이스 정보는 iolink_sensor_info 모듈에서 관리
 
-# 마지막 저장 시간 추적 (샘플링 레이트 제어)
-last_vibration_save_time = 0
+# 히스토리 조회 결과 캐시 (대시보드 수와 관계없이 같은 조회는 구간당 한 번만 InfluxDB로)
+history_cache = QueryCache(max_entries=HISTORY_CACHE_MAX_ENTRIES, max_cells=HISTORY_CACHE_MAX_CELLS)
+
+# 묶음 조회의 시리즈별 쿼리를 실행하는 스레드 풀 (대시보드 로딩 시간 = 가장 느린 쿼리)
+history_executor = ThreadPoolExecutor(max_workers=HISTORY_BATCH_WORKERS, thread_name_prefix='history')
+
+# 내보내기 작업 (큰 범위 내보내기를 워커 풀에서 실행하고 결과 파일을 재사용)
+export_jobs = ExportJobManager(EXPORT_JOB_DIR, workers=EXPORT_JOB_WORKERS, max_bytes=EXPORT_JOB_MAX_BYTES,
+                               ttl=EXPORT_JOB_TTL)
 
-# 마지막 MQTT 메시지 수신 시간 추적 (지연시간 계산용)
-last_mqtt_message_time = None
+rollup_tiers = make_tiers(ROLLUP_TIERS)
 
 # InfluxDB 클라이언트 초기화
 try:
-    influx_client = InfluxDBClient(url=INFLUXDB_URL, token=INFLUXDB_TOKEN, org=INFLUXDB_ORG)
-    write_api = influx_client.write_api(write_options=SYNCHRONOUS)
+    influx_client = get_influx_client(INFLUXDB_URL, INFLUXDB_TOKEN, INFLUXDB_ORG, workers=INFLUXDB_QUERY_WORKERS,
+                                      enable_gzip=INFLUXDB_ENABLE_GZIP, timeout=INFLUXDB_TIMEOUT)
+    # 백그라운드 배치 writer (MQTT 콜백이 InfluxDB 응답을 기다리지 않도록)
+    write_api = BatchingWriteApi(
+        influx_client.write_api(write_options=SYNCHRONOUS),
+        org=INFLUXDB_ORG,
+        batch_size=INFLUXDB_WRITE_BATCH_SIZE,
+        flush_interval=INFLUXDB_WRITE_FLUSH_INTERVAL,
+        max_queue_size=INFLUXDB_WRITE_QUEUE_SIZE,
+        max_retries=INFLUXDB_WRITE_MAX_RETRIES,
+        # vibration_data 버킷이 없으면 temperature_data 버킷에 저장 (fallback)
+        fallback_buckets={VIBRATION_INFLUXDB_BUCKET: INFLUXDB_BUCKET},
+        # 재시도 소진 시 디스크에 보관하고 ping 성공 시 큰 배치로 재생
+        spool=WriteAheadSpool(
+            SPOOL_DIR,
+            max_bytes=SPOOL_MAX_BYTES,
+            segment_bytes=SPOOL_SEGMENT_BYTES,
+            replay_batch_size=SPOOL_REPLAY_BATCH_SIZE
+        ),
+        ping=influx_client.ping
+    )
     query_api = influx_client.query_api()
+    # 롤업 버킷 준비 (실패하면 롤업 없이 원본 버킷만 사용)
+    try:
+        provision_rollup_buckets(influx_client.buckets_api(), INFLUXDB_ORG,
+                                 [INFLUXDB_BUCKET, VIBRATION_INFLUXDB_BUCKET], rollup_tiers)
+        rollup_sources = {INFLUXDB_BUCKET: rollup_tiers, VIBRATION_INFLUXDB_BUCKET: rollup_tiers}
+    except Exception as e:
+        print(f"⚠️ Rollup buckets unavailable, history queries use raw buckets only: {e}")
+        rollup_sources = {}
+    # 히스토리 엔드포인트 공용 조회 엔진 (pivot 쿼리 + 컬럼 조립 + 롤업 계층 선택)
+    # 스풀 재생으로 지난 구간이 채워지면 닫힌 구간 보관소를 다시 조회
+    history_engine = HistoryQueryEngine(query_api, INFLUXDB_ORG, cache=history_cache, rollups=rollup_sources,
+                                        replayed_at=write_api.spool.last_replay_at)
     print(f"✅ InfluxDB connected: {INFLUXDB_URL}")
 except Exception as e:
     print(f"❌ InfluxDB connection error: {e}")
     influx_client = None
     write_api = None
     query_api = None
+    history_engine = None
+    rollup_sources = {}
 
 def parse_hex_to_temperature(hex_data):
     """16진수 데이터를 온도로 변환 (예: '0110' -> 27.2°C)"""
@@ -88,6 +228,13 @@ def parse_hex_to_temperature(hex_data):
         print(f"❌ Error parsing hex to temperature: {e}")
         return None
 
+# IO-Link pdin 경로 (앞에서부터 순서대로 찾음, 찾은 경로는 토픽별로 캐시)
+# TP3237 온도센서는 port[2] 사용 (port[1]은 호환성을 위해)
+TP3237_PDIN_PATHS = [
+    '/iolinkmaster/port[2]/iolinkdevice/pdin',
+    '/iolinkmaster/port[1]/iolinkdevice/pdin'
+]
+
 # VVB001 진동센서 디코딩 관련 상수
 PDIN_PATHS = [
     '/iolinkmaster/port[4]/iolinkdevice/pdin',
@@ -96,37 +243,8 @@ PDIN_PATHS = [
     '/iolinkmaster/port[1]/iolinkdevice/pdin'
 ]
 
-DEVICE_STATUS_MAP = {
-    0: "Device is OK",
-    1: "Maintenance required",
-    2: "Out of specification",
-    3: "Function check",
-    4: "Offline",
-    5: "Device not available",
-    6: "No data available",
-    7: "Cyclic data not available"
-}
-
-SPECIAL_VALUES = {
-    32760: "OL",  # Overflow
-    -32760: "UL",  # Underflow
-    32764: "NoData",
-    -32768: "Invalid"
-}
-
-def hex_to_bytes(hex_string):
-    """16진수 문자열을 바이트 배열로 변환"""
-    try:
-        return bytes.fromhex(hex_string)
-    except Exception as e:
-        print(f"❌ Error converting hex to bytes: {e}")
-        return None
-
-def check_special(value):
-    """특수 값 체크"""
-    if value in SPECIAL_VALUES:
-        return SPECIAL_VALUES[value]
-    return None
+# MQTT 메시지에서 센서 디바이스 정보를 다시 추출하는 간격 (초)
+SENSOR_INFO_REFRESH_INTERVAL = 60
 
 def to_float(value, default=None):
     """안전한 float 변환"""
@@ -135,313 +253,175 @@ def to_float(value, default=None):
     except (ValueError, TypeError):
         return default
 
-def decode_vvb001(hex_data):
-    """VVB001 진동센서 데이터 디코딩 (빅 엔디안, 20바이트)"""
+def sample_tags(context):
+    """라우터가 채운 master/port/device 중 값이 있는 것만 태그로 사용"""
+    if not context:
+        return {}
+    return {key: str(context[key]) for key in ('master', 'port', 'device') if context.get(key) is not None}
+
+def save_temperature_to_influxdb(temperature, receive_ts=None, tags=None):
+    """온도 데이터를 InfluxDB 쓰기 큐에 추가 (receive_ts: MQTT 수신 시각, tags: master/port/device)"""
+    if not write_api:
+        return
     try:
-        if len(hex_data) != 40:  # 20바이트 = 40자
-            print(f"⚠️ Invalid hex data length: {len(hex_data)}, expected 40")
-            return None
-        
-        bytes_data = hex_to_bytes(hex_data)
-        if bytes_data is None or len(bytes_data) != 20:
-            return None
-        
-        # 빅 엔디안 형식으로 파싱
-        # bytes[0:2]: v-RMS (signed int16)
-        v_rms_raw = int.from_bytes(bytes_data[0:2], byteorder='big', signed=True)
-        v_rms = v_rms_raw * 0.0001  # 스케일: 0.0001
-        
-        # bytes[4:6]: a-Peak (signed int16)
-        a_peak_raw = int.from_bytes(bytes_data[4:6], byteorder='big', signed=True)
-        a_peak = a_peak_raw * 0.1  # 스케일: 0.1
-        
-        # bytes[8:10]: a-RMS (signed int16)
-        a_rms_raw = int.from_bytes(bytes_data[8:10], byteorder='big', signed=True)
-        a_rms = a_rms_raw * 0.1  # 스케일: 0.1
-        
-        # bytes[10]: device status
-        status_byte = bytes_data[10]
-        device_status_code = (status_byte >> 4) & 0x07
-        device_status = DEVICE_STATUS_MAP.get(device_status_code, f"Unknown({device_status_code})")
-        out1 = bool(status_byte & 0x01)
-        out2 = bool(status_byte & 0x02)
-        
-        # bytes[12:14]: temperature (signed int16)
-        temp_raw = int.from_bytes(bytes_data[12:14], byteorder='big', signed=True)
-        temperature = temp_raw * 0.1  # 스케일: 0.1
-        
-        # bytes[16:18]: crest (signed int16)
-        crest_raw = int.from_bytes(bytes_data[16:18], byteorder='big', signed=True)
-        crest = crest_raw * 0.1  # 스케일: 0.1
-        
-        # 특수 값 체크
-        v_rms_special = check_special(v_rms_raw)
-        a_peak_special = check_special(a_peak_raw)
-        a_rms_special = check_special(a_rms_raw)
-        temp_special = check_special(temp_raw)
-        crest_special = check_special(crest_raw)
-        
-        return {
-            'v_rms': v_rms if not v_rms_special else None,
-            'a_peak': a_peak if not a_peak_special else None,
-            'a_rms': a_rms if not a_rms_special else None,
-            'temperature': temperature if not temp_special else None,
-            'crest': crest if not crest_special else None,
-            'device_status': device_status,
-            'out1': out1,
-            'out2': out2,
-            'raw_values': {
-                'v_rms': v_rms_raw,
-                'a_peak': a_peak_raw,
-                'a_rms': a_rms_raw,
-                'temperature': temp_raw,
-                'crest': crest_raw,
-                'status_byte': status_byte
-            },
-            'special_values': {
-                'v_rms': v_rms_special,
-                'a_peak': a_peak_special,
-                'a_rms': a_rms_special,
-                'temperature': temp_special,
-                'crest': crest_special
-            }
-        }
+        point = Point("temperature")
+        for key, value in (tags or {}).items():
+            point.tag(key, value)
+        point.field("value", float(temperature)) \
+            .time(int(receive_ts * 1e9) if receive_ts else time.time_ns())
+        write_api.write(bucket=INFLUXDB_BUCKET, record=point)
+        ingest_log.debug("💾 Queued for InfluxDB: %s°C", temperature)
+        if rollup_aggregator is not None:
+            rollup_aggregator.add(INFLUXDB_BUCKET, 'temperature', {'value': float(temperature)}, receive_ts, tags)
     except Exception as e:
-        print(f"❌ Error decoding VVB001 data: {e}")
-        import traceback
-        traceback.print_exc()
-        return None
+        influx_log.exception("❌ InfluxDB write error: %s", e)
 
-# MQTT 클라이언트 설정
-def on_connect(client, userdata, flags, rc):
-    if rc == 0:
-        print(f"✅ MQTT Connected to {MQTT_BROKER}:{MQTT_PORT}")
-        client.subscribe(MQTT_TOPIC)
-        client.subscribe(VIBRATION_MQTT_TOPIC)
-        print(f"✅ Subscribed to topic: {MQTT_TOPIC}")
-        print(f"✅ Subscribed to topic: {VIBRATION_MQTT_TOPIC}")
-    else:
-        print(f"❌ MQTT Connection failed with code {rc}")
+def handle_temperature(topic, temperature, context=None):
+    """TP3237 온도 데이터 처리 (SSE 전달 + InfluxDB 저장은 persist 스테이지로)"""
+    receive_ts = context['receive_ts'] if context else time.time()
+    tags = sample_tags(context)
+    ingest_log.debug("🌡️ Temperature extracted: %s°C", temperature)
+    temperature_hub.publish({'temperature': temperature, 'timestamp': receive_ts, **tags})
+    ingest_pipeline.persist(topic, save_temperature_to_influxdb, temperature, receive_ts, tags)
+
+def handle_vibration(topic, decoded_data, context=None):
+    """VVB001 진동 데이터 처리 (최신값 갱신 + SSE 전달 + InfluxDB 저장은 persist 스테이지로)"""
+    global latest_vibration_data
+    ingest_log.debug("📳 Vibration data decoded: v_rms=%s, a_peak=%s, a_rms=%s",
+                     decoded_data.get('v_rms'), decoded_data.get('a_peak'), decoded_data.get('a_rms'))
+
+    now = context['receive_ts'] if context else time.time()
+    tags = sample_tags(context)
+    latest_vibration_data = {
+        **decoded_data,
+        **tags,
+        'timestamp': now
+    }
+
+    vibration_hub.publish({
+        'v_rms': decoded_data.get('v_rms'),
+        'a_peak': decoded_data.get('a_peak'),
+        'a_rms': decoded_data.get('a_rms'),
+        'temperature': decoded_data.get('temperature'),
+        'crest': decoded_data.get('crest'),
+        'timestamp': now,
+        **tags
+    })
+
+    # InfluxDB에 저장 (샘플링 레이트 적용)
+    ingest_pipeline.persist(topic, save_vibration_to_influxdb, decoded_data, now, tags)
+
+def handle_generic_message(topic, data, context=None):
+    """등록되지 않은 토픽 처리 (temperature, temp, value 필드 확인)"""
+    temp_value = data.get('temperature') or data.get('temp') or data.get('value')
+    if temp_value is not None:
+        handle_temperature(topic, float(temp_value), context)
+
+# 토픽 -> 디바이스 디코더 라우터
+# 새 센서 타입은 register_decoder + add_route만 추가하면 됨
+mqtt_router = MqttRouter(default_handler=handle_generic_message, info_extractor=extract_sensor_info_from_mqtt)
+mqtt_router.register_decoder('TP3237', parse_hex_to_temperature, handle_temperature, name='TP3237')
+mqtt_router.register_decoder('VVB001', decode_vvb001, handle_vibration, name='VVB001')
+mqtt_router.add_route(MQTT_TOPIC, 'TP3237', TP3237_PDIN_PATHS)
+# 진동센서는 port 1에 연결되어 있음 (로그에서 확인)
+mqtt_router.add_route(VIBRATION_MQTT_TOPIC, 'VVB001', PDIN_PATHS, port='1', info_interval=SENSOR_INFO_REFRESH_INTERVAL)
 
-def on_message(client, userdata, msg):
-    global last_mqtt_message_time
+def process_mqtt_message(topic, payload, receive_ts, source=None):
+    """decode 워커: JSON 파싱 후 토픽 라우터로 전달 (source: 수신 연결의 기본 마스터 ID)"""
     try:
-        last_mqtt_message_time = time.time()  # 메시지 수신 시간 기록
-        message_str = msg.payload.decode('utf-8')
-        print(f"📨 MQTT Message received on topic {msg.topic}: {message_str}")
+        # 원시 페이로드 문자열은 DEBUG 로그가 켜져 있을 때만 만듦 (json.loads는 bytes를 바로 파싱)
+        ingest_log.debug("📨 MQTT Message received on topic %s: %s", topic, lazy(payload.decode, 'utf-8', 'replace'))
         
         # JSON 파싱
         try:
-            data = json.loads(message_str)
-            
-            # TP3237 토픽인 경우 특별 처리 (iolink 구조)
-            if msg.topic == 'TP3237':
-                # JSON에서 16진수 데이터 추출 (port[2] 사용)
-                payload = data.get('data', {}).get('payload', {})
-                hex_data = payload.get('/iolinkmaster/port[2]/iolinkdevice/pdin', {}).get('data')
-                # port[1]도 확인 (호환성을 위해)
-                if not hex_data:
-                    hex_data = payload.get('/iolinkmaster/port[1]/iolinkdevice/pdin', {}).get('data')
-                
-                if hex_data:
-                    # 16진수를 온도로 변환
-                    temperature = parse_hex_to_temperature(hex_data)
-                    if temperature is not None:
-                        print(f"🌡️ Temperature extracted: {temperature}°C")
-                        
-                        # SSE로 전송할 데이터 큐에 추가
-                        mqtt_queue.put({'temperature': temperature, 'timestamp': time.time()})
-                        
-                        # InfluxDB에 저장
-                        if write_api:
-                            try:
-                                point = Point("temperature") \
-                                    .field("value", float(temperature)) \
-                                    .time(time.time_ns())
-                                write_api.write(bucket=INFLUXDB_BUCKET, record=point)
-                                print(f"💾 Saved to InfluxDB: {temperature}°C")
-                            except Exception as e:
-                                print(f"❌ InfluxDB write error: {e}")
-                                import traceback
-                                traceback.print_exc()
-                    else:
-                        print("⚠️ Failed to parse hex data to temperature")
-                else:
-                    print("⚠️ Hex data not found in message structure")
-                    print(f"📋 Message structure: {json.dumps(data, indent=2)}")
-            # VVB001 진동센서 토픽 처리
-            elif msg.topic == VIBRATION_MQTT_TOPIC:
-                payload = data.get('data', {}).get('payload', {})
-                hex_data = None
-                
-                # MQTT 메시지에서 센서 디바이스 정보 추출 시도 (별도 모듈 사용)
-                try:
-                    # 진동센서는 port 1에 연결되어 있음 (로그에서 확인)
-                    extract_sensor_info_from_mqtt(data, payload, port='1')
-                except Exception as e:
-                    print(f"❌ 센서 정보 추출 중 오류: {e}")
-                    import traceback
-                    traceback.print_exc()
-                
-                # 여러 경로에서 pdin 데이터 찾기
-                for path in PDIN_PATHS:
-                    hex_data = payload.get(path, {}).get('data')
-                    if hex_data:
-                        break
-                
-                if hex_data:
-                    # VVB001 디코딩
-                    decoded_data = decode_vvb001(hex_data)
-                    if decoded_data:
-                        print(f"📳 Vibration data decoded: v_rms={decoded_data.get('v_rms')}, a_peak={decoded_data.get('a_peak')}, a_rms={decoded_data.get('a_rms')}")
-                        
-                        # 최신 데이터 업데이트
-                        global latest_vibration_data
-                        latest_vibration_data = {
-                            **decoded_data,
-                            'timestamp': time.time()
-                        }
-                        
-                        # SSE로 전송할 데이터 큐에 추가
-                        vibration_queue.put({
-                            'v_rms': decoded_data.get('v_rms'),
-                            'a_peak': decoded_data.get('a_peak'),
-                            'a_rms': decoded_data.get('a_rms'),
-                            'temperature': decoded_data.get('temperature'),
-                            'crest': decoded_data.get('crest'),
-                            'timestamp': time.time()
-                        })
-                        
-                        # InfluxDB에 저장 (샘플링 레이트 적용)
-                        save_vibration_to_influxdb(decoded_data)
-                    else:
-                        print("⚠️ Failed to decode VVB001 data")
-                else:
-                    print("⚠️ Hex data not found in VVB001 message structure")
-                    print(f"📋 Message structure: {json.dumps(data, indent=2)}")
-            else:
-                # 다른 토픽의 경우 일반 로직 사용 (temperature, temp, value 필드 확인)
-                temp_value = data.get('temperature') or data.get('temp') or data.get('value')
-                if temp_value is not None:
-                    temperature = float(temp_value)
-                    print(f"🌡️ Temperature extracted: {temperature}°C")
-                    
-                    # SSE로 전송할 데이터 큐에 추가
-                    mqtt_queue.put({'temperature': temperature, 'timestamp': time.time()})
-                    
-                    # InfluxDB에 저장
-                    if write_api:
-                        try:
-                            point = Point("temperature") \
-                                .field("value", float(temperature)) \
-                                .time(time.time_ns())
-                            write_api.write(bucket=INFLUXDB_BUCKET, record=point)
-                            print(f"💾 Saved to InfluxDB: {temperature}°C")
-                        except Exception as e:
-                            print(f"❌ InfluxDB write error: {e}")
-                            import traceback
-                            traceback.print_exc()
-        except json.JSONDecodeError as e:
-            print(f"❌ JSON decode error: {e}")
-            print(f"📋 Raw message: {message_str}")
+            data = json.loads(payload)
+            mqtt_router.dispatch(topic, data, {'receive_ts': receive_ts, 'master': source})
+        except ValueError as e:
+            ingest_log.warning("❌ JSON decode error on topic %s: %s (raw: %.200s)", topic, e,
+                               lazy(payload.decode, 'utf-8', 'replace'))
         except Exception as e:
-            print(f"❌ Error processing message: {e}")
-            import traceback
-            traceback.print_exc()
+            ingest_log.exception("❌ Error processing message: %s", e)
     except Exception as e:
-        print(f"❌ Error in on_message: {e}")
-        import traceback
-        traceback.print_exc()
+        ingest_log.exception("❌ Error processing MQTT message on topic %s: %s", topic, e)
 
-def on_disconnect(client, userdata, rc):
-    print("🔌 MQTT Disconnected")
+# paho 스레드와 디코딩/저장을 분리하는 수집 파이프라인
+ingest_pipeline = IngestPipeline(process_mqtt_message, decode_workers=INGEST_DECODE_WORKERS, queue_size=INGEST_QUEUE_SIZE)
 
 # 진동센서 데이터를 InfluxDB에 저장
-def save_vibration_to_influxdb(decoded_data):
-    """진동센서 데이터를 InfluxDB에 저장 (샘플링 레이트 적용)"""
-    global last_vibration_save_time
-    
+def save_vibration_to_influxdb(decoded_data, receive_ts=None, tags=None):
+    """진동센서 데이터를 다운샘플러에 추가 (구간마다 집계 포인트 하나만 기록, receive_ts: MQTT 수신 시각)"""
+    values = {field: decoded_data.get(field) for field in VIBRATION_FIELDS}
+    vibration_downsampler.add('VVB001', values, receive_ts, tags)
+    if rollup_aggregator is not None:
+        rollup_aggregator.add(VIBRATION_INFLUXDB_BUCKET, 'vibration', values, receive_ts, tags)
+
+def write_vibration_aggregate(sensor, window):
+    """다운샘플링 구간 집계를 InfluxDB에 저장
+
+    기존 필드(v_rms 등)는 구간 평균, <field>_min/_max/_last는 구간 극값/마지막 값
+    """
     if not write_api:
-        print("⚠️ write_api is None, cannot save vibration data to InfluxDB")
-        return
-    
-    current_time = time.time()
-    # 샘플링 레이트 체크
-    if current_time - last_vibration_save_time < VIBRATION_SAMPLING_INTERVAL:
+        influx_log.warning("⚠️ write_api is None, cannot save vibration data to InfluxDB")
         return
     
     try:
-        last_vibration_save_time = current_time
-        
-        point = Point("vibration") \
-            .tag("sensor_type", "VVB001") \
-            .field("v_rms", float(decoded_data.get('v_rms', 0)) if decoded_data.get('v_rms') is not None else 0) \
-            .field("a_peak", float(decoded_data.get('a_peak', 0)) if decoded_data.get('a_peak') is not None else 0) \
-            .field("a_rms", float(decoded_data.get('a_rms', 0)) if decoded_data.get('a_rms') is not None else 0) \
-            .field("temperature", float(decoded_data.get('temperature', 0)) if decoded_data.get('temperature') is not None else 0) \
-            .field("crest", float(decoded_data.get('crest', 0)) if decoded_data.get('crest') is not None else 0) \
-            .time(time.time_ns())
-        
-        # 먼저 vibration_data 버킷에 저장 시도
-        try:
-            write_api.write(bucket=VIBRATION_INFLUXDB_BUCKET, record=point)
-            print(f"💾 Saved vibration data to InfluxDB (bucket: {VIBRATION_INFLUXDB_BUCKET}): v_rms={decoded_data.get('v_rms')}, a_peak={decoded_data.get('a_peak')}, a_rms={decoded_data.get('a_rms')}")
-        except Exception as bucket_error:
-            # 버킷이 없을 경우 temperature_data 버킷에 저장 (fallback)
-            print(f"⚠️ Failed to write to {VIBRATION_INFLUXDB_BUCKET} bucket: {bucket_error}")
-            print(f"⚠️ Trying to save to {INFLUXDB_BUCKET} bucket as fallback...")
-            try:
-                write_api.write(bucket=INFLUXDB_BUCKET, record=point)
-                print(f"💾 Saved vibration data to {INFLUXDB_BUCKET} bucket as fallback")
-            except Exception as e2:
-                print(f"❌ Fallback write also failed: {e2}")
-                raise e2
+        point = Point("vibration").tag("sensor_type", sensor)
+        for key, value in window.tags.items():
+            point.tag(key, value)
+        for field, agg in window.fields.items():
+            point.field(field, float(agg.mean)) \
+                .field(f"{field}_min", float(agg.min)) \
+                .field(f"{field}_max", float(agg.max)) \
+                .field(f"{field}_last", float(agg.last))
+        point.field("sample_count", window.samples) \
+            .time(int(window.start * 1e9))
+        
+        # vibration_data 버킷에 저장 (버킷이 없으면 writer가 temperature_data 버킷으로 fallback)
+        write_api.write(bucket=VIBRATION_INFLUXDB_BUCKET, record=point)
+        a_peak = window.fields.get('a_peak')
+        ingest_log.debug("💾 Queued vibration aggregate for InfluxDB (bucket: %s): samples=%s, a_peak_max=%s",
+                         VIBRATION_INFLUXDB_BUCKET, window.samples, a_peak.max if a_peak else None)
     except Exception as e:
-        print(f"❌ InfluxDB vibration write error: {e}")
-        import traceback
-        traceback.print_exc()
+        influx_log.exception("❌ InfluxDB vibration write error: %s", e)
 
-# MQTT 클라이언트 초기화 및 연결
-try:
-    mqtt_client = mqtt.Client()
-    mqtt_client.on_connect = on_connect
-    mqtt_client.on_message = on_message
-    mqtt_client.on_disconnect = on_disconnect
-    # 자동 재연결 설정
-    mqtt_client.reconnect_delay_set(min_delay=1, max_delay=120)
-except Exception as e:
-    print(f"❌ Error initializing MQTT client: {e}")
-    mqtt_client = None
+# 진동 샘플을 버리지 않고 구간별로 집계하는 다운샘플러
+vibration_downsampler = StreamingDownsampler(
+    write_vibration_aggregate,
+    intervals=DOWNSAMPLE_INTERVALS,
+    default_interval=VIBRATION_SAMPLING_INTERVAL,
+    flush_grace=DOWNSAMPLE_FLUSH_GRACE
+)
+vibration_downsampler.start()
 
-def connect_mqtt():
-    if mqtt_client is None:
-        print("❌ MQTT client not initialized")
+def write_rollup(tier, bucket, measurement, window):
+    """롤업 구간 집계를 <bucket>_<계층> 버킷에 저장
+
+    기존 필드 이름(value, v_rms 등)은 구간 평균, <field>_min/_max/_count는 구간 극값/원본 샘플 수
+    """
+    if not write_api:
         return
-    try:
-        print(f"🔄 Attempting to connect to MQTT broker: {MQTT_BROKER}:{MQTT_PORT}")
-        mqtt_client.connect(MQTT_BROKER, MQTT_PORT, 60)
-        mqtt_client.loop_start()
-        print("🔄 MQTT loop started")
-    except Exception as e:
-        print(f"❌ MQTT Connection error: {e}")
-        print(f"💡 네트워크 연결을 확인하고 잠시 후 자동으로 재연결을 시도합니다.")
-        import traceback
-        traceback.print_exc()
-        # 재연결 시도 (5초 후)
-        import threading
-        def retry_connect():
-            import time
-            time.sleep(5)
-            if mqtt_client is not None:
-                try:
-                    mqtt_client.reconnect()
-                except:
-                    pass
-        threading.Thread(target=retry_connect, daemon=True).start()
+    point = Point(measurement)
+    for key, value in window.tags.items():
+        point.tag(key, value)
+    for field, agg in window.fields.items():
+        point.field(field, float(agg.mean)) \
+            .field(f"{field}_min", float(agg.min)) \
+            .field(f"{field}_max", float(agg.max)) \
+            .field(f"{field}_count", agg.count)
+    point.field("sample_count", window.samples) \
+        .time(int(window.start * 1e9))
+    write_api.write(bucket=tier.bucket_for(bucket), record=point)
+
+# 수집 시점 롤업 계층 집계 (롤업 버킷이 준비된 경우에만)
+if rollup_sources:
+    rollup_aggregator = RollupAggregator(write_rollup, rollup_tiers, flush_grace=ROLLUP_FLUSH_GRACE)
+    rollup_aggregator.start()
+else:
+    rollup_aggregator = None
 
-# 백그라운드에서 MQTT 연결
-mqtt_thread = threading.Thread(target=connect_mqtt, daemon=True)
-mqtt_thread.start()
+# MQTT 연결 관리 (연결마다 paho 네트워크 루프 스레드 하나, 재연결은 연결별 백오프)
+ingest_manager = IngestManager(ingest_pipeline.submit, load_connection_config(DEFAULT_MQTT_CONNECTIONS))
+ingest_manager.start()
 
 def get_server_ip():
     """서버의 외부 IP 주소 감지"""
@@ -629,54 +609,28 @@ def network_status():
         }
     }
     
-    # MQTT 연결 상태 확인 및 지연시간 측정
-    if mqtt_client is not None:
-        try:
-            # MQTT 클라이언트의 연결 상태 확인
-            # _state 속성 사용 (0=연결 안 됨, 1=연결 중, 2=연결됨)
-            mqtt_connected = False
-            if hasattr(mqtt_client, '_state'):
-                mqtt_state = mqtt_client._state
-                mqtt_connected = mqtt_state == mqtt.mqtt_cs_connected
-            elif hasattr(mqtt_client, 'is_connected'):
-                mqtt_connected = mqtt_client.is_connected()
-            else:
-                # fallback: MQTT 클라이언트가 초기화되어 있고 loop가 실행 중이면 연결된 것으로 간주
-                try:
-                    # _thread와 _state를 확인
-                    if hasattr(mqtt_client, '_thread') and mqtt_client._thread and mqtt_client._thread.is_alive():
-                        mqtt_connected = True
-                except:
-                    mqtt_connected = False
-            
-            status['mqtt']['connected'] = mqtt_connected
-            
-            # MQTT 지연시간 측정 (연결된 경우에만)
-            if mqtt_connected:
-                try:
-                    # 마지막 메시지 수신 시간과 현재 시간의 차이로 지연시간 추정
-                    if last_mqtt_message_time is not None:
-                        # 마지막 메시지 수신 후 경과 시간 (초)
-                        time_since_last_message = time.time() - last_mqtt_message_time
-                        # 메시지가 최근에 수신되었다면 지연시간이 낮은 것으로 간주
-                        # 5초 이내에 메시지가 수신되었다면 <5ms로 표시
-                        if time_since_last_message < 5:
-                            status['mqtt']['latency'] = round(time_since_last_message * 1000, 1)
-                        else:
-                            # 오래 전 메시지면 지연시간 측정 불가
-                            status['mqtt']['latency'] = None
-                    elif hasattr(mqtt_client, '_sock') and mqtt_client._sock:
-                        # 소켓이 열려있지만 메시지가 없으면 연결만 된 상태
-                        status['mqtt']['latency'] = None
-                    else:
-                        status['mqtt']['latency'] = None
-                except:
-                    status['mqtt']['latency'] = None
-        except Exception as e:
-            print(f"⚠️ MQTT status check error: {e}")
-            status['mqtt']['connected'] = False
-            status['mqtt']['latency'] = None
-    else:
+    # MQTT 연결 상태 확인 및 지연시간 측정 (연결이 여러 개면 하나라도 연결되어 있으면 연결됨)
+    try:
+        mqtt_stats = ingest_manager.get_stats()
+        mqtt_connected = mqtt_stats['connected'] > 0
+        status['mqtt']['connected'] = mqtt_connected
+        status['mqtt']['connections'] = [
+            {'name': c['name'], 'broker': c['broker'], 'connected': c['connected'], 'state': c['state']}
+            for c in mqtt_stats['connections']
+        ]
+        
+        # MQTT 지연시간 측정 (연결된 경우에만)
+        if mqtt_connected:
+            # 마지막 메시지 수신 시간과 현재 시간의 차이로 지연시간 추정
+            last_message_time = ingest_manager.last_message_time
+            if last_message_time is not None:
+                # 마지막 메시지 수신 후 경과 시간 (초)
+                time_since_last_message = time.time() - last_message_time
+                # 5초 이내에 메시지가 수신되었다면 경과 시간을 지연시간으로 표시
+                if time_since_last_message < 5:
+                    status['mqtt']['latency'] = round(time_since_last_message * 1000, 1)
+    except Exception as e:
+        print(f"⚠️ MQTT status check error: {e}")
         status['mqtt']['connected'] = False
         status['mqtt']['latency'] = None
     
@@ -699,6 +653,32 @@ def network_status():
     
     return jsonify(status)
 
+@app.route('/api/metrics', methods=['GET'])
+def get_metrics():
+    """백엔드 내부 처리 통계 반환 (InfluxDB 쓰기 큐 등)"""
+    try:
+        metrics = {
+            'influxdb_writer': write_api.get_stats() if write_api else None,
+            'influxdb_client': get_influx_client_stats(influx_client),
+            'mqtt_routes': mqtt_router.get_stats(),
+            'ingest': ingest_pipeline.get_stats(),
+            'mqtt': ingest_manager.get_stats(),
+            'downsampler': vibration_downsampler.get_stats(),
+            'rollup': rollup_aggregator.get_stats() if rollup_aggregator is not None else None,
+            'history_cache': history_cache.get_stats(),
+            'export_jobs': export_jobs.get_stats(),
+            'history_windows': history_engine.get_stats() if history_engine is not None else None,
+            'logging': get_logging_stats(),
+            'sse': {
+                'temperature': temperature_hub.get_stats(),
+                'vibration': vibration_hub.get_stats()
+            }
+        }
+        return jsonify(metrics)
+    except Exception as e:
+        print(f"❌ Error getting metrics: {e}")
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/test', methods=['GET'])
 def test():
     return jsonify({'message': 'Test endpoint working'})
@@ -707,105 +687,157 @@ def test():
 def stream_temperature():
     """Server-Sent Events를 통해 실시간 온도 데이터 스트리밍"""
     def generate():
+        # 연결마다 독립된 버퍼로 구독 (다른 브라우저와 메시지를 나눠 갖지 않음)
+        subscription = temperature_hub.subscribe()
         try:
             while True:
                 try:
-                    # 큐에서 메시지 가져오기 (타임아웃 1초)
-                    try:
-                        data = mqtt_queue.get(timeout=1)
+                    # 구독 버퍼에서 메시지 가져오기 (타임아웃 1초)
+                    data = subscription.get(timeout=1)
+                    if data is not None:
                         yield f"data: {json.dumps(data)}\n\n"
-                    except queue.Empty:
+                    else:
                         # 하트비트 전송 (연결 유지)
                         yield f"data: {json.dumps({'heartbeat': True})}\n\n"
                 except GeneratorExit:
-                    print("SSE connection closed by client")
+                    sse_log.info("SSE connection closed by client")
                     break
                 except Exception as e:
-                    print(f"Error in stream: {e}")
-                    import traceback
-                    traceback.print_exc()
+                    sse_log.exception("Error in stream: %s", e)
                     break
         except Exception as e:
-            print(f"Fatal error in generate: {e}")
-            import traceback
-            traceback.print_exc()
+            sse_log.exception("Fatal error in generate: %s", e)
+        finally:
+            temperature_hub.unsubscribe(subscription)
     
     response = Response(stream_with_context(generate()), mimetype='text/event-stream')
     response.headers['Cache-Control'] = 'no-cache'
     response.headers['X-Accel-Buffering'] = 'no'
     return response
 
+def history_response(series, kind, plan=None):
+    """히스토리 응답 (Accept로 바이너리 컬럼 포맷을 요청한 경우에만 JSON 대신 사용)"""
+    best = request.accept_mimetypes.best_match(['application/json', COLUMNAR_MIMETYPE])
+    if best == COLUMNAR_MIMETYPE:
+        body = series.to_temperature_columnar() if kind == 'temperature' else series.to_vibration_columnar()
+        response = Response(body, mimetype=COLUMNAR_MIMETYPE)
+    else:
+        response = jsonify(series.to_temperature_json() if kind == 'temperature' else series.to_vibration_json())
+    response.headers['Vary'] = 'Accept'
+    if plan is not None:
+        response.headers['X-History-Window'] = plan.window
+        if plan.clamped:
+            response.headers['X-History-Clamped'] = 'true'
+    return response
+
+def history_endpoint(bucket, measurement, fields, kind, fallback_bucket=None):
+    """히스토리 엔드포인트 공통 처리 (쿼리 플래너로 조회 구간/집계 구간 결정)
+
+    range: 1h/6h/24h/7d 또는 임의 기간('90m', '3d'), 기본 1h
+    start/stop: 절대 구간 (epoch ms 또는 ISO 8601, stop이 없으면 현재까지)
+    points: 점 수 목표 (집계 구간 자동 선택, 기본 400)
+    since(ms): 차트 폴링 증분 조회 (해당 시각 이후 구간 + 열린 마지막 구간만)
+    max_points: 차트 해상도에 맞춘 다운샘플링 (downsample=m4|lttb, 기본 m4)
+    """
+    if history_engine is None:
+        return jsonify({'error': 'InfluxDB not connected'}), 500
+    method = request.args.get('downsample', DEFAULT_DOWNSAMPLE_METHOD)
+    if method not in DOWNSAMPLE_METHODS:
+        return jsonify({'error': f'downsample must be one of: {", ".join(DOWNSAMPLE_METHODS)}'}), 400
+    try:
+        plan = plan_query(request.args.get('range'), request.args.get('start'), request.args.get('stop'),
+                          request.args.get('points', type=int))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    series = history_engine.query(
+        bucket, measurement, fields, fallback_bucket=fallback_bucket, plan=plan,
+        since=request.args.get('since', type=int),
+        max_points=request.args.get('max_points', type=int),
+        method=method
+    )
+    return history_response(series, kind, plan)
+
+# 묶음 조회에서 이름으로 고르는 시리즈 -> (bucket, measurement, fields, kind, fallback_bucket)
+HISTORY_SERIES = {
+    'temperature': (INFLUXDB_BUCKET, 'temperature', TEMPERATURE_FIELDS, 'temperature', None),
+    'vibration': (VIBRATION_INFLUXDB_BUCKET, 'vibration', HISTORY_VIBRATION_FIELDS, 'vibration', INFLUXDB_BUCKET),
+    'augmented_temperature': ('temperature_augmented', 'temperature', TEMPERATURE_FIELDS, 'temperature', None),
+    'augmented_vibration': ('vibration_augmented', 'vibration', HISTORY_VIBRATION_FIELDS, 'vibration', None)
+}
+
+def optional_int(value, name):
+    """JSON 본문의 정수 파라미터 (없으면 None)"""
+    if value is None:
+        return None
+    try:
+        if isinstance(value, bool):
+            raise TypeError
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f'{name} must be an integer') from None
+
+@app.route('/api/history/batch', methods=['POST'])
+def get_history_batch():
+    """여러 히스토리 시리즈를 한 번에 조회 (시리즈별 Flux 쿼리를 스레드 풀에서 동시에 실행)
+
+    본문: {"series": ["temperature", {"name": "vibration", "since": ms, "max_points": n}, ...],
+           "range"/"start"/"stop"/"points": 공통 조회 구간, "max_points"/"downsample": 공통 다운샘플링}
+    응답: {"window", "clamped", "series": {이름: 개별 엔드포인트와 같은 JSON 또는 {"error"}}}
+    같은 조회 캐시/닫힌 구간 저장소를 쓰므로 개별 엔드포인트와 결과를 공유함
+    """
+    if history_engine is None:
+        return jsonify({'error': 'InfluxDB not connected'}), 500
+    body = request.get_json(silent=True)
+    specs = body.get('series') if isinstance(body, dict) else None
+    if not isinstance(specs, list) or not specs:
+        return jsonify({'error': 'series must be a non-empty list'}), 400
+    if len(specs) > HISTORY_BATCH_MAX_SERIES:
+        return jsonify({'error': f'Too many series (max {HISTORY_BATCH_MAX_SERIES})'}), 400
+    try:
+        plan = plan_query(body.get('range'), body.get('start'), body.get('stop'), optional_int(body.get('points'), 'points'))
+        queries = {}
+        for spec in specs:
+            options = spec if isinstance(spec, dict) else {'name': spec}
+            name = options.get('name')
+            if not isinstance(name, str) or name not in HISTORY_SERIES:
+                raise ValueError(f'Unknown series: {name}')
+            if name in queries:
+                raise ValueError(f'Duplicate series: {name}')
+            method = options.get('downsample', body.get('downsample', DEFAULT_DOWNSAMPLE_METHOD))
+            if not isinstance(method, str) or method not in DOWNSAMPLE_METHODS:
+                raise ValueError(f'downsample must be one of: {", ".join(DOWNSAMPLE_METHODS)}')
+            queries[name] = (
+                optional_int(options.get('since'), 'since'),
+                optional_int(options.get('max_points', body.get('max_points')), 'max_points'),
+                method
+            )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    futures = {}
+    for name, (since, max_points, method) in queries.items():
+        bucket, measurement, fields, _, fallback_bucket = HISTORY_SERIES[name]
+        futures[name] = history_executor.submit(
+            history_engine.query, bucket, measurement, fields, fallback_bucket=fallback_bucket, plan=plan,
+            since=since, max_points=max_points, method=method
+        )
+    results = {}
+    for name, future in futures.items():
+        kind = HISTORY_SERIES[name][3]
+        try:
+            series = future.result()
+            results[name] = series.to_temperature_json() if kind == 'temperature' else series.to_vibration_json()
+        except Exception as e:
+            # 시리즈 하나가 실패해도 나머지는 반환
+            print(f"❌ Error querying {name} history: {e}")
+            results[name] = {**empty_vibration_json(), 'error': str(e)} if kind == 'vibration' else {'error': str(e)}
+    return jsonify({'window': plan.window, 'clamped': plan.clamped, 'series': results})
+
 @app.route('/api/influxdb/temperature', methods=['GET'])
 def get_temperature_history():
-    """InfluxDB에서 온도 데이터 조회 (range 파라미터로 시간 범위 지정)"""
+    """InfluxDB에서 온도 데이터 조회 (range 또는 start/stop으로 시간 범위 지정)"""
     try:
-        if influx_client is None:
-            return jsonify({'error': 'InfluxDB not connected'}), 500
-        
-        # range 파라미터 가져오기 (기본값: 1h)
-        range_param = request.args.get('range', '1h')
-        
-        # 쿼리 API 생성
-        query_api = influx_client.query_api()
-        
-        # range에 따라 시작 시간과 윈도우 간격 계산
-        now = datetime.utcnow()
-        if range_param == '1h':
-            start_time = now - timedelta(hours=1)
-            window_interval = '10s'
-        elif range_param == '6h':
-            start_time = now - timedelta(hours=6)
-            window_interval = '1m'
-        elif range_param == '24h':
-            start_time = now - timedelta(hours=24)
-            window_interval = '5m'
-        elif range_param == '7d':
-            start_time = now - timedelta(days=7)
-            window_interval = '30m'
-        else:
-            # 기본값: 1시간
-            start_time = now - timedelta(hours=1)
-            window_interval = '10s'
-        
-        start_time_str = start_time.strftime('%Y-%m-%dT%H:%M:%SZ')
-        
-        # Flux 쿼리 작성 (createEmpty: true로 설정하여 빈 시간대도 포함)
-        query = f'''
-        from(bucket: "{INFLUXDB_BUCKET}")
-          |> range(start: {start_time_str})
-          |> filter(fn: (r) => r["_measurement"] == "temperature")
-          |> filter(fn: (r) => r["_field"] == "value")
-          |> aggregateWindow(every: {window_interval}, fn: mean, createEmpty: true)
-          |> yield(name: "mean")
-        '''
-        
-        # 쿼리 실행
-        result = query_api.query(org=INFLUXDB_ORG, query=query)
-        
-        # 데이터 파싱
-        timestamps = []
-        values = []
-        
-        for table in result:
-            for record in table.records:
-                timestamp = record.get_time().timestamp() * 1000  # JavaScript timestamp (ms)
-                value = record.get_value()
-                timestamps.append(timestamp)
-                # 데이터가 없으면 null로 설정 (빈 시간대)
-                values.append(value if value is not None else None)
-        
-        # 시간순 정렬
-        if timestamps and values:
-            sorted_data = sorted(zip(timestamps, values))
-            timestamps, values = zip(*sorted_data)
-            timestamps = list(timestamps)
-            values = list(values)
-        
-        return jsonify({
-            'timestamps': timestamps,
-            'values': values,
-            'count': len(values)
-        })
+        return history_endpoint(INFLUXDB_BUCKET, 'temperature', TEMPERATURE_FIELDS, 'temperature')
         
     except Exception as e:
         print(f"❌ Error querying InfluxDB: {e}")
@@ -824,115 +856,11 @@ def get_latest_vibration():
 
 @app.route('/api/influxdb/vibration', methods=['GET'])
 def get_vibration_history():
-    """InfluxDB에서 진동 데이터 조회 (range 파라미터로 시간 범위 지정)"""
+    """InfluxDB에서 진동 데이터 조회 (range 또는 start/stop으로 시간 범위 지정)"""
     try:
-        if influx_client is None:
-            return jsonify({'error': 'InfluxDB not connected'}), 500
-        
-        # range 파라미터 가져오기 (기본값: 1h)
-        range_param = request.args.get('range', '1h')
-        
-        # 쿼리 API 생성
-        query_api = influx_client.query_api()
-        
-        # range에 따라 시작 시간과 윈도우 간격 계산
-        now = datetime.utcnow()
-        if range_param == '1h':
-            start_time = now - timedelta(hours=1)
-            window_interval = '10s'
-        elif range_param == '6h':
-            start_time = now - timedelta(hours=6)
-            window_interval = '1m'
-        elif range_param == '24h':
-            start_time = now - timedelta(hours=24)
-            window_interval = '5m'
-        elif range_param == '7d':
-            start_time = now - timedelta(days=7)
-            window_interval = '30m'
-        else:
-            # 기본값: 1시간
-            start_time = now - timedelta(hours=1)
-            window_interval = '10s'
-        
-        start_time_str = start_time.strftime('%Y-%m-%dT%H:%M:%SZ')
-        
-        # Flux 쿼리 작성 (createEmpty: true로 설정하여 빈 시간대도 포함)
-        query = f'''
-        from(bucket: "{VIBRATION_INFLUXDB_BUCKET}")
-          |> range(start: {start_time_str})
-          |> filter(fn: (r) => r["_measurement"] == "vibration")
-          |> filter(fn: (r) => r["_field"] == "v_rms" or r["_field"] == "a_peak" or r["_field"] == "a_rms" or r["_field"] == "crest" or r["_field"] == "temperature")
-          |> aggregateWindow(every: {window_interval}, fn: mean, createEmpty: true)
-          |> yield(name: "mean")
-        '''
-        
-        try:
-            result = query_api.query(org=INFLUXDB_ORG, query=query)
-        except Exception as bucket_error:
-            # vibration_data 버킷이 없으면 temperature_data 버킷에서 조회
-            print(f"⚠️ Failed to query {VIBRATION_INFLUXDB_BUCKET} bucket: {bucket_error}")
-            print(f"⚠️ Trying to query {INFLUXDB_BUCKET} bucket as fallback...")
-            query = f'''
-            from(bucket: "{INFLUXDB_BUCKET}")
-              |> range(start: {start_time_str})
-              |> filter(fn: (r) => r["_measurement"] == "vibration")
-              |> filter(fn: (r) => r["_field"] == "v_rms" or r["_field"] == "a_peak" or r["_field"] == "a_rms" or r["_field"] == "crest" or r["_field"] == "temperature")
-              |> aggregateWindow(every: {window_interval}, fn: mean, createEmpty: true)
-              |> yield(name: "mean")
-            '''
-            result = query_api.query(org=INFLUXDB_ORG, query=query)
-        
-        # 데이터 구조화
-        timestamps = []
-        v_rms_values = []
-        a_peak_values = []
-        a_rms_values = []
-        crest_values = []
-        temperature_values = []
-        
-        # 각 필드별로 데이터 수집
-        for table in result:
-            for record in table.records:
-                timestamp_ms = int(record.get_time().timestamp() * 1000)
-                field = record.get_field()
-                value = record.get_value()
-                
-                if timestamp_ms not in timestamps:
-                    timestamps.append(timestamp_ms)
-                    v_rms_values.append(None)
-                    a_peak_values.append(None)
-                    a_rms_values.append(None)
-                    crest_values.append(None)
-                    temperature_values.append(None)
-                
-                idx = timestamps.index(timestamp_ms)
-                
-                if field == 'v_rms':
-                    v_rms_values[idx] = value
-                elif field == 'a_peak':
-                    a_peak_values[idx] = value
-                elif field == 'a_rms':
-                    a_rms_values[idx] = value
-                elif field == 'crest':
-                    crest_values[idx] = value
-                elif field == 'temperature':
-                    temperature_values[idx] = value
-        
-        # 타임스탬프와 값들을 정렬
-        sorted_data = sorted(zip(timestamps, v_rms_values, a_peak_values, a_rms_values, crest_values, temperature_values))
-        if sorted_data:
-            timestamps, v_rms_values, a_peak_values, a_rms_values, crest_values, temperature_values = zip(*sorted_data)
-        else:
-            timestamps, v_rms_values, a_peak_values, a_rms_values, crest_values, temperature_values = [], [], [], [], [], []
-        
-        return jsonify({
-            'timestamps': list(timestamps),
-            'v_rms': list(v_rms_values),
-            'a_peak': list(a_peak_values),
-            'a_rms': list(a_rms_values),
-            'crest': list(crest_values),
-            'temperature': list(temperature_values)
-        })
+        # vibration_data 버킷이 없으면 temperature_data 버킷에서 조회
+        return history_endpoint(VIBRATION_INFLUXDB_BUCKET, 'vibration', HISTORY_VIBRATION_FIELDS, 'vibration',
+                                fallback_bucket=INFLUXDB_BUCKET)
     except Exception as e:
         print(f"❌ Error getting vibration history: {e}")
         import traceback
@@ -943,166 +871,210 @@ def get_vibration_history():
 def stream_vibration():
     """Server-Sent Events를 통해 실시간 진동 데이터 스트리밍"""
     def generate():
+        # 연결마다 독립된 버퍼로 구독 (다른 브라우저와 메시지를 나눠 갖지 않음)
+        subscription = vibration_hub.subscribe()
         try:
             while True:
                 try:
-                    # 큐에서 메시지 가져오기 (타임아웃 1초)
-                    try:
-                        data = vibration_queue.get(timeout=1)
+                    # 구독 버퍼에서 메시지 가져오기 (타임아웃 1초)
+                    data = subscription.get(timeout=1)
+                    if data is not None:
                         yield f"data: {json.dumps(data)}\n\n"
-                    except queue.Empty:
+                    else:
                         # 하트비트 전송 (연결 유지)
                         yield f"data: {json.dumps({'heartbeat': True})}\n\n"
                 except GeneratorExit:
-                    print("SSE vibration connection closed by client")
+                    sse_log.info("SSE vibration connection closed by client")
                     break
                 except Exception as e:
-                    print(f"Error in vibration stream: {e}")
-                    import traceback
-                    traceback.print_exc()
+                    sse_log.exception("Error in vibration stream: %s", e)
                     break
         except Exception as e:
-            print(f"Fatal error in vibration generate: {e}")
-            import traceback
-            traceback.print_exc()
+            sse_log.exception("Fatal error in vibration generate: %s", e)
+        finally:
+            vibration_hub.unsubscribe(subscription)
     
     response = Response(stream_with_context(generate()), mimetype='text/event-stream')
     response.headers['Cache-Control'] = 'no-cache'
     response.headers['X-Accel-Buffering'] = 'no'
     return response
 
-@app.route('/api/export/temperature/csv', methods=['GET'])
-def export_temperature_csv():
-    """온도 데이터를 CSV 파일로 내보내기 (KST 시간 범위 지정)"""
-    if not query_api:
-        return jsonify({'error': 'InfluxDB 쿼리 API가 초기화되지 않았습니다.'}), 500
-    
-    try:
-        # 1. KST 시간 파라미터 받기
-        start_time_kst_str = request.args.get('start_time_kst')  # "YYYY-MM-DD HH:MM:SS"
-        end_time_kst_str = request.args.get('end_time_kst')
-        
-        if not start_time_kst_str or not end_time_kst_str:
-            return jsonify({'error': '시작 시간과 종료 시간이 필요합니다.'}), 400
-        
-        print(f"📥 CSV 다운로드 요청: start_time_kst={start_time_kst_str}, end_time_kst={end_time_kst_str}")
-        
-        # 2. KST 문자열 파싱
+# 내보내기 컬럼 (블록 컬럼, Parquet 컬럼 이름, CSV 헤더, CSV 소수점 자리 수)
+TEMPERATURE_EXPORT_COLUMNS = [ExportColumn('_value', 'temperature', 'Temperature (°C)', 2)]
+VIBRATION_EXPORT_COLUMNS = [
+    ExportColumn('v_rms', 'v_rms', 'v-RMS (mm/s)', 4),
+    ExportColumn('a_peak', 'a_peak', 'a-Peak (m/s²)', 2),
+    ExportColumn('a_rms', 'a_rms', 'a-RMS (m/s²)', 2),
+    ExportColumn('crest', 'crest', 'Crest', 2)
+]
+
+def in_range_blocks(blocks, start_utc, end_utc):
+    """쿼리 결과 블록에서 [start, end) 밖의 행을 빼고 빈 블록은 건너뜀 (Python 레벨 정확한 범위 체크)"""
+    for block in blocks:
+        in_range = range_mask(block['_time'], start_utc, end_utc)
+        if in_range.all():
+            yield block
+        elif in_range.any():
+            yield {name: values[in_range] for name, values in block.items()}
+
+def chain_blocks(first_block, blocks, count=None):
+    """미리 읽은 첫 블록 + 나머지 블록 스트림 (count를 주면 블록마다 count(행 수) 호출)"""
+    block = first_block
+    while block is not None:
+        if count is not None:
+            count(len(block['_time']))
+        yield block
+        block = next(blocks, None)
+
+def export_response(first_block, blocks, columns, export_format, filename, label):
+    """블록 스트림 -> 내보내기 파일 스트리밍 응답 (포맷은 export_formats 참고)
+
+    첫 블록은 호출 전에 읽어 둠 (쿼리 오류/빈 결과는 스트리밍 시작 전에 오류 응답으로 처리)
+    블록마다 인코딩해서 바로 보내므로 메모리 사용량은 블록 크기로 제한되고 전체 크기(Content-Length)는 보내지 않음
+    """
+    row_count = 0
+
+    def count(rows):
+        nonlocal row_count
+        row_count += rows
+
+    def generate():
         try:
-            start_kst = datetime.strptime(start_time_kst_str, '%Y-%m-%d %H:%M:%S')
-            end_kst = datetime.strptime(end_time_kst_str, '%Y-%m-%d %H:%M:%S')
-        except ValueError as e:
-            return jsonify({'error': f'시간 형식이 올바르지 않습니다. 형식: YYYY-MM-DD HH:MM:SS. 오류: {e}'}), 400
-        
-        # 3. KST → UTC 변환 (KST = UTC + 9시간)
-        start_utc = start_kst - timedelta(hours=9)
-        end_utc = end_kst - timedelta(hours=9)
-        
-        print(f"📅 변환된 UTC 시간: start={start_utc}, end={end_utc}")
-        
-        # 4. RFC3339 형식으로 변환 (InfluxDB 쿼리용)
-        start_rfc = start_utc.strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3] + 'Z'
-        end_rfc = end_utc.strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3] + 'Z'
-        
-        print(f"🔍 InfluxDB 쿼리 범위: start={start_rfc}, end={end_rfc}")
-        
-        # 5. InfluxDB Flux 쿼리 실행
-        query = f'''
+            yield from encode_blocks(chain_blocks(first_block, blocks, count), columns, export_format)
+        except Exception as e:
+            print(f"❌ {label} {export_format} 스트리밍 중단 ({row_count}개 행 전송 후): {e}")
+            raise
+        finally:
+            # 클라이언트가 연결을 끊어도 InfluxDB 응답을 닫음
+            blocks.close()
+        print(f"✅ {label} {export_format} 전송 완료: {row_count}개 행, 파일명: {filename}")
+
+    response = Response(stream_with_context(generate()), mimetype=content_type_for(export_format))
+    response.headers['Content-Type'] = content_type_for(export_format)
+    response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+@app.route('/api/export/formats', methods=['GET'])
+def get_export_formats():
+    """내보내기 엔드포인트에서 쓸 수 있는 파일 포맷 (format 파라미터 값)"""
+    return jsonify({'formats': available_formats(), 'default': 'csv'})
+
+def parse_export_range(start_time_kst_str, end_time_kst_str):
+    """KST "YYYY-MM-DD HH:MM:SS" 시작/종료 문자열 -> UTC 시작/종료 datetime (형식이 틀리면 ValueError)"""
+    start_kst = datetime.strptime(start_time_kst_str, '%Y-%m-%d %H:%M:%S')
+    end_kst = datetime.strptime(end_time_kst_str, '%Y-%m-%d %H:%M:%S')
+    # KST → UTC 변환 (KST = UTC + 9시간)
+    return start_kst - timedelta(hours=9), end_kst - timedelta(hours=9)
+
+def export_filename(kind, start_time_kst_str, end_time_kst_str, export_format):
+    filename_start = start_time_kst_str.replace('-', '').replace(':', '').replace(' ', '_')
+    filename_end = end_time_kst_str.replace('-', '').replace(':', '').replace(' ', '_')
+    return filename_for(f'{kind}_{filename_start}_{filename_end}', export_format)
+
+def export_query_range(start_utc, end_utc):
+    """UTC datetime -> InfluxDB 쿼리용 RFC3339 문자열"""
+    start_rfc = start_utc.strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3] + 'Z'
+    end_rfc = end_utc.strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3] + 'Z'
+    print(f"🔍 InfluxDB 쿼리 범위: start={start_rfc}, end={end_rfc}")
+    return start_rfc, end_rfc
+
+def open_temperature_export(start_utc, end_utc):
+    """온도 내보내기 쿼리 실행 -> (첫 블록, 나머지 블록 스트림) (범위에 데이터가 없으면 첫 블록은 None)"""
+    start_rfc, end_rfc = export_query_range(start_utc, end_utc)
+    query = f'''
         from(bucket: "{INFLUXDB_BUCKET}")
           |> range(start: {start_rfc}, stop: {end_rfc})
           |> filter(fn: (r) => r["_measurement"] == "temperature")
           |> filter(fn: (r) => r["_field"] == "value")
+          |> group(columns: ["_measurement", "_field"])  // 마스터/포트 태그별 시리즈를 하나로 합침
           |> sort(columns: ["_time"])
         '''
-        
-        print(f"📊 Flux 쿼리:\n{query}")
-        
-        result = query_api.query(org=INFLUXDB_ORG, query=query)
-        
-        # 6. CSV 생성
-        output = io.StringIO()
-        writer = csv.writer(output)
-        
-        # UTF-8 BOM 추가 (Excel 호환성)
-        output.write('\ufeff')
-        
-        # 헤더 작성
-        writer.writerow(['Time (UTC)', 'Time (KST)', 'Temperature (°C)'])
-        
-        # 데이터 행 추가
-        row_count = 0
-        for table in result:
-            for record in table.records:
-                time_utc = record.get_time()
-                
-                # timezone-aware인 경우 naive로 변환
-                if time_utc.tzinfo is not None:
-                    time_utc_naive = time_utc.replace(tzinfo=None)
-                else:
-                    time_utc_naive = time_utc
-                
-                # Python 레벨에서 정확한 범위 체크
-                if time_utc_naive < start_utc or time_utc_naive >= end_utc:
-                    continue
-                
-                # UTC → KST 변환 (UTC+9)
-                time_kst = time_utc_naive + timedelta(hours=9)
-                value = record.get_value()
-                
-                # 데이터가 없으면 "--"로 표시
-                if value is None:
-                    writer.writerow([
-                        time_utc_naive.strftime('%Y-%m-%d %H:%M:%S'),
-                        time_kst.strftime('%Y-%m-%d %H:%M:%S'),
-                        '--'
-                    ])
-                else:
-                    writer.writerow([
-                        time_utc_naive.strftime('%Y-%m-%d %H:%M:%S'),
-                        time_kst.strftime('%Y-%m-%d %H:%M:%S'),
-                        f'{value:.2f}'
-                    ])
-                row_count += 1
-        
-        print(f"📈 조회된 레코드 수: {row_count}")
-        
-        # 데이터가 없는 경우
-        if row_count == 0:
-            return jsonify({'error': '선택한 시간 범위에 데이터가 없습니다.'}), 404
-        
-        # 파일명 생성
-        filename_start = start_time_kst_str.replace('-', '').replace(':', '').replace(' ', '_')
-        filename_end = end_time_kst_str.replace('-', '').replace(':', '').replace(' ', '_')
-        filename = f'temperature_{filename_start}_{filename_end}.csv'
-        
-        # UTF-8 BOM 포함하여 인코딩
-        csv_content = output.getvalue()
-        # 이미 output.write('\ufeff')로 BOM을 추가했으므로 utf-8로 인코딩
-        csv_bytes = csv_content.encode('utf-8')
-        
-        # HTTP 응답 생성
-        response = make_response(csv_bytes)
-        response.headers['Content-Type'] = 'text/csv; charset=utf-8'
-        response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
-        response.headers['Content-Length'] = len(csv_bytes)
-        
-        print(f"✅ CSV 생성 완료: {row_count}개 행, 파일명: {filename}")
-        
-        return response
-        
-    except ValueError as e:
-        return jsonify({'error': f'시간 형식이 올바르지 않습니다. 형식: YYYY-MM-DD HH:MM:SS. 오류: {e}'}), 400
-    except Exception as e:
-        print(f"❌ CSV 내보내기 실패: {e}")
-        import traceback
-        traceback.print_exc()
-        return jsonify({'error': str(e)}), 500
+    print(f"📊 Flux 쿼리:\n{query}")
+    blocks = in_range_blocks(
+        stream_columns(query_api, INFLUXDB_ORG, query, ('_time', '_value'), EXPORT_CHUNK_ROWS), start_utc, end_utc
+    )
+    return next(blocks, None), blocks
 
-@app.route('/api/export/vibration/csv', methods=['GET'])
-def export_vibration_csv():
-    """진동센서 데이터를 CSV 파일로 내보내기 (KST 시간 범위 지정)"""
+def vibration_export_query(bucket, start_rfc, end_rfc):
+    """진동 내보내기용 Flux 쿼리 (초 단위로 맞춘 뒤 필드를 컬럼으로 pivot, 시간순)"""
+    return f'''
+        from(bucket: "{bucket}")
+          |> range(start: {start_rfc}, stop: {end_rfc})
+          |> filter(fn: (r) => r["_measurement"] == "vibration")
+          |> filter(fn: (r) => r["_field"] == "v_rms" or r["_field"] == "a_peak" or r["_field"] == "a_rms" or r["_field"] == "crest")
+          |> truncateTimeColumn(unit: 1s)  // 같은 초의 필드를 한 행으로 모음
+          |> group(columns: ["_measurement"])  // 마스터/포트 태그별 시리즈를 하나로 합침
+          |> pivot(rowKey: ["_time"], columnKey: ["_field"], valueColumn: "_value")
+          |> sort(columns: ["_time"])
+        '''
+
+def open_vibration_export(start_utc, end_utc):
+    """진동 내보내기 쿼리 실행 -> (첫 블록, 나머지 블록 스트림) (vibration_data 버킷 실패 시 temperature_data 버킷)"""
+    start_rfc, end_rfc = export_query_range(start_utc, end_utc)
+    columns = ('_time', 'v_rms', 'a_peak', 'a_rms', 'crest')
+    query = vibration_export_query(VIBRATION_INFLUXDB_BUCKET, start_rfc, end_rfc)
+    print(f"📊 Flux 쿼리:\n{query}")
+    try:
+        blocks = in_range_blocks(
+            stream_columns(query_api, INFLUXDB_ORG, query, columns, EXPORT_CHUNK_ROWS), start_utc, end_utc
+        )
+        return next(blocks, None), blocks
+    except Exception as bucket_error:
+        # vibration_data 버킷이 없으면 temperature_data 버킷에서 조회
+        print(f"⚠️ Failed to query {VIBRATION_INFLUXDB_BUCKET} bucket: {bucket_error}")
+        print(f"⚠️ Trying to query {INFLUXDB_BUCKET} bucket as fallback...")
+        query = vibration_export_query(INFLUXDB_BUCKET, start_rfc, end_rfc)
+        blocks = in_range_blocks(
+            stream_columns(query_api, INFLUXDB_ORG, query, columns, EXPORT_CHUNK_ROWS), start_utc, end_utc
+        )
+        return next(blocks, None), blocks
+
+def open_joined_export(start_utc, end_utc):
+    """온도 행마다 EXPORT_JOIN_TOLERANCE 이내에서 가장 가까운 진동 행을 붙여 내보내기
+
+    두 쿼리 결과(모두 시간순)를 블록 단위로 한 번에 병합 (asof_join, train_model.py의 merge_asof와 같은 기준)
+    -> (첫 블록, 나머지 블록 스트림) (온도 데이터가 없으면 첫 블록은 None)
+    """
+    temperature_first, temperature_blocks = open_temperature_export(start_utc, end_utc)
+    if temperature_first is None:
+        return None, temperature_blocks
+    # 범위 양 끝의 온도 행도 범위 밖 진동 행과 맞출 수 있도록 진동은 tolerance만큼 넓혀 조회
+    tolerance = timedelta(seconds=EXPORT_JOIN_TOLERANCE)
+    try:
+        vibration_first, vibration_blocks = open_vibration_export(start_utc - tolerance, end_utc + tolerance)
+    except BaseException:
+        temperature_blocks.close()
+        raise
+
+    def joined():
+        try:
+            yield from asof_join_blocks(
+                chain_blocks(temperature_first, temperature_blocks),
+                chain_blocks(vibration_first, vibration_blocks),
+                [column.source for column in VIBRATION_EXPORT_COLUMNS],
+                EXPORT_JOIN_TOLERANCE
+            )
+        finally:
+            temperature_blocks.close()
+            vibration_blocks.close()
+
+    blocks = joined()
+    return next(blocks, None), blocks
+
+# 내보내기 종류 -> (쿼리 실행 함수, 내보낼 컬럼, 로그 라벨)
+EXPORT_KINDS = {
+    'temperature': (open_temperature_export, TEMPERATURE_EXPORT_COLUMNS, '온도'),
+    'vibration': (open_vibration_export, VIBRATION_EXPORT_COLUMNS, '진동센서'),
+    'joined': (open_joined_export, TEMPERATURE_EXPORT_COLUMNS + VIBRATION_EXPORT_COLUMNS, '온도+진동')
+}
+
+def export_endpoint(kind):
+    """온도/진동 내보내기 공통 처리 (start_time_kst, end_time_kst, format 파라미터, 요청 스레드에서 바로 스트리밍)"""
     if not query_api:
         return jsonify({'error': 'InfluxDB 쿼리 API가 초기화되지 않았습니다.'}), 500
+    open_export, columns, label = EXPORT_KINDS[kind]
     
     try:
         # 1. KST 시간 파라미터 받기
@@ -1112,213 +1084,133 @@ def export_vibration_csv():
         if not start_time_kst_str or not end_time_kst_str:
             return jsonify({'error': '시작 시간과 종료 시간이 필요합니다.'}), 400
         
-        print(f"📥 진동센서 CSV 다운로드 요청: start_time_kst={start_time_kst_str}, end_time_kst={end_time_kst_str}")
+        # 파일 포맷 (csv, csv.gz, csv.zst, parquet)
+        try:
+            export_format = check_format(request.args.get('format', 'csv'))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        print(f"📥 {label} 내보내기 요청: start_time_kst={start_time_kst_str}, end_time_kst={end_time_kst_str}, format={export_format}")
         
-        # 2. KST 문자열 파싱
+        # 2. KST 문자열 파싱 + UTC 변환
         try:
-            start_kst = datetime.strptime(start_time_kst_str, '%Y-%m-%d %H:%M:%S')
-            end_kst = datetime.strptime(end_time_kst_str, '%Y-%m-%d %H:%M:%S')
+            start_utc, end_utc = parse_export_range(start_time_kst_str, end_time_kst_str)
         except ValueError as e:
             return jsonify({'error': f'시간 형식이 올바르지 않습니다. 형식: YYYY-MM-DD HH:MM:SS. 오류: {e}'}), 400
         
-        # 3. KST → UTC 변환 (KST = UTC + 9시간)
-        start_utc = start_kst - timedelta(hours=9)
-        end_utc = end_kst - timedelta(hours=9)
-        
         print(f"📅 변환된 UTC 시간: start={start_utc}, end={end_utc}")
         
-        # 4. RFC3339 형식으로 변환 (InfluxDB 쿼리용)
-        start_rfc = start_utc.strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3] + 'Z'
-        end_rfc = end_utc.strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3] + 'Z'
-        
-        print(f"🔍 InfluxDB 쿼리 범위: start={start_rfc}, end={end_rfc}")
-        
-        # 5. InfluxDB Flux 쿼리 실행 (모든 진동 필드 조회)
-        query = f'''
-        from(bucket: "{VIBRATION_INFLUXDB_BUCKET}")
-          |> range(start: {start_rfc}, stop: {end_rfc})
-          |> filter(fn: (r) => r["_measurement"] == "vibration")
-          |> filter(fn: (r) => r["_field"] == "v_rms" or r["_field"] == "a_peak" or r["_field"] == "a_rms" or r["_field"] == "crest")
-          |> sort(columns: ["_time"])
-        '''
-        
-        print(f"📊 Flux 쿼리:\n{query}")
-        
-        try:
-            result = query_api.query(org=INFLUXDB_ORG, query=query)
-        except Exception as bucket_error:
-            # vibration_data 버킷이 없으면 temperature_data 버킷에서 조회
-            print(f"⚠️ Failed to query {VIBRATION_INFLUXDB_BUCKET} bucket: {bucket_error}")
-            print(f"⚠️ Trying to query {INFLUXDB_BUCKET} bucket as fallback...")
-            query = f'''
-            from(bucket: "{INFLUXDB_BUCKET}")
-              |> range(start: {start_rfc}, stop: {end_rfc})
-              |> filter(fn: (r) => r["_measurement"] == "vibration")
-              |> filter(fn: (r) => r["_field"] == "v_rms" or r["_field"] == "a_peak" or r["_field"] == "a_rms" or r["_field"] == "crest")
-              |> sort(columns: ["_time"])
-            '''
-            result = query_api.query(org=INFLUXDB_ORG, query=query)
-        
-        # 6. 데이터를 시간별로 그룹화하여 CSV 생성
-        # 시간별로 모든 필드를 하나의 행에 모음
-        data_by_time = {}
-        
-        for table in result:
-            for record in table.records:
-                time_utc = record.get_time()
-                
-                # timezone-aware인 경우 naive로 변환
-                if time_utc.tzinfo is not None:
-                    time_utc_naive = time_utc.replace(tzinfo=None)
-                else:
-                    time_utc_naive = time_utc
-                
-                # Python 레벨에서 정확한 범위 체크
-                if time_utc_naive < start_utc or time_utc_naive >= end_utc:
-                    continue
-                
-                # 시간을 키로 사용
-                time_key = time_utc_naive.strftime('%Y-%m-%d %H:%M:%S')
-                
-                if time_key not in data_by_time:
-                    # UTC → KST 변환 (UTC+9)
-                    time_kst = time_utc_naive + timedelta(hours=9)
-                    data_by_time[time_key] = {
-                        'time_utc': time_utc_naive,
-                        'time_kst': time_kst,
-                        'v_rms': None,
-                        'a_peak': None,
-                        'a_rms': None,
-                        'crest': None
-                    }
-                
-                # 필드 값 저장
-                field = record.get_field()
-                value = record.get_value()
-                if field in data_by_time[time_key]:
-                    data_by_time[time_key][field] = value
-        
-        # 7. CSV 생성
-        output = io.StringIO()
-        writer = csv.writer(output)
-        
-        # UTF-8 BOM 추가 (Excel 호환성)
-        output.write('\ufeff')
-        
-        # 헤더 작성
-        writer.writerow(['Time (UTC)', 'Time (KST)', 'v-RMS (mm/s)', 'a-Peak (m/s²)', 'a-RMS (m/s²)', 'Crest'])
-        
-        # 데이터 행 추가 (시간순 정렬)
-        row_count = 0
-        for time_key in sorted(data_by_time.keys()):
-            row_data = data_by_time[time_key]
-            time_utc_str = row_data['time_utc'].strftime('%Y-%m-%d %H:%M:%S')
-            time_kst_str = row_data['time_kst'].strftime('%Y-%m-%d %H:%M:%S')
-            
-            # 값 포맷팅 (None이면 "--"로 표시)
-            v_rms = '--' if row_data['v_rms'] is None else f"{row_data['v_rms']:.4f}"
-            a_peak = '--' if row_data['a_peak'] is None else f"{row_data['a_peak']:.2f}"
-            a_rms = '--' if row_data['a_rms'] is None else f"{row_data['a_rms']:.2f}"
-            crest = '--' if row_data['crest'] is None else f"{row_data['crest']:.2f}"
-            
-            writer.writerow([time_utc_str, time_kst_str, v_rms, a_peak, a_rms, crest])
-            row_count += 1
-        
-        print(f"📈 조회된 레코드 수: {row_count}")
+        # 3. InfluxDB Flux 쿼리 실행 (결과는 EXPORT_CHUNK_ROWS행씩 읽음)
+        first_block, blocks = open_export(start_utc, end_utc)
         
         # 데이터가 없는 경우
-        if row_count == 0:
+        if first_block is None:
             return jsonify({'error': '선택한 시간 범위에 데이터가 없습니다.'}), 404
         
-        # 파일명 생성
-        filename_start = start_time_kst_str.replace('-', '').replace(':', '').replace(' ', '_')
-        filename_end = end_time_kst_str.replace('-', '').replace(':', '').replace(' ', '_')
-        filename = f'vibration_{filename_start}_{filename_end}.csv'
-        
-        # UTF-8 BOM 포함하여 인코딩
-        csv_content = output.getvalue()
-        csv_bytes = csv_content.encode('utf-8')
-        
-        # HTTP 응답 생성
-        response = make_response(csv_bytes)
-        response.headers['Content-Type'] = 'text/csv; charset=utf-8'
-        response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
-        response.headers['Content-Length'] = len(csv_bytes)
-        
-        print(f"✅ 진동센서 CSV 생성 완료: {row_count}개 행, 파일명: {filename}")
-        
-        return response
+        # 4. 스트리밍 응답 생성 (값이 없으면 CSV는 "--", Parquet은 null)
+        filename = export_filename(kind, start_time_kst_str, end_time_kst_str, export_format)
+        return export_response(first_block, blocks, columns, export_format, filename, label)
         
-    except ValueError as e:
-        return jsonify({'error': f'시간 형식이 올바르지 않습니다. 형식: YYYY-MM-DD HH:MM:SS. 오류: {e}'}), 400
     except Exception as e:
-        print(f"❌ 진동센서 CSV 내보내기 실패: {e}")
+        print(f"❌ {label} 내보내기 실패: {e}")
         import traceback
         traceback.print_exc()
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/export/temperature/csv', methods=['GET'])
+def export_temperature_csv():
+    """온도 데이터를 CSV/압축 CSV/Parquet 파일로 내보내기 (KST 시간 범위 지정, 쿼리 결과를 블록 단위로 스트리밍)"""
+    return export_endpoint('temperature')
+
+@app.route('/api/export/vibration/csv', methods=['GET'])
+def export_vibration_csv():
+    """진동센서 데이터를 CSV/압축 CSV/Parquet 파일로 내보내기 (KST 시간 범위 지정, 쿼리 결과를 블록 단위로 스트리밍)"""
+    return export_endpoint('vibration')
+
+@app.route('/api/export/joined/csv', methods=['GET'])
+def export_joined_csv():
+    """온도 + 진동센서 데이터를 시간 정렬해 한 파일로 내보내기 (온도 시각 기준, 가장 가까운 진동 행을 붙임)"""
+    return export_endpoint('joined')
+
+@app.route('/api/export/jobs', methods=['POST'])
+def create_export_job():
+    """내보내기 작업 생성 (본문: kind, start_time_kst, end_time_kst, format) -> 202 + 작업 상태
+
+    작업은 export_jobs 워커 풀에서 실행되어 EXPORT_JOB_DIR에 파일로 저장됨
+    같은 요청이 실행 중이면 그 작업을, 이미 끝난 범위의 완성 파일이 있으면 그 작업을 반환
+    """
+    if not query_api:
+        return jsonify({'error': 'InfluxDB 쿼리 API가 초기화되지 않았습니다.'}), 500
+    body = request.get_json(silent=True) or {}
+    kind = body.get('kind')
+    if kind not in EXPORT_KINDS:
+        return jsonify({'error': f'Unknown export kind: {kind}'}), 400
+    start_time_kst_str = body.get('start_time_kst')
+    end_time_kst_str = body.get('end_time_kst')
+    if not start_time_kst_str or not end_time_kst_str:
+        return jsonify({'error': '시작 시간과 종료 시간이 필요합니다.'}), 400
+    try:
+        export_format = check_format(body.get('format', 'csv'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    try:
+        start_utc, end_utc = parse_export_range(start_time_kst_str, end_time_kst_str)
+    except (TypeError, ValueError) as e:
+        return jsonify({'error': f'시간 형식이 올바르지 않습니다. 형식: YYYY-MM-DD HH:MM:SS. 오류: {e}'}), 400
+    open_export, columns, label = EXPORT_KINDS[kind]
+
+    def produce(job):
+        first_block, blocks = open_export(start_utc, end_utc)
+        if first_block is None:
+            raise ExportEmptyError('선택한 시간 범위에 데이터가 없습니다.')
+
+        def count(rows):
+            job.rows += rows
+
+        try:
+            yield from encode_blocks(chain_blocks(first_block, blocks, count), columns, export_format)
+        finally:
+            blocks.close()
+
+    job = export_jobs.submit(
+        (kind, start_time_kst_str, end_time_kst_str, export_format),
+        export_filename(kind, start_time_kst_str, end_time_kst_str, export_format),
+        content_type_for(export_format),
+        produce,
+        # 범위가 끝나고 늦게 도착하는 샘플까지 기다린 뒤 실행한 결과만 재사용 (결합 내보내기는 진동을 tolerance만큼 더 조회)
+        cacheable_after=end_utc.replace(tzinfo=timezone.utc).timestamp() + EXPORT_JOB_CACHE_GRACE
+        + (EXPORT_JOIN_TOLERANCE if kind == 'joined' else 0)
+    )
+    print(f"📥 {label} 내보내기 작업: {job.id} ({job.status}, format={export_format})")
+    return jsonify(job.to_json()), 202
+
+@app.route('/api/export/jobs/<job_id>', methods=['GET'])
+def get_export_job(job_id):
+    """내보내기 작업 상태 (status, 처리한 행 수/바이트 수)"""
+    job = export_jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Export job not found'}), 404
+    return jsonify(job.to_json())
+
+@app.route('/api/export/jobs/<job_id>/download', methods=['GET'])
+def download_export_job(job_id):
+    """완성된 내보내기 파일 다운로드 (Range 요청으로 이어받기 지원)"""
+    job = export_jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Export job not found'}), 404
+    if job.status != 'done':
+        return jsonify({**job.to_json(), 'error': job.error or f'Export job is {job.status}'}), 409
+    response = send_file(job.path, mimetype=job.content_type, as_attachment=True, download_name=job.filename,
+                         conditional=True, etag=True, max_age=0)
+    response.headers['Accept-Ranges'] = 'bytes'
+    return response
+
 # AI 관련 API 엔드포인트
 @app.route('/api/ai/augmented/temperature', methods=['GET'])
 def get_augmented_temperature():
     """증강된 온도 데이터 조회"""
     try:
-        if influx_client is None:
-            return jsonify({'error': 'InfluxDB not connected'}), 500
-        
-        range_param = request.args.get('range', '1h')
-        query_api = influx_client.query_api()
-        
-        now = datetime.utcnow()
-        if range_param == '1h':
-            start_time = now - timedelta(hours=1)
-            window_interval = '10s'
-        elif range_param == '6h':
-            start_time = now - timedelta(hours=6)
-            window_interval = '1m'
-        elif range_param == '24h':
-            start_time = now - timedelta(hours=24)
-            window_interval = '5m'
-        elif range_param == '7d':
-            start_time = now - timedelta(days=7)
-            window_interval = '30m'
-        else:
-            start_time = now - timedelta(hours=1)
-            window_interval = '10s'
-        
-        start_time_str = start_time.strftime('%Y-%m-%dT%H:%M:%SZ')
-        
-        query = f'''
-        from(bucket: "temperature_augmented")
-          |> range(start: {start_time_str})
-          |> filter(fn: (r) => r["_measurement"] == "temperature")
-          |> filter(fn: (r) => r["_field"] == "value")
-          |> aggregateWindow(every: {window_interval}, fn: mean, createEmpty: true)
-          |> yield(name: "mean")
-        '''
-        
-        result = query_api.query(org=INFLUXDB_ORG, query=query)
-        
-        timestamps = []
-        values = []
-        
-        for table in result:
-            for record in table.records:
-                timestamp = record.get_time().timestamp() * 1000
-                value = record.get_value()
-                timestamps.append(timestamp)
-                values.append(value if value is not None else None)
-        
-        if timestamps and values:
-            sorted_data = sorted(zip(timestamps, values))
-            timestamps, values = zip(*sorted_data)
-            timestamps = list(timestamps)
-            values = list(values)
-        
-        return jsonify({
-            'timestamps': timestamps,
-            'values': values,
-            'count': len(values)
-        })
+        return history_endpoint('temperature_augmented', 'temperature', TEMPERATURE_FIELDS, 'temperature')
         
     except Exception as e:
         print(f"❌ Error querying augmented temperature: {e}")
@@ -1330,90 +1222,7 @@ def get_augmented_temperature():
 def get_augmented_vibration():
     """증강된 진동 데이터 조회"""
     try:
-        if influx_client is None:
-            return jsonify({'error': 'InfluxDB not connected'}), 500
-        
-        range_param = request.args.get('range', '1h')
-        query_api = influx_client.query_api()
-        
-        now = datetime.utcnow()
-        if range_param == '1h':
-            start_time = now - timedelta(hours=1)
-            window_interval = '10s'
-        elif range_param == '6h':
-            start_time = now - timedelta(hours=6)
-            window_interval = '1m'
-        elif range_param == '24h':
-            start_time = now - timedelta(hours=24)
-            window_interval = '5m'
-        elif range_param == '7d':
-            start_time = now - timedelta(days=7)
-            window_interval = '30m'
-        else:
-            start_time = now - timedelta(hours=1)
-            window_interval = '10s'
-        
-        start_time_str = start_time.strftime('%Y-%m-%dT%H:%M:%SZ')
-        
-        query = f'''
-        from(bucket: "vibration_augmented")
-          |> range(start: {start_time_str})
-          |> filter(fn: (r) => r["_measurement"] == "vibration")
-          |> filter(fn: (r) => r["_field"] == "v_rms" or r["_field"] == "a_peak" or r["_field"] == "a_rms" or r["_field"] == "crest" or r["_field"] == "temperature")
-          |> aggregateWindow(every: {window_interval}, fn: mean, createEmpty: true)
-          |> yield(name: "mean")
-        '''
-        
-        result = query_api.query(org=INFLUXDB_ORG, query=query)
-        
-        timestamps = []
-        v_rms_values = []
-        a_peak_values = []
-        a_rms_values = []
-        crest_values = []
-        temperature_values = []
-        
-        for table in result:
-            for record in table.records:
-                timestamp_ms = int(record.get_time().timestamp() * 1000)
-                field = record.get_field()
-                value = record.get_value()
-                
-                if timestamp_ms not in timestamps:
-                    timestamps.append(timestamp_ms)
-                    v_rms_values.append(None)
-                    a_peak_values.append(None)
-                    a_rms_values.append(None)
-                    crest_values.append(None)
-                    temperature_values.append(None)
-                
-                idx = timestamps.index(timestamp_ms)
-                
-                if field == 'v_rms':
-                    v_rms_values[idx] = value
-                elif field == 'a_peak':
-                    a_peak_values[idx] = value
-                elif field == 'a_rms':
-                    a_rms_values[idx] = value
-                elif field == 'crest':
-                    crest_values[idx] = value
-                elif field == 'temperature':
-                    temperature_values[idx] = value
-        
-        sorted_data = sorted(zip(timestamps, v_rms_values, a_peak_values, a_rms_values, crest_values, temperature_values))
-        if sorted_data:
-            timestamps, v_rms_values, a_peak_values, a_rms_values, crest_values, temperature_values = zip(*sorted_data)
-        else:
-            timestamps, v_rms_values, a_peak_values, a_rms_values, crest_values, temperature_values = [], [], [], [], [], []
-        
-        return jsonify({
-            'timestamps': list(timestamps),
-            'v_rms': list(v_rms_values),
-            'a_peak': list(a_peak_values),
-            'a_rms': list(a_rms_values),
-            'crest': list(crest_values),
-            'temperature': list(temperature_values)
-        })
+        return history_endpoint('vibration_augmented', 'vibration', HISTORY_VIBRATION_FIELDS, 'vibration')
     except Exception as e:
         print(f"❌ Error querying augmented vibration: {e}")
         import traceback
@@ -1424,63 +1233,7 @@ def get_augmented_vibration():
 def get_original_temperature():
     """원본 온도 데이터 조회"""
     try:
-        if influx_client is None:
-            return jsonify({'error': 'InfluxDB not connected'}), 500
-        
-        range_param = request.args.get('range', '1h')
-        query_api = influx_client.query_api()
-        
-        now = datetime.utcnow()
-        if range_param == '1h':
-            start_time = now - timedelta(hours=1)
-            window_interval = '10s'
-        elif range_param == '6h':
-            start_time = now - timedelta(hours=6)
-            window_interval = '1m'
-        elif range_param == '24h':
-            start_time = now - timedelta(hours=24)
-            window_interval = '5m'
-        elif range_param == '7d':
-            start_time = now - timedelta(days=7)
-            window_interval = '30m'
-        else:
-            start_time = now - timedelta(hours=1)
-            window_interval = '10s'
-        
-        start_time_str = start_time.strftime('%Y-%m-%dT%H:%M:%SZ')
-        
-        query = f'''
-        from(bucket: "{INFLUXDB_BUCKET}")
-          |> range(start: {start_time_str})
-          |> filter(fn: (r) => r["_measurement"] == "temperature")
-          |> filter(fn: (r) => r["_field"] == "value")
-          |> aggregateWindow(every: {window_interval}, fn: mean, createEmpty: true)
-          |> yield(name: "mean")
-        '''
-        
-        result = query_api.query(org=INFLUXDB_ORG, query=query)
-        
-        timestamps = []
-        values = []
-        
-        for table in result:
-            for record in table.records:
-                timestamp = record.get_time().timestamp() * 1000
-                value = record.get_value()
-                timestamps.append(timestamp)
-                values.append(value if value is not None else None)
-        
-        if timestamps and values:
-            sorted_data = sorted(zip(timestamps, values))
-            timestamps, values = zip(*sorted_data)
-            timestamps = list(timestamps)
-            values = list(values)
-        
-        return jsonify({
-            'timestamps': timestamps,
-            'values': values,
-            'count': len(values)
-        })
+        return history_endpoint(INFLUXDB_BUCKET, 'temperature', TEMPERATURE_FIELDS, 'temperature')
         
     except Exception as e:
         print(f"❌ Error querying original temperature: {e}")
@@ -1492,130 +1245,15 @@ def get_original_temperature():
 def get_original_vibration():
     """원본 진동 데이터 조회"""
     try:
-        if influx_client is None:
-            return jsonify({'error': 'InfluxDB not connected'}), 500
-        
-        range_param = request.args.get('range', '1h')
-        query_api = influx_client.query_api()
-        
-        now = datetime.utcnow()
-        if range_param == '1h':
-            start_time = now - timedelta(hours=1)
-            window_interval = '10s'
-        elif range_param == '6h':
-            start_time = now - timedelta(hours=6)
-            window_interval = '1m'
-        elif range_param == '24h':
-            start_time = now - timedelta(hours=24)
-            window_interval = '5m'
-        elif range_param == '7d':
-            start_time = now - timedelta(days=7)
-            window_interval = '30m'
-        else:
-            start_time = now - timedelta(hours=1)
-            window_interval = '10s'
-        
-        start_time_str = start_time.strftime('%Y-%m-%dT%H:%M:%SZ')
-        
-        query = f'''
-        from(bucket: "{VIBRATION_INFLUXDB_BUCKET}")
-          |> range(start: {start_time_str})
-          |> filter(fn: (r) => r["_measurement"] == "vibration")
-          |> filter(fn: (r) => r["_field"] == "v_rms" or r["_field"] == "a_peak" or r["_field"] == "a_rms" or r["_field"] == "crest" or r["_field"] == "temperature")
-          |> aggregateWindow(every: {window_interval}, fn: mean, createEmpty: true)
-          |> yield(name: "mean")
-        '''
-        
-        try:
-            result = query_api.query(org=INFLUXDB_ORG, query=query)
-        except Exception as bucket_error:
-            # vibration_data 버킷이 없으면 temperature_data 버킷에서 조회
-            print(f"⚠️ Failed to query {VIBRATION_INFLUXDB_BUCKET} bucket: {bucket_error}")
-            print(f"⚠️ Trying to query {INFLUXDB_BUCKET} bucket as fallback...")
-            try:
-                query = f'''
-                from(bucket: "{INFLUXDB_BUCKET}")
-                  |> range(start: {start_time_str})
-                  |> filter(fn: (r) => r["_measurement"] == "vibration")
-                  |> filter(fn: (r) => r["_field"] == "v_rms" or r["_field"] == "a_peak" or r["_field"] == "a_rms" or r["_field"] == "crest" or r["_field"] == "temperature")
-                  |> aggregateWindow(every: {window_interval}, fn: mean, createEmpty: true)
-                  |> yield(name: "mean")
-                '''
-                result = query_api.query(org=INFLUXDB_ORG, query=query)
-            except Exception as fallback_error:
-                print(f"❌ Failed to query fallback bucket: {fallback_error}")
-                # 빈 데이터 반환
-                return jsonify({
-                    'timestamps': [],
-                    'v_rms': [],
-                    'a_peak': [],
-                    'a_rms': [],
-                    'crest': [],
-                    'temperature': []
-                })
-        
-        timestamps = []
-        v_rms_values = []
-        a_peak_values = []
-        a_rms_values = []
-        crest_values = []
-        temperature_values = []
-        
-        for table in result:
-            for record in table.records:
-                timestamp_ms = int(record.get_time().timestamp() * 1000)
-                field = record.get_field()
-                value = record.get_value()
-                
-                if timestamp_ms not in timestamps:
-                    timestamps.append(timestamp_ms)
-                    v_rms_values.append(None)
-                    a_peak_values.append(None)
-                    a_rms_values.append(None)
-                    crest_values.append(None)
-                    temperature_values.append(None)
-                
-                idx = timestamps.index(timestamp_ms)
-                
-                if field == 'v_rms':
-                    v_rms_values[idx] = value
-                elif field == 'a_peak':
-                    a_peak_values[idx] = value
-                elif field == 'a_rms':
-                    a_rms_values[idx] = value
-                elif field == 'crest':
-                    crest_values[idx] = value
-                elif field == 'temperature':
-                    temperature_values[idx] = value
-        
-        sorted_data = sorted(zip(timestamps, v_rms_values, a_peak_values, a_rms_values, crest_values, temperature_values))
-        if sorted_data:
-            timestamps, v_rms_values, a_peak_values, a_rms_values, crest_values, temperature_values = zip(*sorted_data)
-        else:
-            timestamps, v_rms_values, a_peak_values, a_rms_values, crest_values, temperature_values = [], [], [], [], [], []
-        
-        return jsonify({
-            'timestamps': list(timestamps),
-            'v_rms': list(v_rms_values),
-            'a_peak': list(a_peak_values),
-            'a_rms': list(a_rms_values),
-            'crest': list(crest_values),
-            'temperature': list(temperature_values)
-        })
+        # vibration_data 버킷이 없으면 temperature_data 버킷에서 조회
+        return history_endpoint(VIBRATION_INFLUXDB_BUCKET, 'vibration', HISTORY_VIBRATION_FIELDS, 'vibration',
+                                fallback_bucket=INFLUXDB_BUCKET)
     except Exception as e:
         print(f"❌ Error querying original vibration: {e}")
         import traceback
         traceback.print_exc()
         # 에러가 발생해도 빈 데이터 반환 (500 에러 대신)
-        return jsonify({
-            'timestamps': [],
-            'v_rms': [],
-            'a_peak': [],
-            'a_rms': [],
-            'crest': [],
-            'temperature': [],
-            'error': str(e)
-        })
+        return jsonify({**empty_vibration_json(), 'error': str(e)})
 
 @app.route('/api/ai/augment/temperature', methods=['POST'])
 def run_temperature_augmentation():
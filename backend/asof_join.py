@@ -0,0 +1,94 @@
+"""
+시간 정렬 조인 모듈 (스트리밍 merge_asof)
+- 시간순 블록 스트림 두 개를 한 번에 병합: 왼쪽 행마다 tolerance 이내에서 가장 가까운 오른쪽 행의 컬럼을 붙임
+  (pandas.merge_asof(direction='nearest', tolerance=...)와 같은 결과, 거리가 같으면 이전 행)
+- 오른쪽 스트림은 현재 왼쪽 블록 끝 + tolerance까지만 미리 읽고, 이후 왼쪽 행과 맞을 수 없는 행은 버림
+  (메모리 사용량은 블록 크기 + tolerance 구간의 행 수로 일정)
+- 블록은 {컬럼 이름: NumPy 배열} (flux_reader.stream_columns), 시간 컬럼은 '_time'
+"""
+import numpy as np
+
+from time_columns import as_datetime64
+
+_EMPTY_TIMES = np.empty(0, dtype='datetime64[ns]')
+
+
+class _RightBuffer:
+    """아직 왼쪽 행과 맞을 수 있는 오른쪽 행 (시간 + 붙일 컬럼)"""
+
+    __slots__ = ('times', 'columns')
+
+    def __init__(self, names):
+        self.times = _EMPTY_TIMES
+        self.columns = {name: np.empty(0) for name in names}
+
+    def extend(self, blocks):
+        if not blocks:
+            return
+        self.times = np.concatenate([self.times] + [as_datetime64(block['_time']) for block in blocks])
+        for name, values in self.columns.items():
+            self.columns[name] = np.concatenate([values] + [np.asarray(block[name], dtype=np.float64) for block in blocks])
+
+    def drop_before(self, time):
+        start = np.searchsorted(self.times, time, side='left')
+        if start:
+            self.times = self.times[start:]
+            self.columns = {name: values[start:] for name, values in self.columns.items()}
+
+
+def nearest_indices(right_times, left_times, tolerance):
+    """왼쪽 시각마다 가장 가까운 오른쪽 행 인덱스와 tolerance 이내 여부 (거리가 같으면 이전 행)"""
+    count = len(right_times)
+    after = np.searchsorted(right_times, left_times, side='left')
+    before = after - 1
+    has_before = before >= 0
+    has_after = after < count
+    before = np.clip(before, 0, max(count - 1, 0))
+    after = np.clip(after, 0, max(count - 1, 0))
+    if not count:
+        return after, np.zeros(len(left_times), dtype=bool)
+    before_distance = left_times - right_times[before]
+    after_distance = right_times[after] - left_times
+    use_after = has_after & (~has_before | (after_distance < before_distance))
+    index = np.where(use_after, after, before)
+    distance = np.where(use_after, after_distance, before_distance)
+    return index, (has_before | has_after) & (distance <= tolerance)
+
+
+def asof_join_blocks(left_blocks, right_blocks, right_columns, tolerance):
+    """왼쪽 블록마다 오른쪽 컬럼(right_columns)을 붙인 블록 스트림 (맞는 행이 없으면 NaN)
+
+    tolerance: np.timedelta64 또는 초, 두 스트림 모두 '_time' 기준 시간순이어야 함
+    """
+    if not isinstance(tolerance, np.timedelta64):
+        tolerance = np.timedelta64(int(round(tolerance * 1e9)), 'ns')
+    buffer = _RightBuffer(right_columns)
+    right_blocks = iter(right_blocks)
+    right_done = False
+    for block in left_blocks:
+        times = as_datetime64(block['_time'])
+        if not len(times):
+            continue
+        # 이 블록의 마지막 행과 맞을 수 있는 오른쪽 행까지 읽음
+        horizon = times[-1] + tolerance
+        pending = []
+        last = buffer.times[-1] if len(buffer.times) else None
+        while not right_done and (last is None or last <= horizon):
+            right = next(right_blocks, None)
+            if right is None:
+                right_done = True
+            elif len(right['_time']):
+                pending.append(right)
+                last = as_datetime64(right['_time'])[-1]
+        buffer.extend(pending)
+
+        index, matched = nearest_indices(buffer.times, times, tolerance)
+        joined = dict(block)
+        for name, values in buffer.columns.items():
+            column = np.full(len(times), np.nan)
+            column[matched] = values[index[matched]]
+            joined[name] = column
+        yield joined
+
+        # 다음 왼쪽 행(이 블록 마지막 행 이후)과 맞을 수 없는 오른쪽 행은 버림
+        buffer.drop_before(times[-1] - tolerance)
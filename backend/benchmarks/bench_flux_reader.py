@@ -0,0 +1,109 @@
+"""
+Flux 결과 파싱 벤치마크
+- 기존 방식: query_api.query()와 같은 FluxCsvParser로 FluxTable/FluxRecord를 만든 뒤 get_time()/get_value()로 순회
+- 새 방식: query_raw() 응답을 flux_reader.query_columns로 바로 컬럼 배열로 읽음
+- 원본 버킷 조회 형태 (필드마다 테이블 하나, _time/_value/_field/_measurement), 빈 값 없음
+- 총 행 수별 지연시간 비교 (기본 100k, 1M)
+
+InfluxDB 없이 annotated CSV 응답 본문을 만들어 urllib3 HTTPResponse로 감싸서 측정
+실행: cd backend && python3 benchmarks/bench_flux_reader.py [행 수 ...]
+"""
+import io
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from influxdb_client.client.flux_csv_parser import FluxCsvParser, FluxSerializationMode  # noqa: E402
+from urllib3 import HTTPResponse  # noqa: E402
+
+from flux_reader import query_columns  # noqa: E402
+from time_columns import epoch_ms  # noqa: E402
+
+DEFAULT_ROW_COUNTS = [100000, 1000000]
+FIELDS = ('v_rms', 'a_peak', 'a_rms', 'crest')
+
+
+def make_raw_csv(rows, fields=FIELDS, seed=0):
+    """원본 버킷 조회 결과 형태의 annotated CSV 응답 본문 (bytes)"""
+    rng = random.Random(seed)
+    per_field = rows // len(fields)
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    times = [(start + timedelta(milliseconds=100 * i)).strftime('%Y-%m-%dT%H:%M:%S.%fZ') for i in range(per_field)]
+    out = io.StringIO()
+    for table, field in enumerate(fields):
+        out.write('#datatype,string,long,dateTime:RFC3339,double,string,string\r\n')
+        out.write('#group,false,false,false,false,true,true\r\n')
+        out.write('#default,_result,,,,,\r\n')
+        out.write(',result,table,_time,_value,_field,_measurement\r\n')
+        for t in times:
+            out.write(f',,{table},{t},{rng.random()!r},{field},vibration\r\n')
+        out.write('\r\n')
+    return out.getvalue().encode('utf-8')
+
+
+def make_response(body):
+    return HTTPResponse(body=io.BytesIO(body), preload_content=False)
+
+
+class FakeQueryApi:
+    """query_raw()만 흉내 (응답 본문을 그대로 돌려줌)"""
+
+    def __init__(self, body):
+        self.body = body
+
+    def query_raw(self, query, org=None):
+        return make_response(self.body)
+
+
+def read_records(body):
+    """기존 방식: FluxRecord 순회로 (시각 ms, 값) 리스트"""
+    parser = FluxCsvParser(response=make_response(body), serialization_mode=FluxSerializationMode.tables)
+    list(parser.generator())
+    times = []
+    values = []
+    for table in parser.table_list():
+        for record in table.records:
+            times.append(int(record.get_time().timestamp() * 1000))
+            values.append(record.get_value())
+    return times, values
+
+
+def read_arrays(body):
+    result = query_columns(FakeQueryApi(body), 'org', 'query', ('_time', '_value', '_field'))
+    return epoch_ms(result['_time']), result['_value']
+
+
+def bench(func, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    row_counts = [int(arg) for arg in sys.argv[1:]] or DEFAULT_ROW_COUNTS
+    print(f"{'rows':>9} {'size':>9} {'FluxRecord':>12} {'flux_reader':>12} {'speedup':>8}")
+    for rows in row_counts:
+        body = make_raw_csv(rows)
+
+        # 결과가 같은지 확인
+        times, values = read_records(body)
+        array_times, array_values = read_arrays(body)
+        assert array_times.tolist() == times, 'timestamp mismatch'
+        assert array_values.tolist() == values, 'value mismatch'
+
+        repeat = 3 if rows <= 200000 else 1
+        record_time = bench(lambda: read_records(body), repeat)
+        array_time = bench(lambda: read_arrays(body), repeat)
+        print(f"{len(times):>9} {len(body) / 1048576:>6.1f} MB {record_time:>10.2f} s {array_time:>10.2f} s "
+              f"{record_time / array_time:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+"""
+히스토리 응답 인코딩 벤치마크
+- JSON(jsonify와 같은 json.dumps) vs 바이너리 컬럼 포맷(columnar.encode_columns)
+- 진동 6컬럼(타임스탬프 + 5필드) 기준, 빈 구간(None) 5%
+- 인코딩 시간과 응답 크기 비교 (7d/30m=336, 24h/1m=1440, 24h/10s=8640 등)
+
+실행: cd backend && python3 benchmarks/bench_history_encoding.py [윈도우 수 ...]
+"""
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from bench_history_query import assemble_pivot, make_pivot_csv, make_times  # noqa: E402
+
+from columnar import decode_columns  # noqa: E402
+from history_query import VIBRATION_FIELDS, HistorySeries  # noqa: E402
+
+DEFAULT_WINDOW_COUNTS = [336, 1008, 1440, 8640, 60480]
+
+
+def bench(func, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    window_counts = [int(arg) for arg in sys.argv[1:]] or DEFAULT_WINDOW_COUNTS
+    print(f"{'windows':>8} {'json':>10} {'json size':>11} {'columnar':>10} {'col size':>10} {'speedup':>8}")
+    for count in window_counts:
+        timestamps, columns = assemble_pivot(make_pivot_csv(make_times(count), VIBRATION_FIELDS), VIBRATION_FIELDS)
+        series = HistorySeries('vibration_data', '10s', timestamps, columns, cursor=int(timestamps[-1]))
+
+        body = series.to_vibration_columnar()
+        _, decoded = decode_columns(body)
+        assert (decoded['timestamps'] == timestamps).all(), 'timestamp mismatch'
+
+        json_size = len(json.dumps(series.to_vibration_json()).encode('utf-8'))
+        json_time = bench(lambda: json.dumps(series.to_vibration_json()).encode('utf-8'), 5)
+        columnar_time = bench(series.to_vibration_columnar, 5)
+        print(f"{count:>8} {json_time * 1000:>7.2f} ms {json_size / 1024:>8.1f} KB "
+              f"{columnar_time * 1000:>7.2f} ms {len(body) / 1024:>7.1f} KB {json_time / columnar_time:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+"""
+히스토리 조회 결과 조립 벤치마크
+- 기존 방식: 필드별 레코드를 받아 `timestamp in list` / `list.index()`로 행 병합 (윈도우 수에 대해 O(n²))
+- 새 방식: pivot된 응답(시각당 한 행)을 flux_reader로 컬럼 배열로 읽어 변환 (history_query.assemble_columns)
+- 윈도우 수별 지연시간 비교 (1h/10s=360, 7d/30m=336, 24h/10s=8640 등)
+
+InfluxDB 없이 쿼리 결과를 합성해서 측정 (기존 방식은 FluxTable/FluxRecord, 새 방식은 annotated CSV 줄)
+실행: cd backend && python3 benchmarks/bench_history_query.py [윈도우 수 ...]
+"""
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from influxdb_client.client.flux_table import FluxRecord, FluxTable  # noqa: E402
+
+from flux_reader import read_columns  # noqa: E402
+from history_query import VIBRATION_FIELDS, assemble_columns  # noqa: E402
+
+DEFAULT_WINDOW_COUNTS = [60, 360, 1008, 2880, 8640]
+
+
+def make_times(count):
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    return [start + timedelta(seconds=10 * i) for i in range(count)]
+
+
+def make_field_tables(times, fields, seed=0):
+    """aggregateWindow 결과 형태: 필드마다 테이블 하나, 윈도우마다 레코드 하나"""
+    rng = random.Random(seed)
+    tables = []
+    for field in fields:
+        table = FluxTable()
+        for t in times:
+            value = None if rng.random() < 0.05 else rng.random()
+            table.records.append(FluxRecord(table, {'_time': t, '_field': field, '_value': value}))
+        tables.append(table)
+    return tables
+
+
+def make_pivot_csv(times, fields, seed=0):
+    """pivot 결과 형태의 annotated CSV 응답 줄: 테이블 하나, 윈도우마다 필드 컬럼을 가진 행 하나"""
+    rng = random.Random(seed)
+    lines = [
+        '#datatype,string,long,dateTime:RFC3339' + ',double' * len(fields) + '\r\n',
+        '#group,false,false,false' + ',false' * len(fields) + '\r\n',
+        '#default,_result,,' + ',' * len(fields) + '\r\n',
+        ',result,table,_time,' + ','.join(fields) + '\r\n'
+    ]
+    for t in times:
+        values = ['' if rng.random() < 0.05 else repr(rng.random()) for _ in fields]
+        lines.append(f",,0,{t.strftime('%Y-%m-%dT%H:%M:%SZ')},{','.join(values)}\r\n")
+    lines.append('\r\n')
+    return lines
+
+
+def assemble_pivot(lines, fields):
+    """새 방식: flux_reader로 컬럼 배열을 읽어 타임스탬프/값 배열로 변환"""
+    return assemble_columns(read_columns(lines, ('_time',) + tuple(fields)), fields)
+
+
+def assemble_legacy(result):
+    """기존 get_vibration_history 병합 루프"""
+    timestamps = []
+    v_rms_values = []
+    a_peak_values = []
+    a_rms_values = []
+    crest_values = []
+    temperature_values = []
+
+    for table in result:
+        for record in table.records:
+            timestamp_ms = int(record.get_time().timestamp() * 1000)
+            field = record.get_field()
+            value = record.get_value()
+
+            if timestamp_ms not in timestamps:
+                timestamps.append(timestamp_ms)
+                v_rms_values.append(None)
+                a_peak_values.append(None)
+                a_rms_values.append(None)
+                crest_values.append(None)
+                temperature_values.append(None)
+
+            idx = timestamps.index(timestamp_ms)
+
+            if field == 'v_rms':
+                v_rms_values[idx] = value
+            elif field == 'a_peak':
+                a_peak_values[idx] = value
+            elif field == 'a_rms':
+                a_rms_values[idx] = value
+            elif field == 'crest':
+                crest_values[idx] = value
+            elif field == 'temperature':
+                temperature_values[idx] = value
+
+    sorted_data = sorted(zip(timestamps, v_rms_values, a_peak_values, a_rms_values, crest_values, temperature_values))
+    if sorted_data:
+        return zip(*sorted_data)
+    return [], [], [], [], [], []
+
+
+def bench(func, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    window_counts = [int(arg) for arg in sys.argv[1:]] or DEFAULT_WINDOW_COUNTS
+    fields = VIBRATION_FIELDS
+    print(f"{'windows':>8} {'legacy merge':>14} {'pivot assemble':>16} {'speedup':>9}")
+    for count in window_counts:
+        times = make_times(count)
+        field_tables = make_field_tables(times, fields)
+        pivot_lines = make_pivot_csv(times, fields)
+
+        # 결과가 같은지 확인
+        legacy = [list(column) for column in assemble_legacy(field_tables)]
+        timestamps, columns = assemble_pivot(pivot_lines, fields)
+        assert legacy[0] == timestamps.tolist(), 'timestamp mismatch'
+
+        repeat = 5 if count <= 2000 else 1
+        legacy_time = bench(lambda: assemble_legacy(field_tables), repeat)
+        pivot_time = bench(lambda: assemble_pivot(pivot_lines, fields), max(repeat, 5))
+        print(f"{count:>8} {legacy_time * 1000:>11.2f} ms {pivot_time * 1000:>13.2f} ms {legacy_time / pivot_time:>8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,392 @@
+"""
+MQTT 수집 경로 처리량 벤치마크
+- 실제 IO-Link 마스터와 같은 JSON 형태(data.payload['/iolinkmaster/port[n]/iolinkdevice/pdin'])로
+  TP3237/VVB001 메시지를 합성
+- direct 모드: 각 MQTT 연결의 paho on_message 콜백을 직접 호출
+- mqtt 모드: 로컬 MQTT 브로커(mini_mqtt_broker)를 거쳐 app의 paho 클라이언트로 전달
+- InfluxDB는 로컬 HTTP 목(mock_influx_sink)으로 대체
+- msgs/s, decode->persist 지연시간 p50/p99, 메시지당 메모리 할당량 출력
+- 로깅 설정(기본/DEBUG 전체/속도 제한/샘플링)별 메시지당 처리 시간 출력
+- --connections N: 마스터 N대(master-<n>/TP3237 등)를 연결 N개로 나눠 수신
+- --save로 기준선 저장, --compare로 기준선 대비 변화율 출력
+
+실행: cd backend && python3 benchmarks/bench_ingest.py [--messages 20000] [--mode both]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from mini_mqtt_broker import MiniMqttBroker  # noqa: E402
+from mock_influx_sink import MockInfluxSink  # noqa: E402
+
+TEMPERATURE_TOPIC = 'TP3237'
+VIBRATION_TOPIC = 'VVB001'
+TEMPERATURE_PDIN = '/iolinkmaster/port[2]/iolinkdevice/pdin'
+VIBRATION_PDIN = '/iolinkmaster/port[1]/iolinkdevice/pdin'
+
+
+class FakeMessage:
+    """paho MQTTMessage 대신 on_message에 넘길 객체"""
+
+    __slots__ = ('topic', 'payload')
+
+    def __init__(self, topic, payload):
+        self.topic = topic
+        self.payload = payload
+
+
+def make_event(pdin_path, hex_data, cid):
+    """IO-Link 마스터 이벤트 메시지 형태로 감싸기"""
+    return json.dumps({
+        'code': 'event',
+        'cid': cid,
+        'adr': '',
+        'data': {
+            'eventno': str(cid),
+            'srcurl': '00-02-01-6D-55-8A/timer[1]/counter/datachanged',
+            'payload': {
+                '/timer[1]/counter': {'code': 200, 'data': cid},
+                pdin_path: {'code': 200, 'data': hex_data}
+            }
+        }
+    }).encode('utf-8')
+
+
+def make_vibration_hex(rng):
+    """VVB001 pdin 20바이트 (v-RMS, a-Peak, a-RMS, status, temperature, crest)"""
+    data = bytearray(20)
+    data[0:2] = rng.randint(0, 500).to_bytes(2, 'big', signed=True)
+    data[4:6] = rng.randint(0, 300).to_bytes(2, 'big', signed=True)
+    data[8:10] = rng.randint(0, 100).to_bytes(2, 'big', signed=True)
+    data[10] = rng.choice((0x00, 0x10, 0x20))
+    data[12:14] = rng.randint(200, 400).to_bytes(2, 'big', signed=True)
+    data[16:18] = rng.randint(10, 60).to_bytes(2, 'big', signed=True)
+    return data.hex().upper()
+
+
+def make_messages(count, vibration_ratio=0.5, seed=0, masters=1):
+    """(topic, payload bytes) 목록 생성 (masters > 1 이면 토픽 앞에 master-<n>/ 추가)"""
+    rng = random.Random(seed)
+    messages = []
+    for cid in range(count):
+        prefix = f'master-{cid % masters}/' if masters > 1 else ''
+        if rng.random() < vibration_ratio:
+            messages.append((prefix + VIBRATION_TOPIC, make_event(VIBRATION_PDIN, make_vibration_hex(rng), cid)))
+        else:
+            hex_data = f'{rng.randint(200, 350):04X}'
+            messages.append((prefix + TEMPERATURE_TOPIC, make_event(TEMPERATURE_PDIN, hex_data, cid)))
+    return messages
+
+
+def load_app(sink, broker, spool_dir, connections=1):
+    """목 서버를 가리키도록 환경 변수를 설정한 뒤 app 모듈 임포트"""
+    os.environ['INFLUXDB_URL'] = sink.url
+    os.environ['MQTT_BROKER'] = broker.host
+    os.environ['MQTT_PORT'] = str(broker.port)
+    os.environ['SPOOL_DIR'] = spool_dir
+    if connections > 1:
+        # 마스터 하나당 연결 하나 (와일드카드 구독, 토픽 첫 레벨이 마스터 ID)
+        os.environ['MQTT_CONNECTIONS'] = json.dumps([
+            {'name': f'bench-{n}', 'host': broker.host, 'port': broker.port, 'topics': [f'master-{n}/+']}
+            for n in range(connections)
+        ])
+    import app
+    return app
+
+
+def report(*args):
+    """벤치마크 결과 출력 (app 로그는 devnull로 보내고 결과만 터미널에)"""
+    print(*args, file=sys.__stdout__, flush=True)
+
+
+def _master_index(topic):
+    master, _, _ = topic.rpartition('/')
+    return int(master.rsplit('-', 1)[1]) if master else 0
+
+
+def snapshot_counters(app):
+    ingest = app.ingest_pipeline.get_stats()
+    writer = app.write_api.get_stats()
+    return {
+        'decode_processed': ingest['decode']['processed'],
+        'decode_dropped': ingest['decode']['dropped'],
+        'persist_dropped': ingest['persist']['dropped'],
+        'writer_dropped': writer['dropped_points'],
+        'decode_errors': ingest['decode']['errors'] + ingest['persist']['errors']
+    }
+
+
+def wait_for_drain(app, sink, expected_decoded, expected_temperature, before, timeout=60.0):
+    """디코딩이 끝나고 온도 포인트가 모두 목 InfluxDB에 도착할 때까지 대기 (진행이 멈추면 중단)"""
+    deadline = time.perf_counter() + timeout
+    last_progress = (-1, -1)
+    idle_since = time.perf_counter()
+    while time.perf_counter() < deadline:
+        counters = snapshot_counters(app)
+        decoded = counters['decode_processed'] - before['decode_processed']
+        persisted = sink.count('temperature')
+        dropped = sum(counters[k] - before[k] for k in ('decode_dropped', 'persist_dropped', 'writer_dropped'))
+        if decoded >= expected_decoded - dropped and persisted >= expected_temperature - dropped:
+            return True
+        if (decoded, persisted) != last_progress:
+            last_progress = (decoded, persisted)
+            idle_since = time.perf_counter()
+        elif time.perf_counter() - idle_since > 5.0:
+            return False
+        time.sleep(0.005)
+    return False
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def summarize(label, app, sink, messages, submit_elapsed, total_elapsed, before, drained):
+    counters = snapshot_counters(app)
+    latencies_ms = sorted(ns / 1e6 for ns in sink.latencies_ns)
+    result = {
+        'messages': len(messages),
+        'submit_msgs_per_s': round(len(messages) / submit_elapsed, 1),
+        'end_to_end_msgs_per_s': round(len(messages) / total_elapsed, 1),
+        'latency_p50_ms': round(percentile(latencies_ms, 0.50), 3) if latencies_ms else None,
+        'latency_p99_ms': round(percentile(latencies_ms, 0.99), 3) if latencies_ms else None,
+        'latency_max_ms': round(latencies_ms[-1], 3) if latencies_ms else None,
+        'persisted_temperature_points': sink.count('temperature'),
+        'persisted_vibration_points': sink.count('vibration'),
+        'dropped': {k: counters[k] - before[k] for k in ('decode_dropped', 'persist_dropped', 'writer_dropped')},
+        'errors': counters['decode_errors'] - before['decode_errors'],
+        'drained': drained
+    }
+    report(f"[{label}] {result['messages']} msgs  "
+           f"submit {result['submit_msgs_per_s']:,.0f} msg/s  "
+           f"end-to-end {result['end_to_end_msgs_per_s']:,.0f} msg/s")
+    report(f"[{label}] decode->persist latency p50 {result['latency_p50_ms']} ms  "
+           f"p99 {result['latency_p99_ms']} ms  max {result['latency_max_ms']} ms")
+    report(f"[{label}] persisted temperature={result['persisted_temperature_points']} "
+           f"vibration={result['persisted_vibration_points']}  dropped={result['dropped']}  "
+           f"errors={result['errors']}{'' if drained else '  (drain timeout)'}")
+    return result
+
+
+def run_direct(app, sink, messages):
+    """연결별 paho on_message 콜백 직접 호출 (메시지는 토픽의 마스터 번호로 연결에 분배)"""
+    clients = [connection.client for connection in app.ingest_manager.connections]
+    fake_messages = [
+        (clients[_master_index(topic) % len(clients)], FakeMessage(topic, payload)) for topic, payload in messages
+    ]
+    expected_temperature = sum(1 for topic, _ in messages if topic.endswith(TEMPERATURE_TOPIC))
+    sink.reset()
+    before = snapshot_counters(app)
+    started = time.perf_counter()
+    for client, msg in fake_messages:
+        client.on_message(client, None, msg)
+    submit_elapsed = time.perf_counter() - started
+    drained = wait_for_drain(app, sink, len(messages), expected_temperature, before)
+    total_elapsed = (sink.last_write_at or time.perf_counter()) - started
+    return summarize('direct', app, sink, messages, submit_elapsed, total_elapsed, before, drained)
+
+
+def run_mqtt(app, sink, broker, messages):
+    """로컬 브로커를 거쳐 app의 MQTT 클라이언트로 전달"""
+    import paho.mqtt.client as mqtt
+
+    deadline = time.perf_counter() + 10
+    manager = app.ingest_manager
+    while manager.get_stats()['connected'] < len(manager.connections) and time.perf_counter() < deadline:
+        time.sleep(0.05)
+    if manager.get_stats()['connected'] < len(manager.connections):
+        report('[mqtt] app MQTT clients did not connect to the local broker, skipping')
+        return None
+    time.sleep(0.2)  # 구독 완료 대기
+
+    publisher = mqtt.Client()
+    publisher.max_queued_messages_set(0)
+    publisher.connect(broker.host, broker.port, 60)
+    publisher.loop_start()
+
+    expected_temperature = sum(1 for topic, _ in messages if topic.endswith(TEMPERATURE_TOPIC))
+    sink.reset()
+    before = snapshot_counters(app)
+    started = time.perf_counter()
+    for topic, payload in messages:
+        publisher.publish(topic, payload, qos=0)
+    submit_elapsed = time.perf_counter() - started
+    drained = wait_for_drain(app, sink, len(messages), expected_temperature, before)
+    total_elapsed = (sink.last_write_at or time.perf_counter()) - started
+    publisher.loop_stop()
+    publisher.disconnect()
+    return summarize('mqtt', app, sink, messages, submit_elapsed, total_elapsed, before, drained)
+
+
+def measure_allocations(app, messages, sample=2000):
+    """디코딩+저장 경로를 동기 실행하며 메시지당 할당량 측정
+
+    - peak_bytes_per_msg: 메시지 하나 처리 중 tracemalloc 최대 증가량 (일시 할당)
+    - retained_blocks_per_msg: 처리 후 남은 메모리 블록 수 증가량 (누수/캐시 증가)
+    """
+    sample_messages = messages[:sample]
+    pipeline = app.ingest_pipeline
+    original_persist = pipeline.persist
+    # persist 스테이지를 같은 스레드에서 실행해야 메시지 하나의 할당이 한 구간에 잡힘
+    pipeline.persist = lambda key, func, *args: func(*args) or True
+    peaks = []
+    try:
+        # 워밍업 (라우트 캐시, 다운샘플러 구간 생성 등)
+        for topic, payload in sample_messages[:100]:
+            app.process_mqtt_message(topic, payload, time.time())
+        blocks_before = sys.getallocatedblocks()
+        tracemalloc.start()
+        for topic, payload in sample_messages:
+            tracemalloc.reset_peak()
+            current, _ = tracemalloc.get_traced_memory()
+            app.process_mqtt_message(topic, payload, time.time())
+            _, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - current)
+        tracemalloc.stop()
+        blocks_after = sys.getallocatedblocks()
+    finally:
+        pipeline.persist = original_persist
+    peaks.sort()
+    result = {
+        'sample': len(sample_messages),
+        'peak_bytes_per_msg_avg': round(sum(peaks) / len(peaks), 1),
+        'peak_bytes_per_msg_p99': percentile(peaks, 0.99),
+        'retained_blocks_per_msg': round((blocks_after - blocks_before) / len(sample_messages), 3)
+    }
+    report(f"[alloc] {result['sample']} msgs  peak {result['peak_bytes_per_msg_avg']:,.0f} B/msg avg "
+           f"(p99 {result['peak_bytes_per_msg_p99']:,} B)  retained {result['retained_blocks_per_msg']} blocks/msg")
+    return result
+
+
+# 로깅 오버헤드 측정 설정: (라벨, setup_logging 인자)
+LOGGING_PROFILES = [
+    ('default', {'level': 'INFO', 'levels': {}, 'rate_limit': 5, 'sample': {}}),
+    ('debug-unlimited', {'level': 'INFO', 'levels': {'ingest': 'DEBUG'}, 'rate_limit': 0, 'sample': {}}),
+    ('debug-rate-limited', {'level': 'INFO', 'levels': {'ingest': 'DEBUG'}, 'rate_limit': 5, 'sample': {}}),
+    ('debug-sampled-1/100', {'level': 'INFO', 'levels': {'ingest': 'DEBUG'}, 'rate_limit': 0, 'sample': {'ingest': 100}})
+]
+
+
+def measure_logging(app, messages, sample=5000):
+    """로깅 설정별 메시지당 처리 시간 (디코딩+저장 경로 동기 실행, 로그 출력은 devnull)"""
+    import log_config
+
+    sample_messages = messages[:sample]
+    pipeline = app.ingest_pipeline
+    original_persist = pipeline.persist
+    pipeline.persist = lambda key, func, *args: func(*args) or True
+    devnull = open(os.devnull, 'w')
+    results = {}
+    try:
+        for label, options in LOGGING_PROFILES:
+            log_config.setup_logging(stream=devnull, **options)
+            for topic, payload in sample_messages[:200]:
+                app.process_mqtt_message(topic, payload, time.time())
+            started = time.perf_counter()
+            for topic, payload in sample_messages:
+                app.process_mqtt_message(topic, payload, time.time())
+            elapsed = time.perf_counter() - started
+            log_config.shutdown_logging()  # 출력 스레드가 남은 로그를 모두 쓸 때까지 대기
+            total = time.perf_counter() - started
+            results[label] = {
+                'us_per_msg': round(elapsed / len(sample_messages) * 1e6, 2),
+                'us_per_msg_including_output': round(total / len(sample_messages) * 1e6, 2)
+            }
+            report(f"[log] {label:<20} {results[label]['us_per_msg']:8.2f} µs/msg  "
+                   f"(with output drain {results[label]['us_per_msg_including_output']:8.2f} µs/msg)")
+    finally:
+        pipeline.persist = original_persist
+        log_config.setup_logging()
+        devnull.close()
+    return results
+
+
+def compare(results, baseline):
+    """기준선 대비 변화율 출력"""
+    metrics = [
+        ('direct', 'submit_msgs_per_s', True),
+        ('direct', 'end_to_end_msgs_per_s', True),
+        ('direct', 'latency_p50_ms', False),
+        ('direct', 'latency_p99_ms', False),
+        ('mqtt', 'end_to_end_msgs_per_s', True),
+        ('mqtt', 'latency_p50_ms', False),
+        ('mqtt', 'latency_p99_ms', False),
+        ('alloc', 'peak_bytes_per_msg_avg', False),
+        ('alloc', 'retained_blocks_per_msg', False)
+    ]
+    metrics += [('logging', label, False) for label, _ in LOGGING_PROFILES]
+    report('\n=== baseline comparison ===')
+    for section, key, higher_is_better in metrics:
+        old = (baseline.get(section) or {}).get(key)
+        new = (results.get(section) or {}).get(key)
+        if isinstance(old, dict) and isinstance(new, dict):
+            old, new = old.get('us_per_msg'), new.get('us_per_msg')
+        if old is None or new is None:
+            continue
+        change = (new - old) / old * 100 if old else 0.0
+        better = change >= 0 if higher_is_better else change <= 0
+        report(f"{section:>7}.{key:<26} {old:>12,.3f} -> {new:>12,.3f}  {change:+7.1f}% {'✅' if better else '⚠️'}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='MQTT ingest throughput benchmark')
+    parser.add_argument('--messages', type=int, default=20000)
+    parser.add_argument('--mode', choices=('direct', 'mqtt', 'both'), default='both')
+    parser.add_argument('--vibration-ratio', type=float, default=0.5)
+    parser.add_argument('--connections', type=int, default=1, help='MQTT 연결(마스터) 수')
+    parser.add_argument('--alloc-sample', type=int, default=2000)
+    parser.add_argument('--log-sample', type=int, default=5000)
+    parser.add_argument('--save', help='결과를 기준선 JSON으로 저장')
+    parser.add_argument('--compare', help='기준선 JSON과 비교')
+    args = parser.parse_args()
+
+    # app 모듈의 메시지별 로그가 측정에 섞이지 않도록 stdout은 버림
+    sys.stdout = open(os.devnull, 'w')
+
+    sink = MockInfluxSink().start()
+    broker = MiniMqttBroker().start()
+    spool_dir = tempfile.mkdtemp(prefix='bench-ingest-spool-')
+    app = load_app(sink, broker, spool_dir, args.connections)
+    messages = make_messages(args.messages, args.vibration_ratio, masters=args.connections)
+    report(f"messages: {len(messages)} (vibration ratio {args.vibration_ratio}), "
+           f"payload ~{sum(len(p) for _, p in messages) // len(messages)} bytes")
+
+    results = {'config': vars(args)}
+    if args.mode in ('direct', 'both'):
+        results['direct'] = run_direct(app, sink, messages)
+    if args.mode in ('mqtt', 'both'):
+        results['mqtt'] = run_mqtt(app, sink, broker, messages)
+    results['alloc'] = measure_allocations(app, messages, args.alloc_sample)
+    results['logging'] = measure_logging(app, messages, args.log_sample)
+    results['metrics'] = {
+        'ingest': app.ingest_pipeline.get_stats(),
+        'influxdb_writer': app.write_api.get_stats()
+    }
+
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, default=str)
+        report(f"\n💾 Baseline saved: {args.save}")
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            compare(results, json.load(f))
+
+    app.vibration_downsampler.stop()
+    app.ingest_pipeline.stop()
+    app.write_api.close()
+    broker.stop()
+    sink.stop()
+
+
+if __name__ == '__main__':
+    main()
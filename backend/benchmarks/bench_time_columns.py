@@ -0,0 +1,92 @@
+"""
+시간 컬럼 변환 벤치마크
+- 기존 방식: 행마다 datetime 객체로 변환 (timestamp() * 1000, tzinfo 확인 + naive 변환, 파이썬 범위 비교, strftime 두 번)
+- 새 방식: time_columns (datetime64 배열 연산 + np.datetime_as_string)
+- 1 Hz 시각 배열 기준 (기본 10^6행), 변환별 지연시간 비교
+
+실행: cd backend && python3 benchmarks/bench_time_columns.py [행 수 ...]
+"""
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from time_columns import epoch_ms, kst_strings, range_mask, utc_strings  # noqa: E402
+
+DEFAULT_ROW_COUNTS = [1000000]
+
+
+def make_times(rows):
+    """epoch ns int64 배열 (2024-01-01부터 1초 간격, ms 단위 흔들림 포함)"""
+    start = np.datetime64('2024-01-01T00:00:00', 'ns').astype(np.int64)
+    jitter = np.random.default_rng(0).integers(0, 1000, rows) * 1000000
+    return start + np.arange(rows, dtype=np.int64) * 1000000000 + jitter
+
+
+def to_datetimes(times_ns):
+    """FluxRecord.get_time()과 같은 tz-aware datetime 목록"""
+    return [datetime.fromtimestamp(t / 1e9, tz=timezone.utc) for t in times_ns.tolist()]
+
+
+def rows_epoch_ms(datetimes):
+    return [int(dt.timestamp() * 1000) for dt in datetimes]
+
+
+def rows_export(datetimes, start, end):
+    """기존 내보내기 루프: tzinfo 확인 + naive 변환 + 범위 비교 + UTC/KST strftime"""
+    out = []
+    for dt in datetimes:
+        if dt.tzinfo is not None:
+            dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+        if dt < start or dt >= end:
+            continue
+        out.append((dt.strftime('%Y-%m-%d %H:%M:%S'), (dt + timedelta(hours=9)).strftime('%Y-%m-%d %H:%M:%S')))
+    return out
+
+
+def columns_export(times_ns, start, end):
+    times = times_ns[range_mask(times_ns, start, end)]
+    return list(zip(utc_strings(times), kst_strings(times)))
+
+
+def bench(func, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    row_counts = [int(arg) for arg in sys.argv[1:]] or DEFAULT_ROW_COUNTS
+    print(f"{'rows':>9} {'conversion':<24} {'datetime rows':>14} {'time_columns':>13} {'speedup':>8}")
+    for rows in row_counts:
+        times_ns = make_times(rows)
+        datetimes = to_datetimes(times_ns)
+        # 양 끝 10%를 잘라 범위 필터도 포함
+        start = datetime(2024, 1, 1) + timedelta(seconds=rows // 10)
+        end = datetime(2024, 1, 1) + timedelta(seconds=rows - rows // 10)
+
+        # 결과가 같은지 확인
+        assert epoch_ms(times_ns).tolist() == rows_epoch_ms(datetimes), 'epoch ms mismatch'
+        assert columns_export(times_ns, start, end) == rows_export(datetimes, start, end), 'export strings mismatch'
+
+        cases = [
+            ('epoch ms (history)', lambda: rows_epoch_ms(datetimes), lambda: epoch_ms(times_ns)),
+            ('filter + UTC/KST (export)', lambda: rows_export(datetimes, start, end),
+             lambda: columns_export(times_ns, start, end)),
+        ]
+        for name, rows_func, columns_func in cases:
+            rows_time = bench(rows_func, 3)
+            columns_time = bench(columns_func, 3)
+            print(f"{rows:>9} {name:<24} {rows_time * 1000:>11.1f} ms {columns_time * 1000:>10.1f} ms "
+                  f"{rows_time / columns_time:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,154 @@
+"""
+VVB001 디코더 마이크로벤치마크
+- 기존 decode_vvb001 (int.from_bytes 슬라이싱) 대비
+  struct 단일 메시지 경로와 NumPy 배치 경로의 메시지당 처리 시간 비교
+
+실행: cd backend && python3 benchmarks/bench_vvb001_decode.py [메시지 수]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from vvb001_decoder import (  # noqa: E402
+    DEVICE_STATUS_MAP, SPECIAL_VALUES, decode_vvb001, decode_vvb001_batch, decode_vvb001_buffer
+)
+
+
+def hex_to_bytes(hex_string):
+    """16진수 문자열을 바이트 배열로 변환"""
+    try:
+        return bytes.fromhex(hex_string)
+    except Exception as e:
+        print(f"❌ Error converting hex to bytes: {e}")
+        return None
+
+def check_special(value):
+    """특수 값 체크"""
+    if value in SPECIAL_VALUES:
+        return SPECIAL_VALUES[value]
+    return None
+
+def decode_vvb001_legacy(hex_data):
+    """기존 app.py 구현 (int.from_bytes 슬라이싱)"""
+    try:
+        if len(hex_data) != 40:  # 20바이트 = 40자
+            print(f"⚠️ Invalid hex data length: {len(hex_data)}, expected 40")
+            return None
+        
+        bytes_data = hex_to_bytes(hex_data)
+        if bytes_data is None or len(bytes_data) != 20:
+            return None
+        
+        # 빅 엔디안 형식으로 파싱
+        # bytes[0:2]: v-RMS (signed int16)
+        v_rms_raw = int.from_bytes(bytes_data[0:2], byteorder='big', signed=True)
+        v_rms = v_rms_raw * 0.0001  # 스케일: 0.0001
+        
+        # bytes[4:6]: a-Peak (signed int16)
+        a_peak_raw = int.from_bytes(bytes_data[4:6], byteorder='big', signed=True)
+        a_peak = a_peak_raw * 0.1  # 스케일: 0.1
+        
+        # bytes[8:10]: a-RMS (signed int16)
+        a_rms_raw = int.from_bytes(bytes_data[8:10], byteorder='big', signed=True)
+        a_rms = a_rms_raw * 0.1  # 스케일: 0.1
+        
+        # bytes[10]: device status
+        status_byte = bytes_data[10]
+        device_status_code = (status_byte >> 4) & 0x07
+        device_status = DEVICE_STATUS_MAP.get(device_status_code, f"Unknown({device_status_code})")
+        out1 = bool(status_byte & 0x01)
+        out2 = bool(status_byte & 0x02)
+        
+        # bytes[12:14]: temperature (signed int16)
+        temp_raw = int.from_bytes(bytes_data[12:14], byteorder='big', signed=True)
+        temperature = temp_raw * 0.1  # 스케일: 0.1
+        
+        # bytes[16:18]: crest (signed int16)
+        crest_raw = int.from_bytes(bytes_data[16:18], byteorder='big', signed=True)
+        crest = crest_raw * 0.1  # 스케일: 0.1
+        
+        # 특수 값 체크
+        v_rms_special = check_special(v_rms_raw)
+        a_peak_special = check_special(a_peak_raw)
+        a_rms_special = check_special(a_rms_raw)
+        temp_special = check_special(temp_raw)
+        crest_special = check_special(crest_raw)
+        
+        return {
+            'v_rms': v_rms if not v_rms_special else None,
+            'a_peak': a_peak if not a_peak_special else None,
+            'a_rms': a_rms if not a_rms_special else None,
+            'temperature': temperature if not temp_special else None,
+            'crest': crest if not crest_special else None,
+            'device_status': device_status,
+            'out1': out1,
+            'out2': out2,
+            'raw_values': {
+                'v_rms': v_rms_raw,
+                'a_peak': a_peak_raw,
+                'a_rms': a_rms_raw,
+                'temperature': temp_raw,
+                'crest': crest_raw,
+                'status_byte': status_byte
+            },
+            'special_values': {
+                'v_rms': v_rms_special,
+                'a_peak': a_peak_special,
+                'a_rms': a_rms_special,
+                'temperature': temp_special,
+                'crest': crest_special
+            }
+        }
+    except Exception as e:
+        print(f"❌ Error decoding VVB001 data: {e}")
+        import traceback
+        traceback.print_exc()
+        return None
+
+
+def make_payloads(count, seed=0):
+    """임의의 pdin 16진수 문자열 생성 (일부는 특수 값 포함)"""
+    rng = random.Random(seed)
+    specials = list(SPECIAL_VALUES.keys())
+    payloads = []
+    for _ in range(count):
+        words = []
+        for _ in range(10):
+            value = rng.choice(specials) if rng.random() < 0.02 else rng.randint(-2000, 2000)
+            words.append(value.to_bytes(2, 'big', signed=True))
+        data = bytearray(b''.join(words))
+        data[10] = rng.randint(0, 255)
+        payloads.append(data.hex())
+    return payloads
+
+
+def bench(label, func, count):
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {elapsed * 1000:9.1f} ms  {elapsed / count * 1e6:8.3f} µs/msg  {count / elapsed:12,.0f} msg/s")
+    return elapsed
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    payloads = make_payloads(count)
+    buffer = bytes.fromhex(''.join(payloads))
+
+    # 결과 일치 확인
+    for payload in payloads[:1000]:
+        assert decode_vvb001(payload) == decode_vvb001_legacy(payload), payload
+
+    print(f"📊 VVB001 decode benchmark ({count:,} messages)")
+    base = bench('legacy decode_vvb001', lambda: [decode_vvb001_legacy(p) for p in payloads], count)
+    single = bench('struct decode_vvb001', lambda: [decode_vvb001(p) for p in payloads], count)
+    batch = bench('numpy decode_vvb001_batch', lambda: decode_vvb001_batch(payloads), count)
+    raw = bench('numpy decode_vvb001_buffer', lambda: decode_vvb001_buffer(buffer), count)
+    print(f"⚡ speedup vs legacy: struct x{base / single:.1f}, batch x{base / batch:.1f}, buffer x{base / raw:.1f}")
+
+
+if __name__ == '__main__':
+    main()
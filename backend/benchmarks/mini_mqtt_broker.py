@@ -0,0 +1,146 @@
+"""
+벤치마크용 최소 MQTT 3.1.1 브로커
+- CONNECT / SUBSCRIBE / PUBLISH(QoS 0) / PINGREQ / DISCONNECT만 지원
+- 구독 토픽 필터의 +, # 와일드카드 지원
+- 외부 브로커 없이 paho 클라이언트 -> 브로커 -> 백엔드 경로를 재현하기 위한 용도
+"""
+import socketserver
+import threading
+
+CONNECT, CONNACK, PUBLISH, PUBACK, SUBSCRIBE, SUBACK = 1, 2, 3, 4, 8, 9
+PINGREQ, PINGRESP, DISCONNECT = 12, 13, 14
+
+
+def topic_matches(topic_filter, topic):
+    """MQTT 토픽 필터 매칭 (+: 한 레벨, #: 하위 전체)"""
+    filter_levels = topic_filter.split('/')
+    topic_levels = topic.split('/')
+    for i, level in enumerate(filter_levels):
+        if level == '#':
+            return True
+        if i >= len(topic_levels):
+            return False
+        if level != '+' and level != topic_levels[i]:
+            return False
+    return len(filter_levels) == len(topic_levels)
+
+
+def _read_exact(sock_file, size):
+    data = sock_file.read(size)
+    if len(data) < size:
+        raise ConnectionError('connection closed')
+    return data
+
+
+def _encode_length(length):
+    encoded = bytearray()
+    while True:
+        byte = length % 128
+        length //= 128
+        if length:
+            byte |= 0x80
+        encoded.append(byte)
+        if not length:
+            return bytes(encoded)
+
+
+class MiniMqttBroker:
+    """스레드 기반 인메모리 MQTT 브로커"""
+
+    def __init__(self, host='127.0.0.1', port=0):
+        self._lock = threading.Lock()
+        self._subscriptions = []  # (topic_filter, handler)
+        self.published = 0
+        self.forwarded = 0
+        broker = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def setup(self):
+                super().setup()
+                self.send_lock = threading.Lock()
+
+            def send(self, data):
+                with self.send_lock:
+                    self.wfile.write(data)
+                    self.wfile.flush()
+
+            def handle(self):
+                try:
+                    while True:
+                        header = _read_exact(self.rfile, 1)[0]
+                        length = 0
+                        multiplier = 1
+                        while True:
+                            byte = _read_exact(self.rfile, 1)[0]
+                            length += (byte & 0x7F) * multiplier
+                            multiplier *= 128
+                            if not byte & 0x80:
+                                break
+                        body = _read_exact(self.rfile, length) if length else b''
+                        if not broker._handle_packet(self, header, body):
+                            break
+                except (ConnectionError, OSError):
+                    pass
+                finally:
+                    broker._unsubscribe_all(self)
+
+        self.server = socketserver.ThreadingTCPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self.host = host
+        self.port = self.server.server_address[1]
+        self._thread = threading.Thread(target=self.server.serve_forever, name='mini-mqtt', daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _handle_packet(self, client, header, body):
+        packet_type = header >> 4
+        if packet_type == CONNECT:
+            client.send(bytes([CONNACK << 4, 2, 0, 0]))
+        elif packet_type == SUBSCRIBE:
+            packet_id = body[:2]
+            pos = 2
+            granted = bytearray()
+            while pos < len(body):
+                size = int.from_bytes(body[pos:pos + 2], 'big')
+                topic_filter = body[pos + 2:pos + 2 + size].decode('utf-8')
+                pos += 2 + size + 1
+                with self._lock:
+                    self._subscriptions.append((topic_filter, client))
+                granted.append(0)
+            payload = packet_id + bytes(granted)
+            client.send(bytes([SUBACK << 4]) + _encode_length(len(payload)) + payload)
+        elif packet_type == PUBLISH:
+            qos = (header >> 1) & 0x03
+            size = int.from_bytes(body[:2], 'big')
+            topic = body[2:2 + size].decode('utf-8')
+            pos = 2 + size
+            if qos:
+                client.send(bytes([PUBACK << 4, 2]) + body[pos:pos + 2])
+                pos += 2
+            # 구독자에게는 QoS 0으로 전달
+            out_body = body[:2 + size] + body[pos:]
+            packet = bytes([PUBLISH << 4]) + _encode_length(len(out_body)) + out_body
+            with self._lock:
+                self.published += 1
+                targets = [sub for topic_filter, sub in self._subscriptions if topic_matches(topic_filter, topic)]
+            for sub in targets:
+                try:
+                    sub.send(packet)
+                    self.forwarded += 1
+                except OSError:
+                    pass
+        elif packet_type == PINGREQ:
+            client.send(bytes([PINGRESP << 4, 0]))
+        elif packet_type == DISCONNECT:
+            return False
+        return True
+
+    def _unsubscribe_all(self, client):
+        with self._lock:
+            self._subscriptions = [(f, c) for f, c in self._subscriptions if c is not client]
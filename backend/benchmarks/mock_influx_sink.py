@@ -0,0 +1,100 @@
+"""
+벤치마크용 InfluxDB 대체 HTTP 서버
+- POST /api/v2/write: line protocol 수신 후 포인트 수와 지연시간(수신 시각 - 포인트 타임스탬프) 기록
+- GET /ping, /health: 항상 정상 응답
+"""
+import gzip
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class MockInfluxSink:
+    """로컬 포트에서 동작하는 InfluxDB write 엔드포인트 목"""
+
+    def __init__(self, host='127.0.0.1', port=0, latency_measurements=('temperature',)):
+        self._lock = threading.Lock()
+        self.latency_measurements = set(latency_measurements)
+        self.reset()
+        sink = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, format, *args):
+                pass
+
+            def _reply(self, status, body=b''):
+                self.send_response(status)
+                self.send_header('Content-Length', str(len(body)))
+                if body:
+                    self.send_header('Content-Type', 'application/json')
+                self.end_headers()
+                if body:
+                    self.wfile.write(body)
+
+            def do_GET(self):
+                if self.path.startswith('/ping'):
+                    self._reply(204)
+                elif self.path.startswith('/health'):
+                    self._reply(200, b'{"status": "pass"}')
+                else:
+                    self._reply(404)
+
+            do_HEAD = do_GET
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                body = self.rfile.read(length)
+                if self.headers.get('Content-Encoding') == 'gzip':
+                    body = gzip.decompress(body)
+                if self.path.startswith('/api/v2/write'):
+                    sink._record(body)
+                    self._reply(204)
+                else:
+                    self._reply(404)
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self.url = f'http://{host}:{self.server.server_address[1]}'
+        self._thread = threading.Thread(target=self.server.serve_forever, name='mock-influx', daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def reset(self):
+        with self._lock:
+            self.requests = 0
+            self.points = 0
+            self.points_by_measurement = {}
+            self.latencies_ns = []
+            self.last_write_at = None
+
+    def _record(self, body):
+        now_ns = time.time_ns()
+        lines = body.decode('utf-8').splitlines()
+        latencies = []
+        counts = {}
+        for line in lines:
+            if not line:
+                continue
+            measurement = line.split(' ', 1)[0].split(',', 1)[0]
+            counts[measurement] = counts.get(measurement, 0) + 1
+            if measurement in self.latency_measurements:
+                latencies.append(now_ns - int(line.rsplit(' ', 1)[1]))
+        with self._lock:
+            self.requests += 1
+            for measurement, count in counts.items():
+                self.points += count
+                self.points_by_measurement[measurement] = self.points_by_measurement.get(measurement, 0) + count
+            self.latencies_ns.extend(latencies)
+            self.last_write_at = time.perf_counter()
+
+    def count(self, measurement):
+        with self._lock:
+            return self.points_by_measurement.get(measurement, 0)
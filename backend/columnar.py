@@ -0,0 +1,77 @@
+"""
+시계열 응답 바이너리 컬럼 포맷 모듈
+- Accept: application/vnd.dashboard.columnar 요청에만 사용 (기본은 기존 JSON)
+- 타임스탬프는 Int64(ms), 값 컬럼은 Float64 리틀엔디언 버퍼
+- 빈 구간(None)은 값 버퍼에 NaN, 유효성 비트맵에 0 (LSB 우선, Arrow와 같은 비트 순서)
+- 각 버퍼는 8바이트 경계에 맞춰 두어 브라우저에서 Float64Array/BigInt64Array로 바로 읽을 수 있음
+
+레이아웃:
+  magic "TSCB" | u16 version | u16 reserved | u32 header_len | header(JSON, UTF-8) | padding | buffers
+  header = {"rows": n, "columns": [{"name", "type", "offset", "validity"}], ...메타데이터}
+  offset/validity는 buffers 시작 기준 바이트 위치 (validity가 null이면 모든 값이 유효)
+"""
+import json
+import struct
+
+import numpy as np
+
+COLUMNAR_MIMETYPE = 'application/vnd.dashboard.columnar'
+MAGIC = b'TSCB'
+VERSION = 1
+_PREAMBLE = struct.Struct('<4sHHI')
+
+
+def _pad(size):
+    return (-size) % 8
+
+
+def encode_columns(timestamps, columns, meta=None, timestamp_name='timestamps'):
+    """타임스탬프 + {name: values} 컬럼을 바이너리 포맷으로 인코딩 (int64/float64 NumPy 배열 또는 리스트)"""
+    rows = len(timestamps)
+    buffers = []
+    descriptors = []
+    offset = 0
+
+    def append(data):
+        nonlocal offset
+        start = offset
+        buffers.append(data)
+        offset += len(data)
+        padding = _pad(len(data))
+        if padding:
+            buffers.append(b'\0' * padding)
+            offset += padding
+        return start
+
+    ts = np.asarray(timestamps, dtype='<i8')
+    descriptors.append({'name': timestamp_name, 'type': 'int64', 'offset': append(ts.tobytes()), 'validity': None})
+
+    for name, values in columns.items():
+        # float64 배열은 복사 없이 그대로 사용, 리스트의 None은 float 변환 시 NaN이 됨
+        array = np.asarray(values, dtype='<f8') if len(values) == rows else np.full(rows, np.nan)
+        valid = ~np.isnan(array)
+        validity = None
+        if not valid.all():
+            validity = append(np.packbits(valid, bitorder='little').tobytes())
+        descriptors.append({'name': name, 'type': 'float64', 'offset': append(array.tobytes()), 'validity': validity})
+
+    header = dict(meta or {})
+    header.update({'rows': rows, 'columns': descriptors})
+    header_bytes = json.dumps(header, separators=(',', ':')).encode('utf-8')
+    header_bytes += b' ' * _pad(_PREAMBLE.size + len(header_bytes))
+    return b''.join([_PREAMBLE.pack(MAGIC, VERSION, 0, len(header_bytes)), header_bytes] + buffers)
+
+
+def decode_columns(data):
+    """encode_columns 결과를 (header, {name: numpy 배열})로 복원 (None 구간은 NaN)"""
+    magic, version, _, header_len = _PREAMBLE.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError('Not a columnar time-series payload')
+    header = json.loads(bytes(data[_PREAMBLE.size:_PREAMBLE.size + header_len]))
+    base = _PREAMBLE.size + header_len
+    rows = header['rows']
+    result = {}
+    for column in header['columns']:
+        dtype = '<i8' if column['type'] == 'int64' else '<f8'
+        result[column['name']] = np.frombuffer(data, dtype=dtype, count=rows, offset=base + column['offset'])
+    return header, result
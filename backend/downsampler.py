@@ -0,0 +1,203 @@
+"""
+스트리밍 다운샘플러 모듈
+- 샘플을 버리지 않고 구간(interval)마다 필드별 min/max/mean/last/count 집계
+- 구간이 끝나면 집계 포인트 하나만 기록 -> 쓰기량은 줄이고 피크값은 보존
+- 구간 길이는 센서별로 설정
+- 같은 센서라도 태그(master/port/device)가 다르면 구간을 따로 집계
+- 이미 기록한 구간에 늦게 도착한 샘플은 버리고 집계만 함 (같은 시각 포인트로 덮어써 피크가 사라지지 않도록)
+"""
+import threading
+import time
+
+from log_config import get_logger
+
+log = get_logger('ingest')
+
+
+class FieldAggregate:
+    """필드 하나의 구간 집계값"""
+
+    __slots__ = ('min', 'max', 'sum', 'count', 'last')
+
+    def __init__(self, value):
+        self.min = value
+        self.max = value
+        self.sum = value
+        self.count = 1
+        self.last = value
+
+    def add(self, value):
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        self.sum += value
+        self.count += 1
+        self.last = value
+
+    def merge(self, other):
+        """다른 구간의 집계값을 합침 (롤업 계층 병합용)"""
+        if other.min < self.min:
+            self.min = other.min
+        if other.max > self.max:
+            self.max = other.max
+        self.sum += other.sum
+        self.count += other.count
+        self.last = other.last
+
+    @property
+    def mean(self):
+        return self.sum / self.count
+
+
+class IntervalWindow:
+    """센서 하나의 현재 집계 구간"""
+
+    __slots__ = ('start', 'end', 'fields', 'samples', 'tags')
+
+    def __init__(self, start, interval, tags=None):
+        self.start = start
+        self.end = start + interval
+        self.fields = {}
+        self.samples = 0
+        self.tags = tags or {}
+
+    def add(self, values):
+        self.samples += 1
+        fields = self.fields
+        for name, value in values.items():
+            if value is None:
+                continue  # 특수 값(OL/UL 등)은 집계에서 제외
+            agg = fields.get(name)
+            if agg is None:
+                fields[name] = FieldAggregate(value)
+            else:
+                agg.add(value)
+
+    def merge(self, other):
+        """더 짧은 구간의 집계를 이 구간에 합침"""
+        self.samples += other.samples
+        fields = self.fields
+        for name, other_agg in other.fields.items():
+            agg = fields.get(name)
+            if agg is None:
+                agg = fields[name] = FieldAggregate(other_agg.min)
+                agg.count = 0
+                agg.sum = 0
+            agg.merge(other_agg)
+
+
+class StreamingDownsampler:
+    """센서별 구간 집계 후 emit(sensor, window) 콜백 호출"""
+
+    def __init__(self, emit, intervals=None, default_interval=1.0, flush_grace=0.5):
+        self._emit = emit
+        self.intervals = dict(intervals or {})
+        self.default_interval = default_interval
+        # 구간 종료 후 늦게 도착하는 샘플을 기다리는 시간 (초)
+        self.flush_grace = flush_grace
+        self._windows = {}
+        self._emitted_until = {}  # 시리즈 키 -> 마지막으로 기록한 구간의 끝 (epoch 초)
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+        self.samples = 0
+        self.emitted = 0
+        self.late_samples = 0
+        self.dropped_samples = 0
+
+    def set_interval(self, sensor, interval):
+        with self._lock:
+            self.intervals[sensor] = interval
+
+    def add(self, sensor, values, ts=None, tags=None):
+        """샘플 추가 (values: 필드명 -> 값, ts: epoch 초, tags: 시리즈 태그)"""
+        ts = time.time() if ts is None else ts
+        interval = self.intervals.get(sensor, self.default_interval)
+        key = (sensor, tuple(sorted(tags.items()))) if tags else sensor
+        closed = None
+        with self._lock:
+            self.samples += 1
+            window = self._windows.get(key)
+            if window is not None and ts >= window.end:
+                closed = window
+                window = None
+                self._emitted_until[key] = closed.end
+            if window is None:
+                if ts < self._emitted_until.get(key, ts):
+                    # 이미 기록한 구간의 샘플: 같은 start로 새 구간을 열면 앞서 기록한 포인트를 덮어씀
+                    self.late_samples += 1
+                    self.dropped_samples += 1
+                    return
+                window = IntervalWindow(ts - ts % interval, interval, tags)
+                self._windows[key] = window
+            elif ts < window.start:
+                self.late_samples += 1  # 이미 닫힌 구간의 샘플은 현재 구간에 합침
+            window.add(values)
+        if closed is not None:
+            self._emit_window(sensor, closed)
+
+    def flush_expired(self, now=None):
+        """종료 시각이 지난 구간을 기록 (샘플이 끊겨도 마지막 구간이 남지 않도록)"""
+        now = time.time() if now is None else now
+        expired = []
+        with self._lock:
+            for key, window in list(self._windows.items()):
+                if now >= window.end + self.flush_grace:
+                    expired.append((_sensor_of(key), window))
+                    del self._windows[key]
+                    self._emitted_until[key] = window.end
+        for sensor, window in expired:
+            self._emit_window(sensor, window)
+
+    def flush_all(self):
+        with self._lock:
+            windows = [(_sensor_of(key), window) for key, window in self._windows.items()]
+            for key, window in self._windows.items():
+                self._emitted_until[key] = window.end
+            self._windows.clear()
+        for sensor, window in windows:
+            self._emit_window(sensor, window)
+
+    def start(self, tick=0.5):
+        """만료 구간을 주기적으로 기록하는 백그라운드 스레드 시작"""
+        if self._thread is not None:
+            return
+        def run():
+            while not self._stop_event.wait(tick):
+                try:
+                    self.flush_expired()
+                except Exception as e:
+                    log.exception("❌ Downsampler flush error: %s", e)
+        self._thread = threading.Thread(target=run, name='downsampler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+        self.flush_all()
+
+    def get_stats(self):
+        with self._lock:
+            open_windows = len(self._windows)
+        return {
+            'samples': self.samples,
+            'emitted_windows': self.emitted,
+            'late_samples': self.late_samples,
+            'dropped_samples': self.dropped_samples,
+            'open_windows': open_windows,
+            'intervals': dict(self.intervals),
+            'default_interval': self.default_interval,
+            'flush_grace': self.flush_grace
+        }
+
+    def _emit_window(self, sensor, window):
+        if not window.fields:
+            return
+        self.emitted += 1
+        self._emit(sensor, window)
+
+
+def _sensor_of(key):
+    return key[0] if isinstance(key, tuple) else key
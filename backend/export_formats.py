@@ -0,0 +1,195 @@
+"""
+내보내기 파일 포맷 모듈
+- csv: UTF-8 BOM CSV (Excel 호환, 기본값)
+- csv.gz / csv.zst: 같은 CSV를 블록마다 이어서 압축 (gzip은 표준 라이브러리, zstd는 zstandard 패키지)
+- parquet: 컬럼 배열을 문자열로 바꾸지 않고 그대로 기록 (pyarrow 패키지)
+  시간은 timestamp[ms, UTC] + DELTA_BINARY_PACKED, 값은 사전(dictionary) 인코딩 + zstd 압축, 빈 값은 null
+- 블록({컬럼 이름: NumPy 배열}, flux_reader.stream_columns) 스트림 -> bytes 조각 스트림 (파일 전체를 메모리에 들고 있지 않음)
+- CSV도 행마다 csv.writer를 부르지 않고 컬럼별 문자열 목록을 만든 뒤 한 번에 이어 붙임
+- 선택 패키지가 없으면 그 포맷만 비활성화 (available_formats)
+"""
+import zlib
+
+import numpy as np
+
+from time_columns import as_datetime64, kst_strings, utc_strings
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+PARQUET_ROW_GROUP_ROWS = 131072  # row group 하나의 행 수 (1 Hz 기준 약 1.5일)
+PARQUET_COMPRESSION = 'zstd'
+ZSTD_LEVEL = 3
+GZIP_LEVEL = 6
+
+# 포맷 이름 -> (파일 확장자, Content-Type)
+EXPORT_FORMATS = {
+    'csv': ('.csv', 'text/csv; charset=utf-8'),
+    'csv.gz': ('.csv.gz', 'application/gzip'),
+    'csv.zst': ('.csv.zst', 'application/zstd'),
+    'parquet': ('.parquet', 'application/vnd.apache.parquet')
+}
+
+
+class ExportColumn:
+    """내보낼 값 컬럼 하나 (source: 블록의 컬럼 이름, name: Parquet 컬럼 이름, header: CSV 헤더, digits: CSV 소수점 자리 수)"""
+
+    __slots__ = ('source', 'name', 'header', 'digits')
+
+    def __init__(self, source, name, header, digits):
+        self.source = source
+        self.name = name
+        self.header = header
+        self.digits = digits
+
+
+def available_formats():
+    """현재 환경에서 쓸 수 있는 포맷 이름 목록"""
+    formats = ['csv', 'csv.gz']
+    if zstandard is not None:
+        formats.append('csv.zst')
+    if pa is not None:
+        formats.append('parquet')
+    return formats
+
+
+def check_format(fmt):
+    """포맷 이름 검사 (모르는 포맷이나 패키지가 없는 포맷이면 ValueError)"""
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f'Unknown export format: {fmt} (supported: {", ".join(EXPORT_FORMATS)})')
+    if fmt not in available_formats():
+        package = 'pyarrow' if fmt == 'parquet' else 'zstandard'
+        raise ValueError(f'Export format {fmt} requires the {package} package')
+    return fmt
+
+
+def value_strings(values, digits):
+    """값 배열 -> 소수점 digits자리 문자열 목록 (데이터가 없으면 "--")"""
+    template = f'%.{digits}f'
+    return ['--' if value != value else template % value for value in values.tolist()]
+
+
+def csv_header(columns):
+    return ','.join(['Time (UTC)', 'Time (KST)'] + [column.header for column in columns]) + '\r\n'
+
+
+def csv_block(block, columns):
+    """블록 -> CSV 텍스트 (컬럼별 문자열 목록을 만든 뒤 행으로 이어 붙임, 값에 쉼표/따옴표가 없으므로 인용 없음)"""
+    times = block['_time']
+    cells = [utc_strings(times), kst_strings(times)] + [value_strings(block[column.source], column.digits) for column in columns]
+    return '\r\n'.join(map(','.join, zip(*cells))) + '\r\n'
+
+
+def _csv_chunks(blocks, columns):
+    # UTF-8 BOM 추가 (Excel 호환성)
+    yield ('\ufeff' + csv_header(columns)).encode('utf-8')
+    for block in blocks:
+        yield csv_block(block, columns).encode('utf-8')
+
+
+def _compressed(chunks, compressor):
+    for data in chunks:
+        data = compressor.compress(data)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+class _ChunkSink:
+    """ParquetWriter가 쓰는 출력 (쓴 바이트를 모아 두었다가 drain()으로 넘김, 위치는 누적 바이트 수)"""
+
+    def __init__(self):
+        self.closed = False
+        self.position = 0
+        self._chunks = []
+
+    def write(self, data):
+        data = bytes(data)
+        self._chunks.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def parquet_schema(columns):
+    return pa.schema([pa.field('time', pa.timestamp('ms', tz='UTC'), nullable=False)] +
+                     [pa.field(column.name, pa.float64()) for column in columns])
+
+
+def _parquet_table(blocks, columns, schema):
+    times = as_datetime64(np.concatenate([block['_time'] for block in blocks])).astype('datetime64[ms]')
+    arrays = [pa.array(times, type=schema.field('time').type)]
+    for column in columns:
+        values = np.concatenate([np.asarray(block[column.source], dtype=np.float64) for block in blocks])
+        arrays.append(pa.array(values, type=pa.float64(), from_pandas=True))  # NaN -> null
+    return pa.Table.from_arrays(arrays, schema=schema)
+
+
+def _parquet_chunks(blocks, columns):
+    """블록을 PARQUET_ROW_GROUP_ROWS행씩 모아 row group으로 기록하고, 기록된 바이트를 바로 넘김"""
+    schema = parquet_schema(columns)
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(
+        sink, schema,
+        compression=PARQUET_COMPRESSION,
+        use_dictionary=[column.name for column in columns],
+        column_encoding={'time': 'DELTA_BINARY_PACKED'}
+    )
+    pending = []
+    pending_rows = 0
+    try:
+        for block in blocks:
+            pending.append(block)
+            pending_rows += len(block['_time'])
+            if pending_rows >= PARQUET_ROW_GROUP_ROWS:
+                writer.write_table(_parquet_table(pending, columns, schema), row_group_size=pending_rows)
+                pending = []
+                pending_rows = 0
+                yield sink.drain()
+        if pending:
+            writer.write_table(_parquet_table(pending, columns, schema), row_group_size=pending_rows)
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+def encode_blocks(blocks, columns, fmt='csv'):
+    """블록 스트림 -> fmt 포맷 파일의 bytes 조각 스트림 (columns: ExportColumn 목록, 시간 컬럼은 '_time')"""
+    fmt = check_format(fmt)
+    if fmt == 'parquet':
+        return _parquet_chunks(blocks, columns)
+    chunks = _csv_chunks(blocks, columns)
+    if fmt == 'csv.gz':
+        return _compressed(chunks, zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31))
+    if fmt == 'csv.zst':
+        return _compressed(chunks, zstandard.ZstdCompressor(level=ZSTD_LEVEL).compressobj())
+    return chunks
+
+
+def filename_for(stem, fmt):
+    return stem + EXPORT_FORMATS[fmt][0]
+
+
+def content_type_for(fmt):
+    return EXPORT_FORMATS[fmt][1]
@@ -0,0 +1,182 @@
+"""
+내보내기 작업 모듈
+- 큰 범위 내보내기를 요청 스레드 밖에서 실행 (POST로 작업 생성 -> 상태 조회 -> 완성된 파일 다운로드)
+- 고정 크기 워커 풀에서 실행하고 결과 파일은 로컬 디렉터리에 기록 (.part로 쓰고 끝나면 이름 변경)
+- 진행 상황은 지금까지 처리한 행 수/기록한 바이트 수 (전체 행 수는 쿼리가 끝나야 알 수 있음)
+- 같은 키(종류, 범위, 포맷)의 작업은 재사용: 대기/실행 중이면 그 작업을, 끝난 범위의 완성 파일이 있으면 그대로 반환
+- 보관 기간/전체 용량 상한을 넘으면 오래된 파일부터 삭제
+"""
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from log_config import get_logger
+
+log = get_logger('api')
+
+PART_SUFFIX = '.part'
+
+
+class ExportEmptyError(Exception):
+    """선택한 범위에 내보낼 데이터가 없음"""
+
+
+class ExportJob:
+    """내보내기 작업 하나 (status: queued -> running -> done/failed)"""
+
+    __slots__ = ('id', 'key', 'filename', 'content_type', 'status', 'rows', 'bytes', 'error',
+                 'path', 'cacheable', 'created_at', 'started_at', 'finished_at', 'hits')
+
+    def __init__(self, key, filename, content_type):
+        self.id = uuid.uuid4().hex
+        self.key = key
+        self.filename = filename
+        self.content_type = content_type
+        self.status = 'queued'
+        self.rows = 0
+        self.bytes = 0
+        self.error = None
+        self.path = None
+        self.cacheable = False  # 완성 파일을 같은 요청에 다시 써도 되는지 (범위가 실행 시점에 이미 끝났을 때만)
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.hits = 0
+
+    def to_json(self):
+        return {
+            'id': self.id,
+            'status': self.status,
+            'filename': self.filename,
+            'rows': self.rows,
+            'bytes': self.bytes,
+            'error': self.error,
+            'cached': self.hits > 0,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'elapsed': round((self.finished_at or time.time()) - self.started_at, 3) if self.started_at else None
+        }
+
+
+class ExportJobManager:
+    """내보내기 작업 큐 + 워커 풀 + 결과 파일 저장소"""
+
+    def __init__(self, directory, workers=2, max_jobs=200, max_bytes=2 * 1024 * 1024 * 1024, ttl=24 * 3600):
+        self.directory = directory
+        self.max_jobs = max_jobs
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        os.makedirs(directory, exist_ok=True)
+        # 이전 실행에서 남은 작업 파일(<작업 id>.<확장자>)은 작업 정보가 없으므로 정리
+        for name in os.listdir(directory):
+            job_id = name.split('.', 1)[0]
+            if len(job_id) == 32 and all(c in '0123456789abcdef' for c in job_id):
+                try:
+                    os.remove(os.path.join(directory, name))
+                except OSError:
+                    pass
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='export')
+        self._lock = threading.Lock()
+        self._jobs = OrderedDict()  # id -> ExportJob (생성 순서)
+        self._by_key = {}  # key -> 최근 작업 id
+        self._stats = {'submitted': 0, 'cache_hits': 0, 'joined': 0, 'completed': 0, 'failed': 0, 'evicted': 0}
+
+    def submit(self, key, filename, content_type, produce, cacheable_after=None):
+        """작업 생성 (또는 재사용) 후 ExportJob 반환
+
+        produce(job)는 파일 내용을 bytes 조각으로 내보내는 iterable을 반환하고, 처리한 행 수는 job.rows에 더함
+        cacheable_after: 이 시각(epoch 초) 이후에 실행을 시작한 작업의 결과만 같은 키 요청에 재사용
+        """
+        with self._lock:
+            self._evict()
+            job = self._jobs.get(self._by_key.get(key))
+            if job is not None:
+                if job.status in ('queued', 'running'):
+                    self._stats['joined'] += 1
+                    return job
+                if job.status == 'done' and job.cacheable and os.path.exists(job.path):
+                    job.hits += 1
+                    self._stats['cache_hits'] += 1
+                    return job
+            job = ExportJob(key, filename, content_type)
+            self._jobs[job.id] = job
+            self._by_key[key] = job.id
+            self._stats['submitted'] += 1
+        self._executor.submit(self._run, job, produce, cacheable_after)
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _run(self, job, produce, cacheable_after):
+        job.status = 'running'
+        job.started_at = time.time()
+        job.cacheable = cacheable_after is not None and job.started_at >= cacheable_after
+        # csv.gz 같은 확장자도 그대로 유지
+        extension = job.filename[job.filename.find('.'):] if '.' in job.filename else ''
+        path = os.path.join(self.directory, job.id + extension)
+        try:
+            with open(path + PART_SUFFIX, 'wb') as f:
+                for data in produce(job):
+                    f.write(data)
+                    job.bytes += len(data)
+            os.replace(path + PART_SUFFIX, path)
+            job.path = path
+            job.finished_at = time.time()
+            job.status = 'done'
+            self._stats['completed'] += 1
+            log.info("✅ Export %s done: %s rows, %s bytes, %.1fs (%s)",
+                     job.id, job.rows, job.bytes, job.finished_at - job.started_at, job.filename)
+        except Exception as e:
+            try:
+                os.remove(path + PART_SUFFIX)
+            except OSError:
+                pass
+            job.error = str(e)
+            job.finished_at = time.time()
+            job.status = 'failed'
+            self._stats['failed'] += 1
+            if not isinstance(e, ExportEmptyError):
+                log.exception("❌ Export %s failed: %s", job.id, e)
+
+    def _evict(self):
+        """보관 기간이 지났거나 용량/개수 상한을 넘은 끝난 작업을 오래된 순으로 삭제 (잠금 보유 상태에서 호출)"""
+        now = time.time()
+        finished = [job for job in self._jobs.values() if job.status in ('done', 'failed')]
+        total = sum(job.bytes for job in finished if job.status == 'done')
+        count = len(self._jobs)
+        for job in finished:
+            if now - job.finished_at < self.ttl and total <= self.max_bytes and count < self.max_jobs:
+                break
+            if job.status == 'done':
+                total -= job.bytes
+            count -= 1
+            self._remove(job)
+
+    def _remove(self, job):
+        del self._jobs[job.id]
+        if self._by_key.get(job.key) == job.id:
+            del self._by_key[job.key]
+        if job.path:
+            try:
+                os.remove(job.path)
+            except OSError:
+                pass
+        self._stats['evicted'] += 1
+
+    def get_stats(self):
+        with self._lock:
+            jobs = list(self._jobs.values())
+        by_status = {}
+        for job in jobs:
+            by_status[job.status] = by_status.get(job.status, 0) + 1
+        return {
+            **self._stats,
+            'jobs': by_status,
+            'stored_bytes': sum(job.bytes for job in jobs if job.status == 'done')
+        }
@@ -0,0 +1,278 @@
+"""
+Flux 쿼리 결과 리더 모듈
+- query_raw()의 annotated CSV 응답을 스트림으로 읽어 바로 컬럼별 NumPy 배열로 변환 (FluxRecord 객체를 만들지 않음)
+- 데이터 행은 블록 단위로 한 번에 나누고 컬럼은 슬라이스로 꺼냄 (행마다 파이썬 객체/분기 없음, 따옴표가 있으면 csv 모듈)
+- #datatype 주석으로 컬럼 형식 결정: dateTime -> datetime64[ns], double -> float64, long/unsignedLong -> int64
+  (빈 칸이 있으면 float64 + NaN), boolean -> bool, 그 밖에는 문자열
+- 테이블(빈 줄 + 주석으로 구분)마다 헤더를 다시 읽고, 요청한 컬럼이 없는 테이블은 빈 값으로 채워 이어 붙임
+- 행은 CHUNK_ROWS개씩 배열로 변환 (응답 전체를 문자열/행 리스트로 들고 있지 않음)
+- 결과를 한 번에 모으거나 (query_columns) 블록 단위로 흘려보냄 (stream_columns, 대용량 내보내기용)
+- 백엔드 히스토리/내보내기 엔드포인트와 ai_ml/scripts 로더가 함께 사용 (NumPy와 influxdb_client 외 의존성 없음)
+"""
+import codecs
+import csv
+
+import numpy as np
+
+CHUNK_ROWS = 65536  # 문자열 행을 배열로 변환하는 단위
+READ_BUFFER_BYTES = 1 << 18  # 응답 스트림을 읽는 단위
+
+_TIME_TYPES = ('dateTime:RFC3339', 'dateTime:RFC3339Nano')
+_INT_TYPES = ('long', 'unsignedLong')
+
+
+class FluxQueryError(Exception):
+    """쿼리 실행 중 InfluxDB가 결과 스트림에 error 테이블을 보낸 경우"""
+
+
+def _kind(datatype):
+    if datatype in _TIME_TYPES:
+        return 'time'
+    if datatype == 'double':
+        return 'float'
+    if datatype in _INT_TYPES:
+        return 'int'
+    if datatype == 'boolean':
+        return 'bool'
+    return 'str'
+
+
+def _convert(values, kind):
+    """문자열 값 목록 -> NumPy 배열 (빈 칸은 NaN/NaT)"""
+    if kind == 'time':
+        # numpy는 'Z' 시간대 표기를 받지 않으므로 떼고 변환 (Flux 결과는 항상 UTC)
+        return np.array([v[:-1] if v.endswith('Z') else v or 'NaT' for v in values], dtype='datetime64[ns]')
+    if kind in ('float', 'int'):
+        try:
+            return np.array(values, dtype=np.int64 if kind == 'int' else np.float64)
+        except ValueError:
+            # 빈 칸(null)이 섞여 있으면 float64 + NaN
+            return np.fromiter((float(v) if v else np.nan for v in values), dtype=np.float64, count=len(values))
+    if kind == 'bool':
+        return np.array([v == 'true' for v in values], dtype=bool)
+    return np.array(values, dtype=object)
+
+
+_DTYPES = {'time': 'datetime64[ns]', 'int': np.int64, 'float': np.float64, 'bool': bool, 'str': object}
+
+
+class _ColumnChunks:
+    """컬럼 하나의 변환된 배열 조각 (컬럼이 없던 테이블 구간은 행 수 int로 표시)"""
+
+    __slots__ = ('kinds', 'parts')
+
+    def __init__(self, missing=0):
+        self.kinds = set()
+        self.parts = [missing] if missing else []
+
+    def add(self, array, kind):
+        self.kinds.add(kind)
+        self.parts.append(array)
+
+    def concat(self, name):
+        """조각을 하나의 배열로 (형식이 섞이거나 빈 구간이 있으면 NaN/NaT/None을 담을 수 있는 형식으로)"""
+        kinds = self.kinds or {'time' if name == '_time' else 'float'}
+        missing = any(isinstance(part, int) for part in self.parts)
+        if len(kinds) == 1:
+            kind = next(iter(kinds))
+        else:
+            kind = 'float' if kinds <= {'int', 'float'} else 'str'
+        if kind == 'int' and (missing or any(part.dtype != np.int64 for part in self.parts)):
+            kind = 'float'
+        if kind == 'bool' and missing:
+            kind = 'str'
+        dtype = _DTYPES[kind]
+        fill = np.datetime64('NaT', 'ns') if kind == 'time' else np.nan if kind == 'float' else None
+        arrays = [np.full(part, fill, dtype=dtype) if isinstance(part, int) else part.astype(dtype, copy=False)
+                  for part in self.parts]
+        if not arrays:
+            return np.empty(0, dtype=dtype)
+        return arrays[0] if len(arrays) == 1 else np.concatenate(arrays)
+
+
+class _Table:
+    """현재 읽는 테이블의 헤더/주석 + 아직 배열로 바꾸지 않은 값 (행 순서대로 이어 붙인 한 리스트)"""
+
+    __slots__ = ('datatypes', 'defaults', 'header', 'cells')
+
+    def __init__(self):
+        self.datatypes = None
+        self.defaults = None
+        self.header = None
+        self.cells = []
+
+
+def _split_rows(lines, width):
+    """데이터 줄 -> 행 순서대로 이어 붙인 값 리스트
+
+    따옴표가 없으면 한 번의 join/split으로 나눔 (모든 행이 빈 주석 칸으로 시작하므로 ','로 이어도 칸 수가 맞음)
+    """
+    text = ','.join(lines)
+    if '"' not in text:
+        cells = text.split(',')
+        if len(cells) == width * len(lines):
+            return cells
+    return [cell for row in csv.reader(lines) for cell in row]
+
+
+def _iter_blocks(chunks, columns, chunk_rows):
+    """annotated CSV 텍스트 조각 스트림 -> (행 수, {컬럼 이름: (배열, 형식)}) 블록 스트림
+
+    블록은 테이블 하나의 약 chunk_rows행 (columns를 주면 그중 테이블에 있는 컬럼만, 없으면 모든 값 컬럼)
+    """
+    table = _Table()
+
+    def flush():
+        cells = table.cells
+        table.cells = []
+        if not cells or table.header is None:
+            return None
+        width = len(table.header)
+        index = {name: i for i, name in enumerate(table.header)}
+        arrays = {}
+        for name in table.header[3:] if columns is None else columns:
+            i = index.get(name)
+            if not name or i is None:
+                continue
+            values = cells[i::width]
+            default = table.defaults[i] if table.defaults else ''
+            if default:
+                values = [v or default for v in values]
+            kind = _kind(table.datatypes[i]) if table.datatypes else 'str'
+            arrays[name] = (_convert(values, kind), kind)
+        return len(cells) // width, arrays
+
+    def read_block(block):
+        if '\r' in block:
+            block = block.replace('\r', '')
+        lines = block.split('\n')
+        # 주석/빈 줄(테이블 경계) 위치만 줄 단위로 찾고, 그 사이 데이터 행은 한 번에 나눔
+        marks = [i for i, line in enumerate(lines) if not line or line[0] == '#']
+        marks.append(len(lines))
+        start = 0
+        for mark in marks:
+            if start < mark:
+                if table.header is None:
+                    table.header = next(csv.reader([lines[start]]))
+                    start += 1
+            if start < mark:
+                if table.header[1:2] == ['error']:
+                    row = next(csv.reader([lines[start]]))
+                    raise FluxQueryError(row[1] + (f' ({row[2]})' if len(row) > 2 and row[2] else ''))
+                table.cells.extend(_split_rows(lines[start:mark], len(table.header)))
+                if len(table.cells) >= chunk_rows * len(table.header):
+                    yield flush()
+            if mark < len(lines):
+                line = lines[mark]
+                if line:
+                    if table.header is not None:
+                        yield flush()
+                        table.header = None
+                    row = next(csv.reader([line]))
+                    if row[0] == '#datatype':
+                        table.datatypes = row
+                    elif row[0] == '#default':
+                        table.defaults = row
+                else:
+                    # 빈 줄 = 테이블 경계
+                    yield flush()
+                    table.datatypes = table.defaults = table.header = None
+            start = mark + 1
+
+    pending = ''
+    for text in chunks:
+        text = pending + text
+        # 마지막 줄바꿈 이후는 다음 조각과 이어서 처리
+        cut = text.rfind('\n') + 1
+        pending = text[cut:]
+        if cut:
+            for block in read_block(text[:cut - 1]):
+                if block is not None:
+                    yield block
+    if pending:
+        for block in read_block(pending):
+            if block is not None:
+                yield block
+    block = flush()
+    if block is not None:
+        yield block
+
+
+def read_columns(chunks, columns=None):
+    """annotated CSV 텍스트 조각 스트림 -> {컬럼 이름: NumPy 배열} (columns를 주면 그 컬럼만, 모든 테이블을 이어 붙임)"""
+    chunks_by_name = {name: _ColumnChunks() for name in columns} if columns is not None else {}
+    total = 0  # 지금까지 배열로 바꾼 행 수
+    for count, arrays in _iter_blocks(chunks, columns, CHUNK_ROWS):
+        for name in arrays:
+            if name not in chunks_by_name:
+                # 처음 보는 컬럼이면 이전 테이블 구간은 빈 값
+                chunks_by_name[name] = _ColumnChunks(total)
+        for name, column in chunks_by_name.items():
+            entry = arrays.get(name)
+            if entry is None:
+                column.parts.append(count)
+            else:
+                column.add(*entry)
+        total += count
+    return {name: column.concat(name) for name, column in chunks_by_name.items()}
+
+
+def iter_columns(chunks, columns, chunk_rows=CHUNK_ROWS):
+    """annotated CSV 텍스트 조각 스트림 -> 약 chunk_rows행씩 {컬럼 이름: NumPy 배열} 블록 스트림
+
+    read_columns와 달리 전체를 이어 붙이지 않으므로 결과 크기와 관계없이 메모리 사용량이 일정함
+    (테이블에 없는 컬럼은 그 블록에서 NaN/NaT/None)
+    """
+    for count, arrays in _iter_blocks(chunks, columns, chunk_rows):
+        block = {}
+        for name in columns:
+            entry = arrays.get(name)
+            column = _ColumnChunks(count if entry is None else 0)
+            if entry is not None:
+                column.add(*entry)
+            block[name] = column.concat(name)
+        yield block
+
+
+def iter_response_text(response):
+    """query_raw() 응답(urllib3 HTTPResponse)을 텍스트 조각 스트림으로 (gzip 응답도 풀어서 읽음)"""
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    for data in response.stream(READ_BUFFER_BYTES):
+        yield decoder.decode(data)
+    yield decoder.decode(b'', final=True)
+
+
+def query_columns(query_api, org, query, columns=None):
+    """Flux 쿼리를 실행해 결과를 컬럼별 NumPy 배열로 반환 (read_columns 참고)"""
+    response = query_api.query_raw(query=query, org=org)
+    try:
+        result = read_columns(iter_response_text(response), columns)
+    except BaseException:
+        response.close()
+        raise
+    # 끝까지 읽었으므로 연결은 풀로 돌려 재사용
+    response.release_conn()
+    return result
+
+
+def stream_columns(query_api, org, query, columns, chunk_rows=CHUNK_ROWS):
+    """Flux 쿼리 결과를 chunk_rows행씩 컬럼 배열 블록으로 읽는 제너레이터 (iter_columns 참고)
+
+    첫 블록을 꺼낼 때 쿼리를 보내고, 중간에 닫히면(클라이언트 연결 끊김 등) 응답도 닫음
+    """
+    response = query_api.query_raw(query=query, org=org)
+    try:
+        yield from iter_columns(iter_response_text(response), columns, chunk_rows)
+    except BaseException:
+        response.close()
+        raise
+    response.release_conn()
+
+
+def sort_by_time(result, time_column='_time'):
+    """여러 테이블로 나뉘어 시간순이 아닌 경우에만 모든 컬럼을 시간순으로 정렬"""
+    times = result.get(time_column)
+    if times is None or len(times) < 2 or not (times[1:] < times[:-1]).any():
+        return result
+    order = np.argsort(times, kind='stable')
+    return {name: values[order] for name, values in result.items()}
@@ -0,0 +1,605 @@
+"""
+히스토리 조회 엔진 모듈
+- 쿼리 플래너: range(1h/6h/24h/7d 또는 임의 기간) 또는 절대 start/stop + 점 수 목표 -> 조회 구간과 aggregateWindow 간격
+  (비싼 요청은 기간/점 수 상한으로 잘라냄)
+- Flux에서 pivot()으로 필드를 컬럼으로 펼쳐 시각당 한 행만 받음
+- 응답은 flux_reader로 바로 컬럼 배열로 읽어 그대로 보관 (타임스탬프 int64 ms, 값 float64, 빈 구간은 NaN)
+  (FluxRecord/필드별 레코드 병합 없음, 파이썬 리스트는 JSON 응답을 만들 때만 생성)
+- 온도/진동, 원본/증강 히스토리 엔드포인트가 모두 같은 엔진 사용
+- 캐시가 주어지면 같은 (bucket, measurement, fields, range, window) 조회는 최근 구간이 닫힐 때까지 재사용
+- 닫힌 뒤 늦은 쓰기가 끝났을 구간(CLOSED_SETTLE_SECONDS)은 한 번만 조회해 보관하고,
+  이후에는 새로 확정된 구간과 아직 확정되지 않은 최근 구간만 조회 (스풀 재생이 끝나면 보관소를 다시 조회)
+- since 커서(ms)를 주면 그 시각 이후 구간만 반환 (차트 폴링 증분 응답)
+- JSON 대신 바이너리 컬럼 포맷(columnar.py)으로 컬럼 배열을 바로 인코딩 가능
+- max_points를 주면 더 촘촘한 구간으로 조회한 뒤 M4/LTTB로 줄여서 반환 (visual_downsample.py)
+- 롤업 계층(rollup.py)이 있으면 집계 구간을 나누어떨어지게 하는 가장 굵은 계층 버킷에서 조회
+  (롤업이 아직 기록되지 않은 최근 구간과 롤업 시작 이전 구간은 원본 버킷에서 조회)
+"""
+import re
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from columnar import encode_columns
+from flux_reader import query_columns, sort_by_time
+from time_columns import epoch_ms
+from log_config import get_logger
+from query_cache import window_expiry
+from visual_downsample import DEFAULT_METHOD, METHODS, select_indices
+
+log = get_logger('api')
+
+TEMPERATURE_FIELDS = ('value',)
+VIBRATION_FIELDS = ('v_rms', 'a_peak', 'a_rms', 'crest', 'temperature')
+
+# range 프리셋 -> (조회 기간, 집계 구간)
+RANGE_WINDOWS = {
+    '1h': (timedelta(hours=1), '10s'),
+    '6h': (timedelta(hours=6), '1m'),
+    '24h': (timedelta(hours=24), '5m'),
+    '7d': (timedelta(days=7), '30m')
+}
+DEFAULT_RANGE = '1h'
+
+# 쿼리 플래너 집계 구간 후보 (촘촘한 순, 10s 이상은 롤업 계층으로 나누어떨어짐)
+PLAN_WINDOWS = ('1s', '5s', '10s', '30s', '1m', '5m', '10m', '30m', '1h', '3h', '6h', '12h', '1d')
+DEFAULT_POINT_BUDGET = 400  # 기본 점 수 목표 (1h->10s, 6h->1m, 24h->5m, 7d->30m 프리셋과 같은 구간)
+MIN_POINT_BUDGET = 10
+MAX_POINT_BUDGET = 5000
+MAX_QUERY_DURATION = 90 * 24 * 3600  # 조회 기간 상한 (초, 넘으면 끝 시각 기준으로 잘라냄)
+FIXED_RANGE_CACHE_SECONDS = 300  # 과거 고정 구간(start/stop) 조회 결과 캐시 시간 (초)
+MAX_CLOSED_STORES = 64  # 닫힌 구간 보관소 수 상한 (넘으면 가장 오래 사용되지 않은 보관소부터 제거)
+
+# max_points 조회용 원본 집계 구간 후보 (촘촘한 순)
+VISUAL_SOURCE_WINDOWS = ('1s', '10s', '1m', '5m', '30m')
+VISUAL_OVERSAMPLE = 8  # 원본 행 수 목표 = max_points x 배수 (구간마다 고를 후보 확보)
+MAX_VISUAL_SOURCE_ROWS = 100000  # 원본 행 수 상한
+MIN_VISUAL_POINTS = 16
+
+# 구간이 닫힌 뒤 롤업 포인트가 기록될 때까지 기다리는 시간 (초, 롤업 flush_grace + 배치 쓰기 지연)
+ROLLUP_SETTLE_SECONDS = 10
+# 구간이 닫힌 뒤 늦은 포인트(다운샘플러 flush_grace + 배치 쓰기 지연)를 기다리는 시간 (초)
+# 이 시간이 지나지 않은 구간은 닫힌 구간 보관소에 넣지 않고 매번 새로 조회
+CLOSED_SETTLE_SECONDS = 10
+# 롤업 버킷에 아직 데이터가 없을 때 다시 확인하는 간격 (초)
+ROLLUP_COVERAGE_RECHECK = 300
+
+_DURATION_UNITS = {'ms': 0.001, 's': 1, 'm': 60, 'h': 3600, 'd': 86400, 'w': 604800}
+_DURATION_PATTERN = re.compile(r'(\d+)(ms|s|m|h|d|w)')
+
+
+def parse_duration(duration):
+    """Flux 기간 문자열을 초로 변환 (예: '30m' -> 1800, '1h30m' -> 5400)"""
+    parts = _DURATION_PATTERN.findall(duration)
+    if not parts or ''.join(n + u for n, u in parts) != duration:
+        raise ValueError(f'Invalid duration: {duration}')
+    return sum(int(n) * _DURATION_UNITS[u] for n, u in parts)
+
+
+def parse_time(value):
+    """요청의 시각 파라미터 -> epoch 초 (epoch ms 숫자 또는 ISO 8601, 시간대가 없으면 UTC)"""
+    if isinstance(value, (int, float)):
+        return value / 1000
+    text = str(value).strip()
+    try:
+        return float(text) / 1000
+    except ValueError:
+        pass
+    try:
+        parsed = datetime.fromisoformat(text.replace('Z', '+00:00'))
+    except ValueError:
+        raise ValueError(f'Invalid time: {value}')
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+class QueryPlan:
+    """조회 계획 (start/stop: epoch 초, stop이 None이면 현재 시각까지 이어지는 상대 구간)"""
+
+    __slots__ = ('start', 'stop', 'duration', 'window', 'step', 'clamped')
+
+    def __init__(self, start, stop, duration, window, clamped=False):
+        self.start = start
+        self.stop = stop
+        self.duration = duration  # 초
+        self.window = window
+        self.step = parse_duration(window)
+        self.clamped = clamped  # 기간/점 수 상한으로 요청이 잘렸는지
+
+    def __repr__(self):
+        return f'QueryPlan(start={self.start}, stop={self.stop}, window={self.window}, clamped={self.clamped})'
+
+
+def plan_window(duration, points):
+    """기간을 points개 이하로 나누는 가장 촘촘한 집계 구간"""
+    for window in PLAN_WINDOWS:
+        if duration / parse_duration(window) <= points:
+            return window
+    return PLAN_WINDOWS[-1]
+
+
+def plan_query(range_param=None, start=None, stop=None, points=None, now=None):
+    """요청 파라미터로 조회 계획 수립
+
+    - start가 있으면 절대 구간 [start, stop) (stop이 없거나 미래면 현재까지 이어지는 구간)
+    - 없으면 range 기간 (1h/6h/24h/7d 또는 '90m', '3d' 같은 임의 기간, 기본 1h)
+    - points(점 수 목표)로 집계 구간 선택, 기간/점 수가 상한을 넘으면 잘라냄
+    - 잘못된 값은 ValueError
+    """
+    now = time.time() if now is None else now
+    clamped = False
+    if points is None:
+        points = DEFAULT_POINT_BUDGET
+    elif not MIN_POINT_BUDGET <= points <= MAX_POINT_BUDGET:
+        points = min(max(points, MIN_POINT_BUDGET), MAX_POINT_BUDGET)
+        clamped = True
+
+    if start is not None:
+        start = parse_time(start)
+        stop = parse_time(stop) if stop is not None else None
+        if stop is not None and stop >= now:
+            stop = None
+        duration = (now if stop is None else stop) - start
+        if duration <= 0:
+            raise ValueError('start must be earlier than stop')
+    else:
+        range_param = range_param or DEFAULT_RANGE
+        if range_param in RANGE_WINDOWS:
+            duration = RANGE_WINDOWS[range_param][0].total_seconds()
+        else:
+            try:
+                duration = parse_duration(range_param)
+            except ValueError:
+                raise ValueError(f'Invalid range: {range_param}')
+        if duration <= 0:
+            raise ValueError(f'Invalid range: {range_param}')
+
+    if duration > MAX_QUERY_DURATION:
+        duration = MAX_QUERY_DURATION
+        clamped = True
+        if start is not None:
+            start = (now if stop is None else stop) - duration
+
+    window = plan_window(duration, points)
+    step = parse_duration(window)
+    if start is None or stop is None:
+        # 상대 구간: 시작 시각은 조회할 때마다 현재 시각 기준으로 계산
+        # 기간은 구간 단위로 올림 (요청마다 조금씩 다른 기간이 서로 다른 닫힌 구간 보관소 키가 되지 않도록)
+        return QueryPlan(None, None, -(-duration // step) * step, window, clamped)
+
+    # 과거 고정 구간: 구간 경계에 맞춰 바깥쪽으로 넓힘 (캐시 재사용 + 잘린 구간 없음)
+    start = start // step * step
+    stop = -(-stop // step) * step
+    if stop >= now:
+        return QueryPlan(None, None, -(-(now - start) // step) * step, window, clamped)
+    return QueryPlan(start, stop, stop - start, window, clamped)
+
+
+def _flux_time(value):
+    """datetime(UTC) 또는 epoch 초를 Flux 시각 리터럴로 변환 (문자열은 그대로)"""
+    if isinstance(value, (int, float)):
+        value = datetime.fromtimestamp(value, tz=timezone.utc)
+    if isinstance(value, datetime):
+        return value.strftime('%Y-%m-%dT%H:%M:%SZ')
+    return value
+
+
+def _epoch(value):
+    """datetime(naive는 UTC) 또는 epoch 초 -> epoch 초"""
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.timestamp()
+    return float(value)
+
+
+def visual_source_window(seconds, max_points):
+    """max_points 조회에 쓸 원본 집계 구간 (행 수가 목표를 넘지 않는 가장 촘촘한 구간)"""
+    limit = min(max_points * VISUAL_OVERSAMPLE, MAX_VISUAL_SOURCE_ROWS)
+    for window in VISUAL_SOURCE_WINDOWS:
+        if seconds / parse_duration(window) <= limit:
+            return window
+    return VISUAL_SOURCE_WINDOWS[-1]
+
+
+def build_history_query(bucket, measurement, fields, start, window, fn='mean', stop=None):
+    """필드별 집계 후 pivot으로 시각당 한 행이 되도록 하는 Flux 쿼리"""
+    time_range = f'start: {_flux_time(start)}'
+    if stop is not None:
+        time_range += f', stop: {_flux_time(stop)}'
+    field_filter = ' or '.join(f'r["_field"] == "{field}"' for field in fields)
+    columns = ', '.join(f'"{column}"' for column in ('_time',) + tuple(fields))
+    return f'''
+        from(bucket: "{bucket}")
+          |> range({time_range})
+          |> filter(fn: (r) => r["_measurement"] == "{measurement}")
+          |> filter(fn: (r) => {field_filter})
+          |> group(columns: ["_measurement", "_field"])
+          |> aggregateWindow(every: {window}, fn: {fn}, createEmpty: true)
+          |> pivot(rowKey: ["_time"], columnKey: ["_field"], valueColumn: "_value")
+          |> group()
+          |> keep(columns: [{columns}])
+          |> sort(columns: ["_time"])
+        '''
+
+
+def build_coverage_query(bucket, measurement):
+    """버킷에서 measurement의 가장 오래된 포인트 시각 (롤업 시작 시점 확인용)"""
+    return f'''
+        from(bucket: "{bucket}")
+          |> range(start: 0)
+          |> filter(fn: (r) => r["_measurement"] == "{measurement}")
+          |> first()
+          |> group()
+          |> min(column: "_time")
+          |> keep(columns: ["_time"])
+        '''
+
+
+_EMPTY_TIMESTAMPS = np.empty(0, dtype=np.int64)
+
+
+def assemble_columns(result, fields):
+    """pivot 결과 컬럼(flux_reader.read_columns)을 (timestamps_ms int64 배열, {field: float64 배열})로 변환"""
+    result = sort_by_time(result)
+    timestamps = epoch_ms(result['_time'])
+    columns = {}
+    for field in fields:
+        values = result.get(field)
+        if values is None or not len(values):
+            columns[field] = np.full(len(timestamps), np.nan)
+            continue
+        columns[field] = np.asarray(values, dtype=np.float64)
+    return timestamps, columns
+
+
+def json_values(values):
+    """값 배열 -> JSON용 리스트 (NaN은 None)"""
+    column = values.astype(object)
+    column[np.isnan(values)] = None
+    return column.tolist()
+
+
+class HistorySeries:
+    """조회 결과 (시간순 타임스탬프 int64 ms 배열 + 필드별 float64 값 배열, 배열은 수정하지 않고 공유)"""
+
+    __slots__ = ('bucket', 'window', 'timestamps', 'columns', 'cursor', 'since')
+
+    def __init__(self, bucket, window, timestamps, columns, cursor=None, since=None):
+        self.bucket = bucket
+        self.window = window
+        self.timestamps = timestamps
+        self.columns = columns
+        self.cursor = cursor  # 마지막으로 닫힌 구간의 타임스탬프 (다음 폴링의 since 값)
+        self.since = since  # 증분 응답이면 요청한 since 값
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def slice(self, start_ms=None, since=None):
+        """start_ms 이상 구간만 남긴 새 결과 (배열 view, 원본은 그대로)"""
+        lo = int(np.searchsorted(self.timestamps, start_ms, side='left')) if start_ms is not None else 0
+        columns = {field: column[lo:] for field, column in self.columns.items()}
+        return HistorySeries(self.bucket, self.window, self.timestamps[lo:], columns, self.cursor, since)
+
+    def take(self, indices):
+        """indices 행만 남긴 새 결과"""
+        columns = {field: column[indices] for field, column in self.columns.items()}
+        return HistorySeries(self.bucket, self.window, self.timestamps[indices], columns, self.cursor, self.since)
+
+    def concat(self, other, fields):
+        """이 결과 뒤에 other(더 나중 구간)를 이어 붙인 새 결과 (버킷은 other 기준)"""
+        columns = {field: np.concatenate([self.columns[field], other.columns[field]]) for field in fields}
+        return HistorySeries(other.bucket or self.bucket, self.window,
+                             np.concatenate([self.timestamps, other.timestamps]), columns, self.cursor, self.since)
+
+    def _column(self, field):
+        values = self.columns.get(field)
+        return values if values is not None else np.full(len(self.timestamps), np.nan)
+
+    def _meta(self, result):
+        if self.cursor is not None:
+            result['cursor'] = self.cursor
+        if self.since is not None:
+            result['since'] = self.since
+            result['delta'] = True
+        return result
+
+    def to_temperature_columnar(self):
+        """온도 히스토리 바이너리 컬럼 응답 (timestamps, values, 배열을 리스트로 바꾸지 않고 바로 인코딩)"""
+        return encode_columns(self.timestamps, {'values': self._column('value')}, self._meta({}))
+
+    def to_vibration_columnar(self):
+        """진동 히스토리 바이너리 컬럼 응답 (timestamps, v_rms, a_peak, a_rms, crest, temperature)"""
+        columns = {field: self._column(field) for field in VIBRATION_FIELDS}
+        return encode_columns(self.timestamps, columns, self._meta({}))
+
+    def to_temperature_json(self):
+        """기존 온도 히스토리 응답 형식 {timestamps, values, count} (+ cursor)"""
+        values = json_values(self._column('value'))
+        return self._meta({'timestamps': self.timestamps.tolist(), 'values': values, 'count': len(values)})
+
+    def to_vibration_json(self):
+        """기존 진동 히스토리 응답 형식 {timestamps, v_rms, a_peak, a_rms, crest, temperature} (+ cursor)"""
+        result = {'timestamps': self.timestamps.tolist()}
+        for field in VIBRATION_FIELDS:
+            result[field] = json_values(self._column(field))
+        return self._meta(result)
+
+
+def empty_series(window=None, fields=(), cursor=None):
+    return HistorySeries(None, window, _EMPTY_TIMESTAMPS, {field: np.empty(0) for field in fields}, cursor=cursor)
+
+
+def empty_vibration_json():
+    return empty_series().to_vibration_json()
+
+
+class ClosedWindows:
+    """한 시계열(bucket, measurement, fields, window)의 닫힌 구간 보관소
+
+    CLOSED_SETTLE_SECONDS가 지난 구간은 더 바뀌지 않는다고 보고 새로 확정된 구간만 뒤에 붙임.
+    (스풀 재생처럼 오래된 구간이 나중에 채워지면 보관소 전체를 다시 조회)
+    보관 중인 배열은 수정하지 않고 매번 새 배열로 교체 (읽는 쪽은 잠금 불필요)
+    """
+
+    def __init__(self, step):
+        self.step = step  # 구간 길이 (초)
+        self.lock = threading.Lock()  # 같은 시계열 확장은 한 번만 조회 (나머지는 대기)
+        self.start = None  # 보관 중인 첫 구간 시작 (epoch 초)
+        self.end = None  # 마지막으로 확정된 구간 끝 (epoch 초)
+        self.loaded_at = None  # 전체를 조회한 시각 (epoch 초)
+        self.bucket = None
+        self.timestamps = _EMPTY_TIMESTAMPS
+        self.columns = {}
+        self.loads = 0
+        self.extends = 0
+
+    def snapshot(self, window):
+        return HistorySeries(self.bucket, window, self.timestamps, self.columns,
+                             cursor=int(self.end * 1000) if self.end is not None else None)
+
+
+class HistoryQueryEngine:
+    """히스토리 엔드포인트 공용 조회 엔진"""
+
+    def __init__(self, query_api, org, cache=None, rollups=None, replayed_at=None, max_closed=MAX_CLOSED_STORES):
+        self.query_api = query_api
+        self.org = org
+        self.cache = cache
+        # 원본 버킷 -> 롤업 계층 목록 (굵은 계층부터 확인)
+        self.rollups = {
+            bucket: sorted(tiers, key=lambda tier: -tier.seconds) for bucket, tiers in (rollups or {}).items()
+        }
+        self._closed = OrderedDict()  # 보관소 키 -> ClosedWindows (LRU 순서)
+        self.max_closed = max_closed
+        self._closed_evicted = 0
+        # 마지막 스풀 재생 시각(epoch 초 또는 None)을 돌려주는 함수 (재생 전에 조회한 보관소는 다시 조회)
+        self.replayed_at = replayed_at
+        self._closed_lock = threading.Lock()
+        self._coverage = {}  # (롤업 버킷, measurement) -> (첫 포인트 시각 또는 None, 확인 시각)
+        self._sources = {}  # 조회한 버킷별 쿼리 수 (원본/롤업)
+
+    def query(self, bucket, measurement, fields, range_param=DEFAULT_RANGE, fallback_bucket=None, fn='mean',
+              since=None, max_points=None, method=DEFAULT_METHOD, plan=None):
+        """조회 계획(없으면 range 프리셋) 기준 집계 조회 (bucket 조회 실패 시 fallback_bucket으로 재시도)
+
+        since(ms)를 주면 그 시각 이상 구간과 아직 확정되지 않은 최근 구간만 반환
+        max_points를 주면 M4/LTTB로 줄인 전체 구간 반환 (since는 무시)
+        """
+        if plan is None:
+            plan = plan_query(range_param if range_param in RANGE_WINDOWS else DEFAULT_RANGE)
+        fields = tuple(fields)
+        if max_points is not None:
+            return self.query_visual(bucket, measurement, fields, plan, max_points, method, fallback_bucket, fn)
+        if plan.stop is not None:
+            series = self._query_fixed(bucket, measurement, fields, plan, fallback_bucket, fn)
+            return series if since is None else series.slice(since, since)
+        if self.cache is None:
+            start = datetime.utcnow() - timedelta(seconds=plan.duration)
+            series = self.query_window(bucket, measurement, fields, start, plan.window, fallback_bucket, fn)
+            return series if since is None else series.slice(since, since)
+
+        window, step = plan.window, plan.step
+        now = time.time()
+        # 구간 경계에 맞춘 조회 시작, 현재 열려 있는 구간의 시작, 늦은 쓰기가 끝났을 마지막 구간 경계
+        start = (now - plan.duration) // step * step
+        boundary = now // step * step
+        settled = max(min((now - CLOSED_SETTLE_SECONDS) // step * step, boundary), start)
+        closed = self._closed_windows(bucket, measurement, fields, plan, start, settled, fallback_bucket, fn)
+
+        # 확정되지 않은 최근 구간 + 열린 마지막 구간 (열린 구간이 닫히거나 확정 경계가 바뀔 때까지 캐시)
+        tail = self.cache.get_or_load(
+            (bucket, measurement, fields, window, fallback_bucket, fn, 'tail', settled, boundary),
+            lambda: self.query_window(bucket, measurement, fields, settled, window, fallback_bucket, fn),
+            expires_at=min(boundary + step, settled + step + CLOSED_SETTLE_SECONDS),
+            size=lambda series: len(series) * (len(fields) + 1)
+        )
+
+        first = int(start * 1000) + 1
+        return closed.slice(first if since is None else max(since, first), since).concat(tail, fields)
+
+    def _query_fixed(self, bucket, measurement, fields, plan, fallback_bucket, fn):
+        """과거 고정 구간 조회 (닫힌 구간뿐이라 일정 시간 캐시)"""
+        def load():
+            return self.query_window(bucket, measurement, fields, plan.start, plan.window, fallback_bucket, fn,
+                                     stop=plan.stop)
+
+        if self.cache is None:
+            return load()
+        return self.cache.get_or_load(
+            (bucket, measurement, fields, plan.window, fallback_bucket, fn, 'fixed', plan.start, plan.stop),
+            load,
+            expires_at=time.time() + FIXED_RANGE_CACHE_SECONDS,
+            size=lambda series: len(series) * (len(fields) + 1)
+        )
+
+    def query_visual(self, bucket, measurement, fields, plan, max_points, method=DEFAULT_METHOD,
+                     fallback_bucket=None, fn='mean'):
+        """차트 해상도에 맞춘 조회: 촘촘한 구간으로 받아 max_points 이하로 모양을 유지하며 줄임"""
+        max_points = max(MIN_VISUAL_POINTS, int(max_points))
+        if method not in METHODS:
+            method = DEFAULT_METHOD
+        window = visual_source_window(plan.duration, max_points)
+        start = plan.start if plan.stop is not None else time.time() - plan.duration
+
+        def load():
+            return self.query_window(bucket, measurement, fields, start, window, fallback_bucket, fn, stop=plan.stop)
+
+        if self.cache is None:
+            series = load()
+        else:
+            series = self.cache.get_or_load(
+                (bucket, measurement, fields, plan.duration, plan.start, plan.stop, window, fallback_bucket, fn,
+                 'visual'),
+                load,
+                expires_at=window_expiry(parse_duration(window)),
+                size=lambda series: len(series) * (len(fields) + 1)
+            )
+        indices = select_indices(series.timestamps, [series.columns[field] for field in fields], max_points, method)
+        return series if indices is None else series.take(indices)
+
+    def _closed_windows(self, bucket, measurement, fields, plan, start, boundary, fallback_bucket, fn):
+        """[start, boundary) 확정된 구간 (보관소에 없는 부분만 조회해서 붙임)"""
+        window, step = plan.window, plan.step
+        if boundary <= start:
+            # 조회 기간이 확정 대기 시간보다 짧으면 모두 최근 구간 조회로 처리
+            return empty_series(window, fields, cursor=int(boundary * 1000))
+        key = (bucket, measurement, fields, window, plan.duration, fallback_bucket, fn)
+        with self._closed_lock:
+            store = self._closed.get(key)
+            if store is None:
+                store = self._closed[key] = ClosedWindows(step)
+                while len(self._closed) > self.max_closed:
+                    self._closed.popitem(last=False)
+                    self._closed_evicted += 1
+            else:
+                self._closed.move_to_end(key)
+
+        replayed_at = self.replayed_at() if self.replayed_at is not None else None
+        with store.lock:
+            if (store.end is None or store.start > start or store.end < start
+                    or (replayed_at is not None and store.loaded_at < replayed_at)):
+                loaded_at = time.time()
+                series = self.query_window(bucket, measurement, fields, start, window, fallback_bucket, fn,
+                                           stop=boundary)
+                store.timestamps, store.columns = series.timestamps, series.columns
+                store.start, store.bucket, store.loaded_at = start, series.bucket, loaded_at
+                store.loads += 1
+            elif store.end < boundary:
+                series = self.query_window(bucket, measurement, fields, store.end, window, fallback_bucket, fn,
+                                           stop=boundary)
+                # 범위 밖으로 밀려난 오래된 구간은 버리고 새 배열로 교체
+                lo = int(np.searchsorted(store.timestamps, int(start * 1000) + 1, side='left'))
+                store.timestamps = np.concatenate([store.timestamps[lo:], series.timestamps])
+                store.columns = {field: np.concatenate([store.columns[field][lo:], series.columns[field]])
+                                 for field in fields}
+                store.start = start
+                store.extends += 1
+            store.end = boundary
+            return store.snapshot(window)
+
+    def query_window(self, bucket, measurement, fields, start, window, fallback_bucket=None, fn='mean', stop=None):
+        """[start, stop) 구간 집계 조회 (롤업 계층이 요청을 만족하면 롤업 버킷에서)"""
+        fields = tuple(fields)
+        tier = self._rollup_tier(bucket, measurement, window, fn, start)
+        if tier is not None:
+            try:
+                return self._query_rollup(tier, bucket, measurement, fields, start, window, fallback_bucket, fn, stop)
+            except Exception as e:
+                log.warning("⚠️ Failed to query rollup bucket %s: %s, using raw bucket", tier.bucket_for(bucket), e)
+        return self._query_raw(bucket, measurement, fields, start, window, fallback_bucket, fn, stop)
+
+    def _rollup_tier(self, bucket, measurement, window, fn, start):
+        """집계 구간을 나누어떨어지게 하고 start 이후를 모두 가진 가장 굵은 롤업 계층 (없으면 None)"""
+        tiers = self.rollups.get(bucket)
+        if not tiers or fn != 'mean':
+            return None
+        step = parse_duration(window)
+        start = _epoch(start)
+        now = time.time()
+        for tier in tiers:
+            if step % tier.seconds:
+                continue
+            if tier.retention and start < now - tier.retention:
+                continue
+            covered_since = self._rollup_coverage(tier.bucket_for(bucket), measurement)
+            if covered_since is not None and covered_since <= start:
+                return tier
+        return None
+
+    def _rollup_coverage(self, rollup_bucket, measurement):
+        """롤업 버킷의 첫 포인트 시각 (확인 결과 캐시, 비어 있으면 주기적으로 재확인)"""
+        key = (rollup_bucket, measurement)
+        now = time.time()
+        entry = self._coverage.get(key)
+        if entry is not None and (entry[0] is not None or now - entry[1] < ROLLUP_COVERAGE_RECHECK):
+            return entry[0]
+        covered_since = None
+        try:
+            times = query_columns(self.query_api, self.org, build_coverage_query(rollup_bucket, measurement),
+                                  ('_time',))['_time']
+            covered_since = epoch_ms(times).min() / 1000 if len(times) else None
+        except Exception as e:
+            log.warning("⚠️ Failed to check rollup bucket %s: %s", rollup_bucket, e)
+        self._coverage[key] = (covered_since, now)
+        return covered_since
+
+    def _query_rollup(self, tier, bucket, measurement, fields, start, window, fallback_bucket, fn, stop):
+        """롤업 버킷 조회 + 롤업이 아직 기록되지 않았을 수 있는 최근 구간은 원본 버킷 조회"""
+        step = parse_duration(window)
+        now = time.time()
+        end = now if stop is None else _epoch(stop)
+        settled = (now - ROLLUP_SETTLE_SECONDS) // step * step
+        if settled <= _epoch(start):
+            return self._query_raw(bucket, measurement, fields, start, window, fallback_bucket, fn, stop)
+        split = min(settled, end)
+        rolled = self._query_raw(tier.bucket_for(bucket), measurement, fields, start, window, None, fn, split)
+        if split >= end:
+            return rolled
+        recent = self._query_raw(bucket, measurement, fields, split, window, fallback_bucket, fn, stop)
+        return rolled.concat(recent, fields)
+
+    def _query_raw(self, bucket, measurement, fields, start, window, fallback_bucket=None, fn='mean', stop=None):
+        self._sources[bucket] = self._sources.get(bucket, 0) + 1
+        try:
+            result = query_columns(self.query_api, self.org,
+                                   build_history_query(bucket, measurement, fields, start, window, fn, stop),
+                                   ('_time',) + tuple(fields))
+        except Exception as e:
+            if not fallback_bucket:
+                raise
+            # vibration_data 버킷이 없으면 temperature_data 버킷에서 조회
+            log.warning("⚠️ Failed to query %s bucket: %s, trying %s bucket as fallback...", bucket, e, fallback_bucket)
+            bucket = fallback_bucket
+            self._sources[bucket] = self._sources.get(bucket, 0) + 1
+            result = query_columns(self.query_api, self.org,
+                                   build_history_query(bucket, measurement, fields, start, window, fn, stop),
+                                   ('_time',) + tuple(fields))
+        timestamps, columns = assemble_columns(result, fields)
+        return HistorySeries(bucket, window, timestamps, columns)
+
+    def get_stats(self):
+        with self._closed_lock:
+            stores = list(self._closed.items())
+            evicted = self._closed_evicted
+        return {
+            'closed_windows': {
+                f'{bucket}/{measurement}/{window}/{duration:g}s': {
+                    'windows': len(store.timestamps),
+                    'loads': store.loads,
+                    'extends': store.extends
+                }
+                for (bucket, measurement, _, window, duration, _, _), store in stores
+            },
+            'closed_windows_evicted': evicted,
+            'queries_by_bucket': dict(self._sources),
+            'rollup_coverage': {
+                f'{bucket}/{measurement}': covered_since
+                for (bucket, measurement), (covered_since, _) in list(self._coverage.items())
+            }
+        }
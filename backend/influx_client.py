@@ -0,0 +1,77 @@
+"""
+InfluxDB 클라이언트 팩토리 모듈
+- 백엔드와 ai_ml 스크립트가 같은 설정으로 InfluxDBClient를 만들고 프로세스 안에서 하나를 공유 (get_client)
+- 연결 풀 크기를 동시에 조회하는 워커 수 + 백그라운드 스레드(배치 writer, 롤업, 헬스 체크) 수에 맞춤
+  (풀보다 동시 요청이 많으면 urllib3가 연결을 새로 열고 버리므로 keep-alive 재사용이 깨짐)
+- enable_gzip: 큰 조회 응답(annotated CSV)과 배치 쓰기 본문(line protocol)을 gzip으로 주고받음
+- 타임아웃은 (연결, 읽기) ms 쌍 (전체 시간 제한이 아니라 긴 스트리밍 조회도 읽기가 이어지는 동안은 유지)
+- urllib3 연결 풀의 새 연결 수/요청 수로 연결 재사용률 집계 (get_stats)
+"""
+import threading
+
+from influxdb_client import InfluxDBClient
+
+DEFAULT_WORKERS = 8  # 동시에 InfluxDB를 조회하는 요청 처리 스레드 수
+BACKGROUND_CONNECTIONS = 4  # 배치 writer, 롤업 기록, 헬스 체크 등 백그라운드 스레드 몫
+DEFAULT_TIMEOUT = (5000, 60000)  # (연결, 읽기) ms
+DEFAULT_ENABLE_GZIP = True
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def pool_size_for(workers):
+    """워커 수 -> 연결 풀 크기"""
+    return max(1, workers) + BACKGROUND_CONNECTIONS
+
+
+def create_client(url, token, org, workers=DEFAULT_WORKERS, enable_gzip=DEFAULT_ENABLE_GZIP, timeout=DEFAULT_TIMEOUT):
+    """튜닝된 InfluxDBClient 생성 (연결 풀 크기, gzip, 타임아웃)"""
+    return InfluxDBClient(
+        url=url,
+        token=token,
+        org=org,
+        timeout=timeout,
+        enable_gzip=enable_gzip,
+        connection_pool_maxsize=pool_size_for(workers)
+    )
+
+
+def get_client(url, token, org, **options):
+    """프로세스 공유 클라이언트 (처음 호출할 때 생성, 이후에는 같은 객체 반환)"""
+    global _shared
+    with _shared_lock:
+        if _shared is None or _shared.api_client is None:
+            _shared = create_client(url, token, org, **options)
+        return _shared
+
+
+def _pools(client):
+    api_client = getattr(client, 'api_client', None)
+    rest_client = getattr(api_client, 'rest_client', None)
+    pool_manager = getattr(rest_client, 'pool_manager', None)
+    if pool_manager is None:
+        return []
+    pools = pool_manager.pools
+    pools = [pools.get(key) for key in pools.keys()]
+    return [pool for pool in pools if pool is not None]
+
+
+def get_stats(client):
+    """연결 풀 상태 + 연결 재사용률 (요청 수 대비 새로 연 연결 수)"""
+    if client is None:
+        return None
+    pools = _pools(client)
+    requests = sum(pool.num_requests for pool in pools)
+    connections = sum(pool.num_connections for pool in pools)
+    conf = client.api_client.configuration if client.api_client else None
+    return {
+        'pool_maxsize': conf.connection_pool_maxsize if conf else None,
+        'gzip': conf.enable_gzip if conf else None,
+        'timeout_ms': list(conf.timeout) if conf and isinstance(conf.timeout, tuple) else getattr(conf, 'timeout', None),
+        'requests': requests,
+        'connections_opened': connections,
+        # 풀 큐에는 빈 자리(None)도 들어 있으므로 실제 연결만 셈
+        'idle_connections': sum(conn is not None for pool in pools if pool.pool is not None for conn in list(pool.pool.queue)),
+        'reuse_ratio': round(1 - connections / requests, 4) if requests else None
+    }
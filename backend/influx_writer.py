@@ -0,0 +1,238 @@
+"""
+InfluxDB 배치 쓰기 모듈
+- MQTT 콜백에서는 포인트를 유한 크기 메모리 큐에 넣기만 함
+- 백그라운드 스레드가 배치 크기 또는 최대 지연 시간에 도달하면 한 번에 기록
+- 실패 시 지수 백오프로 재시도, 큐 포화/재시도 소진 시 드롭 카운트 증가
+- 스풀이 설정되어 있으면 재시도 소진 시 드롭 대신 디스크에 보관 후 복구 시 재생
+"""
+import atexit
+import queue
+import threading
+import time
+
+from log_config import get_logger
+from write_spool import SpoolRejectedError
+
+log = get_logger('influx')
+
+try:
+    from influxdb_client.rest import ApiException
+except ImportError:
+    ApiException = None
+
+
+class BatchingWriteApi:
+    """SYNCHRONOUS write_api를 감싸는 배치 writer (write_api.write()와 동일한 호출 형태)"""
+
+    def __init__(self, write_api, org=None, batch_size=500, flush_interval=1.0,
+                 max_queue_size=10000, max_retries=5, retry_interval=0.5,
+                 max_retry_interval=30.0, fallback_buckets=None, spool=None, ping=None):
+        self._write_api = write_api
+        self._org = org
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.retry_interval = retry_interval
+        self.max_retry_interval = max_retry_interval
+        # 버킷이 없을 때(404) 대신 기록할 버킷 (예: vibration_data -> temperature_data)
+        self.fallback_buckets = dict(fallback_buckets or {})
+        # 장애 시 포인트를 보관할 디스크 스풀 (write_spool.WriteAheadSpool)
+        self.spool = spool
+
+        self._queue = queue.Queue(maxsize=max_queue_size)
+        self._stop_event = threading.Event()
+        self._flush_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            'enqueued_points': 0,
+            'written_points': 0,
+            'dropped_points': 0,
+            'fallback_points': 0,
+            'flushes': 0,
+            'failed_flushes': 0,
+            'retries': 0,
+            'spooled_points': 0,
+            'last_flush_latency_ms': None,
+            'max_flush_latency_ms': None,
+            'total_flush_latency_ms': 0.0,
+            'last_error': None,
+        }
+
+        self._thread = threading.Thread(target=self._run, name='influx-writer', daemon=True)
+        self._thread.start()
+        if spool is not None and ping is not None:
+            spool.start_replay(self._replay_write, ping)
+        atexit.register(self.close)
+
+    def write(self, bucket, org=None, record=None, **kwargs):
+        """포인트를 큐에 추가 (블로킹 없음, 큐가 가득 차면 드롭)"""
+        if record is None:
+            return
+        records = record if isinstance(record, (list, tuple)) else [record]
+        for item in records:
+            try:
+                self._queue.put_nowait((bucket, org or self._org, item))
+                self._incr('enqueued_points')
+            except queue.Full:
+                self._incr('dropped_points')
+
+    def flush(self):
+        """큐에 남은 포인트를 즉시 모두 기록"""
+        while not self._queue.empty():
+            batch = self._drain(deadline=None)
+            if not batch:
+                break
+            self._write_batch(batch)
+
+    def close(self):
+        """백그라운드 스레드 종료 후 남은 포인트 flush"""
+        if self._stop_event.is_set():
+            return
+        self._stop_event.set()
+        self._thread.join(timeout=self.flush_interval + 1)
+        self.flush()
+        if self.spool is not None:
+            self.spool.stop()
+
+    def get_stats(self):
+        """큐 깊이, flush 지연시간, 드롭 수 등 통계 반환"""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        total_latency_ms = stats.pop('total_flush_latency_ms')
+        stats['avg_flush_latency_ms'] = round(total_latency_ms / stats['flushes'], 2) if stats['flushes'] else None
+        stats['queue_depth'] = self._queue.qsize()
+        stats['queue_capacity'] = self._queue.maxsize
+        stats['batch_size'] = self.batch_size
+        stats['flush_interval'] = self.flush_interval
+        stats['spool'] = self.spool.get_stats() if self.spool is not None else None
+        return stats
+
+    def _incr(self, key, amount=1):
+        with self._stats_lock:
+            self._stats[key] += amount
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            try:
+                first = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            # 첫 포인트 기준으로 최대 flush_interval 만큼만 대기
+            batch = [first] + self._drain(deadline=time.monotonic() + self.flush_interval,
+                                          limit=self.batch_size - 1)
+            self._write_batch(batch)
+
+    def _drain(self, deadline=None, limit=None):
+        limit = self.batch_size if limit is None else limit
+        batch = []
+        while len(batch) < limit:
+            try:
+                if deadline is None:
+                    batch.append(self._queue.get_nowait())
+                else:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _write_batch(self, batch):
+        # 버킷/조직 단위로 묶어서 한 번의 HTTP 요청으로 기록
+        grouped = {}
+        for bucket, org, item in batch:
+            grouped.setdefault((bucket, org), []).append(item)
+
+        with self._flush_lock:
+            start = time.perf_counter()
+            ok = True
+            # 스풀에 재생 대기 데이터가 있으면(장애 중) 재시도 없이 바로 스풀로 (순서 유지)
+            spooling = self.spool is not None and self.spool.has_pending()
+            for (bucket, org), records in grouped.items():
+                if spooling:
+                    self._spool_records(bucket, org, records)
+                elif not self._write_with_retry(bucket, org, records):
+                    ok = False
+            latency_ms = (time.perf_counter() - start) * 1000
+
+        with self._stats_lock:
+            self._stats['flushes'] += 1
+            if not ok:
+                self._stats['failed_flushes'] += 1
+            self._stats['last_flush_latency_ms'] = round(latency_ms, 2)
+            self._stats['total_flush_latency_ms'] += latency_ms
+            if self._stats['max_flush_latency_ms'] is None or latency_ms > self._stats['max_flush_latency_ms']:
+                self._stats['max_flush_latency_ms'] = round(latency_ms, 2)
+
+    def _write_with_retry(self, bucket, org, records):
+        delay = self.retry_interval
+        last_error = None
+        for attempt in range(self.max_retries + 1):
+            try:
+                self._write_api.write(bucket=bucket, org=org, record=records)
+                self._incr('written_points', len(records))
+                return True
+            except Exception as e:
+                fallback = self.fallback_buckets.get(bucket)
+                if fallback and _is_not_found(e):
+                    # 버킷이 없으면 fallback 버킷에 기록 (재시도 대상 아님)
+                    log.warning("⚠️ Bucket %s not found, writing %s points to %s as fallback", bucket, len(records), fallback)
+                    if self._write_with_retry(fallback, org, records):
+                        self._incr('fallback_points', len(records))
+                        return True
+                    return False
+
+                last_error = e
+                with self._stats_lock:
+                    self._stats['last_error'] = str(e)
+                if attempt >= self.max_retries or self._stop_event.is_set() or _is_client_error(e):
+                    break
+                self._incr('retries')
+                log.warning("⚠️ InfluxDB batch write failed (%s/%s), retry in %.1fs: %s", attempt + 1, self.max_retries, delay, e)
+                time.sleep(delay)
+                delay = min(delay * 2, self.max_retry_interval)
+
+        if self.spool is not None and not _is_client_error(last_error):
+            self._spool_records(bucket, org, records)
+            return False
+        log.error("❌ InfluxDB batch write dropped %s points (bucket: %s)", len(records), bucket)
+        self._incr('dropped_points', len(records))
+        return False
+
+    def _spool_records(self, bucket, org, records):
+        try:
+            self.spool.append(bucket, org, records)
+            self._incr('spooled_points', len(records))
+        except Exception as e:
+            log.error("❌ InfluxDB spool write failed, dropped %s points: %s", len(records), e)
+            self._incr('dropped_points', len(records))
+
+    def _replay_write(self, bucket, org, lines):
+        """스풀 재생용 기록 (전송 오류/5xx는 예외 발생 -> 세그먼트 유지, 4xx는 SpoolRejectedError -> 배치 격리)"""
+        with self._flush_lock:
+            try:
+                try:
+                    self._write_api.write(bucket=bucket, org=org or self._org, record=lines)
+                except Exception as e:
+                    fallback = self.fallback_buckets.get(bucket)
+                    if not (fallback and _is_not_found(e)):
+                        raise
+                    self._write_api.write(bucket=fallback, org=org or self._org, record=lines)
+                    self._incr('fallback_points', len(lines))
+            except Exception as e:
+                if _is_client_error(e):
+                    raise SpoolRejectedError(str(e)) from e
+                raise
+            self._incr('written_points', len(lines))
+
+
+def _is_not_found(error):
+    return ApiException is not None and isinstance(error, ApiException) and error.status == 404
+
+
+def _is_client_error(error):
+    """잘못된 요청(4xx, 429 제외)은 재시도해도 실패하므로 바로 포기"""
+    if ApiException is None or not isinstance(error, ApiException) or error.status is None:
+        return False
+    return 400 <= error.status < 500 and error.status != 429
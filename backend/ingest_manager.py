@@ -0,0 +1,227 @@
+"""
+MQTT 수집 연결 관리 모듈
+- 설정된 브로커/IO-Link 마스터마다 독립된 paho 클라이언트 연결 (연결마다 네트워크 루프 스레드 하나)
+- 연결별 재연결 상태(백오프, 연결/끊김 횟수, 마지막 오류)와 수신 통계
+- 와일드카드 구독 지원 (예: "+/TP3237" -> 첫 토픽 레벨을 마스터 ID로 사용)
+- shards > 1 이면 같은 설정으로 클라이언트를 여러 개 띄워 토픽을 나눠 구독
+  (shared_group 지정 시 $share/<group>/<topic> 공유 구독으로 브로커가 메시지를 분배)
+
+연결 설정 예 (MQTT_CONNECTIONS 환경 변수 또는 JSON 파일):
+[
+  {"name": "line1", "host": "192.168.1.3", "port": 1883, "topics": ["+/TP3237", "+/VVB001"]},
+  {"name": "line2", "host": "10.0.0.7", "topics": ["TP3237", "VVB001"], "master": "10.0.0.8", "shards": 2}
+]
+"""
+import json
+import os
+import threading
+import time
+
+import paho.mqtt.client as mqtt
+
+from log_config import get_logger
+
+log = get_logger('mqtt')
+
+
+class MqttConnection:
+    """브로커 연결 하나 (자체 네트워크 루프 스레드와 재연결 상태 보유)"""
+
+    def __init__(self, name, host, port=1883, topics=(), master=None, on_message=None,
+                 keepalive=60, client_id=None, username=None, password=None,
+                 min_reconnect_delay=1, max_reconnect_delay=120):
+        self.name = name
+        self.host = host
+        self.port = int(port)
+        self.topics = list(topics)
+        # 토픽에 마스터 ID가 없을 때(와일드카드가 아닌 구독) 샘플에 붙일 기본 마스터
+        self.master = master
+        self.keepalive = keepalive
+        self._on_message = on_message
+        self._lock = threading.Lock()
+        self._stats = {
+            'state': 'idle',
+            'messages': 0,
+            'bytes': 0,
+            'rejected': 0,
+            'connects': 0,
+            'disconnects': 0,
+            'connect_failures': 0,
+            'last_connect_at': None,
+            'last_disconnect_at': None,
+            'last_message_at': None,
+            'last_error': None
+        }
+
+        self.client = mqtt.Client(client_id=client_id or '', clean_session=True)
+        if username:
+            self.client.username_pw_set(username, password)
+        self.client.reconnect_delay_set(min_delay=min_reconnect_delay, max_delay=max_reconnect_delay)
+        self.client.on_connect = self._handle_connect
+        self.client.on_connect_fail = self._handle_connect_fail
+        self.client.on_disconnect = self._handle_disconnect
+        self.client.on_message = self._handle_message
+
+    def start(self):
+        """비동기 연결 시작 (연결 실패/끊김 시 paho 루프가 백오프하며 재연결)"""
+        self._set_state('connecting')
+        log.info("🔄 [%s] Connecting to MQTT broker %s:%s", self.name, self.host, self.port)
+        self.client.connect_async(self.host, self.port, self.keepalive)
+        self.client.loop_start()
+
+    def stop(self):
+        self._set_state('stopped')
+        try:
+            self.client.disconnect()
+        except Exception:
+            pass
+        self.client.loop_stop()
+
+    def is_connected(self):
+        return self.client.is_connected()
+
+    def _set_state(self, state):
+        with self._lock:
+            self._stats['state'] = state
+
+    def _handle_connect(self, client, userdata, flags, rc):
+        if rc != 0:
+            with self._lock:
+                self._stats['connect_failures'] += 1
+                self._stats['last_error'] = mqtt.connack_string(rc)
+            log.error("❌ [%s] MQTT Connection failed with code %s", self.name, rc)
+            return
+        with self._lock:
+            self._stats['state'] = 'connected'
+            self._stats['connects'] += 1
+            self._stats['last_connect_at'] = time.time()
+        log.info("✅ [%s] MQTT Connected to %s:%s", self.name, self.host, self.port)
+        # 재연결 시에도 다시 구독 (clean session)
+        for topic in self.topics:
+            client.subscribe(topic)
+            log.info("✅ [%s] Subscribed to topic: %s", self.name, topic)
+
+    def _handle_connect_fail(self, client, userdata):
+        """브로커에 TCP 연결조차 실패한 경우 (paho 루프가 백오프 후 재시도)"""
+        with self._lock:
+            self._stats['state'] = 'reconnecting'
+            self._stats['connect_failures'] += 1
+            self._stats['last_error'] = 'connection failed'
+        log.warning("⚠️ [%s] MQTT broker %s:%s unreachable, retrying", self.name, self.host, self.port)
+
+    def _handle_disconnect(self, client, userdata, rc):
+        with self._lock:
+            if self._stats['state'] != 'stopped':
+                self._stats['state'] = 'reconnecting' if rc != 0 else 'disconnected'
+            self._stats['disconnects'] += 1
+            self._stats['last_disconnect_at'] = time.time()
+            if rc != 0:
+                self._stats['last_error'] = mqtt.error_string(rc)
+        log.warning("🔌 [%s] MQTT Disconnected (rc=%s)", self.name, rc)
+
+    def _handle_message(self, client, userdata, msg):
+        """paho 네트워크 스레드: 통계만 갱신하고 바로 수집 큐로 넘김"""
+        receive_ts = time.time()
+        accepted = self._on_message(self, msg.topic, msg.payload, receive_ts) if self._on_message else True
+        with self._lock:
+            stats = self._stats
+            stats['messages'] += 1
+            stats['bytes'] += len(msg.payload)
+            stats['last_message_at'] = receive_ts
+            if not accepted:
+                stats['rejected'] += 1
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        stats.update({
+            'name': self.name,
+            'broker': f'{self.host}:{self.port}',
+            'master': self.master,
+            'topics': list(self.topics),
+            'connected': self.is_connected()
+        })
+        return stats
+
+
+class IngestManager:
+    """설정된 MQTT 연결 전체를 관리하고 수신 메시지를 수집 파이프라인으로 전달"""
+
+    def __init__(self, submit, connections=()):
+        # submit(topic, payload, receive_ts, source) -> bool (큐가 가득 차면 False)
+        self._submit = submit
+        self.connections = []
+        for config in connections:
+            self.add_connection(**config)
+
+    def add_connection(self, name, host, port=1883, topics=(), master=None, shards=1, shared_group=None, **options):
+        """연결 추가 (shards > 1 이면 클라이언트 여러 개로 나눔)"""
+        shards = max(1, int(shards))
+        if shards == 1:
+            self.connections.append(MqttConnection(name, host, port, topics, master, self._dispatch, **options))
+            return
+        for i in range(shards):
+            if shared_group:
+                shard_topics = [f'$share/{shared_group}/{topic}' for topic in topics]
+            else:
+                shard_topics = list(topics)[i::shards]
+            if not shard_topics:
+                continue
+            shard_options = dict(options)
+            if options.get('client_id'):
+                shard_options['client_id'] = f"{options['client_id']}-{i}"
+            self.connections.append(
+                MqttConnection(f'{name}#{i}', host, port, shard_topics, master, self._dispatch, **shard_options)
+            )
+
+    def start(self):
+        for connection in self.connections:
+            try:
+                connection.start()
+            except Exception as e:
+                log.error("❌ [%s] MQTT Connection error: %s", connection.name, e)
+
+    def stop(self):
+        for connection in self.connections:
+            connection.stop()
+
+    def is_connected(self):
+        """하나 이상의 연결이 살아 있는지"""
+        return any(connection.is_connected() for connection in self.connections)
+
+    @property
+    def last_message_time(self):
+        times = [c.get_stats()['last_message_at'] for c in self.connections]
+        times = [t for t in times if t is not None]
+        return max(times) if times else None
+
+    def _dispatch(self, connection, topic, payload, receive_ts):
+        accepted = self._submit(topic, payload, receive_ts, connection.master)
+        if not accepted:
+            log.warning("⚠️ Ingest queue full, dropped message on topic %s", topic)
+        return accepted
+
+    def get_stats(self):
+        connections = [connection.get_stats() for connection in self.connections]
+        return {
+            'connections': connections,
+            'connected': sum(1 for c in connections if c['connected']),
+            'total': len(connections),
+            'messages': sum(c['messages'] for c in connections),
+            'bytes': sum(c['bytes'] for c in connections)
+        }
+
+
+def load_connection_config(default):
+    """MQTT_CONNECTIONS(JSON 문자열) 또는 MQTT_CONNECTIONS_FILE(JSON 파일)에서 연결 설정 읽기"""
+    raw = os.environ.get('MQTT_CONNECTIONS')
+    path = os.environ.get('MQTT_CONNECTIONS_FILE')
+    try:
+        if raw:
+            return json.loads(raw)
+        if path:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+    except Exception as e:
+        log.error("❌ Invalid MQTT connection config, using default broker: %s", e)
+    return default
@@ -0,0 +1,133 @@
+"""
+MQTT 수집 파이프라인 모듈
+- paho 네트워크 스레드는 (topic, payload, receive_ts)를 큐에 넣기만 함
+- decode 스테이지: 워커 풀이 JSON 파싱/디코딩 후 SSE 허브, 최신값 저장소 갱신
+- persist 스테이지: 별도 워커가 InfluxDB 포인트 생성 및 쓰기
+- 스테이지마다 큐 깊이, 대기/처리 지연시간 통계 제공
+"""
+import queue
+import threading
+import time
+import zlib
+
+from log_config import get_logger
+
+log = get_logger('ingest')
+
+
+class Stage:
+    """유한 큐 + 워커 스레드로 구성된 처리 스테이지"""
+
+    def __init__(self, name, handler, workers=1, queue_size=10000):
+        self.name = name
+        self._handler = handler
+        # 워커마다 전용 큐를 두고 key로 샤딩 (같은 토픽은 항상 같은 워커 -> 순서 보장)
+        self._queues = [queue.Queue(maxsize=queue_size) for _ in range(workers)]
+        self._threads = []
+        self._stop_event = threading.Event()
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            'submitted': 0,
+            'processed': 0,
+            'dropped': 0,
+            'errors': 0,
+            'total_wait_ms': 0.0,
+            'total_process_ms': 0.0,
+            'max_wait_ms': 0.0,
+            'max_process_ms': 0.0
+        }
+        for i, q in enumerate(self._queues):
+            thread = threading.Thread(target=self._run, args=(q,), name=f'ingest-{name}-{i}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def submit(self, key, *args):
+        """작업 추가 (블로킹 없음, 큐가 가득 차면 드롭 후 False 반환)"""
+        q = self._queues[zlib.crc32(key.encode()) % len(self._queues)] if len(self._queues) > 1 else self._queues[0]
+        try:
+            q.put_nowait((time.perf_counter(), args))
+        except queue.Full:
+            with self._stats_lock:
+                self._stats['dropped'] += 1
+            return False
+        with self._stats_lock:
+            self._stats['submitted'] += 1
+        return True
+
+    def stop(self, timeout=2.0):
+        self._stop_event.set()
+        for thread in self._threads:
+            thread.join(timeout=timeout)
+
+    def _run(self, q):
+        while not self._stop_event.is_set():
+            try:
+                enqueued_at, args = q.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            started = time.perf_counter()
+            failed = False
+            try:
+                self._handler(*args)
+            except Exception as e:
+                failed = True
+                log.exception("❌ Ingest stage '%s' error: %s", self.name, e)
+            finished = time.perf_counter()
+            wait_ms = (started - enqueued_at) * 1000
+            process_ms = (finished - started) * 1000
+            with self._stats_lock:
+                stats = self._stats
+                stats['processed'] += 1
+                if failed:
+                    stats['errors'] += 1
+                stats['total_wait_ms'] += wait_ms
+                stats['total_process_ms'] += process_ms
+                if wait_ms > stats['max_wait_ms']:
+                    stats['max_wait_ms'] = wait_ms
+                if process_ms > stats['max_process_ms']:
+                    stats['max_process_ms'] = process_ms
+
+    def get_stats(self):
+        with self._stats_lock:
+            stats = dict(self._stats)
+        processed = stats['processed']
+        total_wait_ms = stats.pop('total_wait_ms')
+        total_process_ms = stats.pop('total_process_ms')
+        stats['avg_wait_ms'] = round(total_wait_ms / processed, 3) if processed else None
+        stats['avg_process_ms'] = round(total_process_ms / processed, 3) if processed else None
+        stats['max_wait_ms'] = round(stats['max_wait_ms'], 3)
+        stats['max_process_ms'] = round(stats['max_process_ms'], 3)
+        stats['workers'] = len(self._queues)
+        stats['queue_depth'] = sum(q.qsize() for q in self._queues)
+        stats['queue_capacity'] = sum(q.maxsize for q in self._queues)
+        return stats
+
+
+class IngestPipeline:
+    """decode -> persist 2단계 수집 파이프라인"""
+
+    def __init__(self, decode_handler, decode_workers=2, persist_workers=1, queue_size=10000):
+        self.decode_stage = Stage('decode', decode_handler, workers=decode_workers, queue_size=queue_size)
+        self.persist_stage = Stage('persist', _call, workers=persist_workers, queue_size=queue_size)
+
+    def submit(self, topic, payload, receive_ts, source=None):
+        """paho 콜백에서 호출: 원시 메시지만 큐에 추가 (source: 수신 연결의 기본 마스터 ID)"""
+        return self.decode_stage.submit(topic, topic, payload, receive_ts, source)
+
+    def persist(self, key, func, *args):
+        """decode 워커에서 호출: 저장 작업을 persist 스테이지로 넘김"""
+        return self.persist_stage.submit(key, func, *args)
+
+    def stop(self):
+        self.decode_stage.stop()
+        self.persist_stage.stop()
+
+    def get_stats(self):
+        return {
+            'decode': self.decode_stage.get_stats(),
+            'persist': self.persist_stage.get_stats()
+        }
+
+
+def _call(func, *args):
+    func(*args)
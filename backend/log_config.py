@@ -0,0 +1,236 @@
+"""
+백엔드 로깅 설정 모듈
+- 카테고리(ingest, mqtt, influx, sse, api, ai)별 로그 레벨
+- 같은 메시지 템플릿이 반복되면 초당 개수 제한 (억제된 개수는 다음 출력에 표시)
+- DEBUG/INFO 반복 로그는 N개 중 1개만 샘플링 가능
+- 로그 레코드는 큐에 넣기만 하고 출력은 별도 스레드에서 (호출 스레드가 stdout I/O를 기다리지 않음)
+- 메시지는 %-포맷 인자로 넘겨 실제로 출력될 때만 문자열 생성 (lazy 헬퍼로 비싼 값도 지연)
+
+환경 변수:
+- LOG_LEVEL: 기본 레벨 (기본 INFO)
+- LOG_LEVELS: 카테고리별 레벨 (예: "ingest=DEBUG,influx=WARNING")
+- LOG_RATE_LIMIT: 메시지 템플릿별 초당 최대 출력 수 (0이면 제한 없음, 기본 5)
+- LOG_RATE_BURST: 순간 허용량 (기본 20)
+- LOG_SAMPLE: 카테고리별 샘플링 (예: "ingest=100" -> DEBUG/INFO 100개 중 1개)
+- LOG_FORMAT: text 또는 json
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+import time
+
+LOGGER_PREFIX = 'dashboard'
+CATEGORIES = ('ingest', 'mqtt', 'influx', 'sse', 'api', 'ai')
+LOG_QUEUE_SIZE = 10000  # 출력 대기 큐 최대 크기 (초과 시 드롭)
+MAX_TRACKED_TEMPLATES = 1024  # 속도 제한용으로 추적하는 메시지 템플릿 수 상한
+
+_root = logging.getLogger(LOGGER_PREFIX)
+_root.propagate = False
+_root.addHandler(logging.NullHandler())
+
+_setup_lock = threading.Lock()
+_filter = None
+_queue_handler = None
+_listener = None
+
+
+def get_logger(category):
+    """카테고리 로거 반환 (예: get_logger('ingest') -> 'dashboard.ingest')"""
+    return logging.getLogger(f'{LOGGER_PREFIX}.{category}')
+
+
+class lazy:
+    """출력될 때만 계산되는 로그 인자 (예: log.debug('%s', lazy(json.dumps, data, indent=2)))"""
+
+    __slots__ = ('func', 'args', 'kwargs')
+
+    def __init__(self, func, *args, **kwargs):
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+
+    def __str__(self):
+        return str(self.func(*self.args, **self.kwargs))
+
+
+class RateLimitFilter(logging.Filter):
+    """메시지 템플릿별 토큰 버킷 속도 제한 + 카테고리별 샘플링"""
+
+    def __init__(self, rate=5.0, burst=20, sample=None):
+        super().__init__()
+        self.rate = rate
+        self.burst = burst
+        self.sample = dict(sample or {})  # 카테고리 -> N (DEBUG/INFO N개 중 1개)
+        self._lock = threading.Lock()
+        self._templates = {}  # (logger, msg) -> [tokens, last_refill, seen, suppressed]
+        self._stats = {}
+
+    def filter(self, record):
+        key = (record.name, record.msg)
+        category = record.name[len(LOGGER_PREFIX) + 1:] or record.name
+        now = time.monotonic()
+        with self._lock:
+            state = self._templates.get(key)
+            if state is None:
+                if len(self._templates) >= MAX_TRACKED_TEMPLATES:
+                    self._templates.clear()
+                state = self._templates[key] = [float(self.burst), now, 0, 0]
+            stats = self._stats.get(category)
+            if stats is None:
+                stats = self._stats[category] = {'emitted': 0, 'sampled_out': 0, 'suppressed': 0}
+            state[2] += 1
+
+            every = self.sample.get(category)
+            if every and every > 1 and record.levelno < logging.WARNING and (state[2] - 1) % every:
+                stats['sampled_out'] += 1
+                return False
+
+            if self.rate > 0:
+                state[0] = min(float(self.burst), state[0] + (now - state[1]) * self.rate)
+                state[1] = now
+                if state[0] < 1.0:
+                    state[3] += 1
+                    stats['suppressed'] += 1
+                    return False
+                state[0] -= 1.0
+
+            record.suppressed = state[3]
+            state[3] = 0
+            stats['emitted'] += 1
+        return True
+
+    def get_stats(self):
+        with self._lock:
+            return {category: dict(stats) for category, stats in self._stats.items()}
+
+
+class TextFormatter(logging.Formatter):
+    """기존 print 출력과 같은 한 줄 형식 + 시각/카테고리"""
+
+    def __init__(self):
+        super().__init__('%(asctime)s [%(category)s] %(message)s')
+
+    def format(self, record):
+        record.category = record.name[len(LOGGER_PREFIX) + 1:] or record.name
+        line = super().format(record)
+        if getattr(record, 'suppressed', 0):
+            line += f' (+{record.suppressed} similar messages suppressed)'
+        return line
+
+
+class JsonFormatter(logging.Formatter):
+    """한 줄 JSON 형식 (로그 수집기용)"""
+
+    def format(self, record):
+        entry = {
+            'ts': round(record.created, 3),
+            'level': record.levelname,
+            'category': record.name[len(LOGGER_PREFIX) + 1:] or record.name,
+            'msg': record.getMessage()
+        }
+        if getattr(record, 'suppressed', 0):
+            entry['suppressed'] = record.suppressed
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class _DroppingQueueHandler(logging.handlers.QueueHandler):
+    """큐가 가득 차면 블로킹하지 않고 레코드를 버림"""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def _parse_mapping(value):
+    """"a=1,b=2" 형식 환경 변수 파싱"""
+    mapping = {}
+    for item in (value or '').split(','):
+        if '=' in item:
+            name, _, setting = item.partition('=')
+            mapping[name.strip()] = setting.strip()
+    return mapping
+
+
+def setup_logging(level=None, levels=None, rate_limit=None, burst=None, sample=None, fmt=None, stream=None):
+    """로깅 설정 (인자를 생략하면 환경 변수 값 사용, 다시 호출하면 설정을 교체)"""
+    global _filter, _queue_handler, _listener
+    level = (level or os.environ.get('LOG_LEVEL', 'INFO')).upper()
+    if levels is None:
+        levels = _parse_mapping(os.environ.get('LOG_LEVELS'))
+    if rate_limit is None:
+        rate_limit = float(os.environ.get('LOG_RATE_LIMIT', 5))
+    if burst is None:
+        burst = int(os.environ.get('LOG_RATE_BURST', 20))
+    if sample is None:
+        sample = {name: int(n) for name, n in _parse_mapping(os.environ.get('LOG_SAMPLE')).items()}
+    fmt = fmt or os.environ.get('LOG_FORMAT', 'text')
+
+    with _setup_lock:
+        _shutdown_locked()
+        _root.setLevel(level)
+        for category in CATEGORIES:
+            get_logger(category).setLevel(logging.NOTSET)
+        for category, category_level in levels.items():
+            get_logger(category).setLevel(str(category_level).upper())
+
+        output = logging.StreamHandler(stream or sys.stdout)
+        output.setFormatter(JsonFormatter() if fmt == 'json' else TextFormatter())
+        _filter = RateLimitFilter(rate=rate_limit, burst=burst, sample=sample)
+        _queue_handler = _DroppingQueueHandler(queue.Queue(maxsize=LOG_QUEUE_SIZE))
+        _queue_handler.addFilter(_filter)
+        _root.addHandler(_queue_handler)
+        _listener = logging.handlers.QueueListener(_queue_handler.queue, output)
+        _listener.start()
+
+
+def shutdown_logging():
+    """대기 중인 로그를 모두 출력하고 출력 스레드 종료"""
+    with _setup_lock:
+        _shutdown_locked()
+
+
+def _shutdown_locked():
+    global _queue_handler, _listener
+    if _queue_handler is not None:
+        _root.removeHandler(_queue_handler)
+        _queue_handler = None
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.flush()
+        _listener = None
+
+
+atexit.register(shutdown_logging)
+
+
+def get_stats():
+    """카테고리별 출력/억제/샘플링 개수와 출력 큐 상태"""
+    with _setup_lock:
+        handler = _queue_handler
+        rate_filter = _filter
+    return {
+        'level': logging.getLevelName(_root.level),
+        'levels': {
+            category: logging.getLevelName(get_logger(category).getEffectiveLevel()) for category in CATEGORIES
+        },
+        'rate_limit': rate_filter.rate if rate_filter else None,
+        'burst': rate_filter.burst if rate_filter else None,
+        'sample': dict(rate_filter.sample) if rate_filter else {},
+        'categories': rate_filter.get_stats() if rate_filter else {},
+        'queue_depth': handler.queue.qsize() if handler else 0,
+        'queue_dropped': handler.dropped if handler else 0
+    }
@@ -0,0 +1,183 @@
+"""
+MQTT 토픽 라우터 모듈
+- 토픽 -> IO-Link 디바이스 라우팅 (dict 조회 한 번)
+- IO-Link 디바이스 ID별 디코더/핸들러 등록
+- 토픽별 pdin 경로는 처음 찾은 뒤 캐시 (매 메시지마다 후보 경로를 훑지 않음)
+- 센서 정보 추출은 토픽별로 일정 간격마다만 실행
+- 등록된 토픽이 아니면 마지막 토픽 레벨로 디바이스를 찾고 앞부분을 마스터 ID로 사용
+  (예: "master-3/VVB001" -> VVB001 라우트, master="master-3")
+"""
+import json
+import re
+import threading
+import time
+
+from log_config import get_logger, lazy
+
+log = get_logger('ingest')
+
+MAX_RESOLVED_TOPICS = 4096  # 와일드카드로 들어온 토픽 라우트 캐시 상한
+_PORT_PATTERN = re.compile(r'port\[(\d+)\]')
+
+
+class DeviceDecoder:
+    """IO-Link 디바이스 하나의 디코더와 처리 핸들러"""
+
+    __slots__ = ('device_id', 'decode', 'handle', 'name')
+
+    def __init__(self, device_id, decode, handle, name=None):
+        self.device_id = device_id
+        self.decode = decode  # pdin 16진수 문자열 -> 디코딩 결과 (실패 시 None)
+        self.handle = handle  # (topic, decoded, context) -> None
+        self.name = name or str(device_id)
+
+
+class TopicRoute:
+    """토픽 하나의 라우팅 정보 (pdin 경로 캐시 포함)"""
+
+    __slots__ = ('topic', 'device_id', 'pdin_paths', 'pdin_path', 'pdin_port', 'port', 'master',
+                 'info_interval', 'last_info_time', 'messages', 'errors')
+
+    def __init__(self, topic, device_id, pdin_paths, port=None, info_interval=None, master=None):
+        self.topic = topic
+        self.device_id = device_id
+        self.pdin_paths = list(pdin_paths)
+        self.pdin_path = None  # 확인된 pdin 경로 (캐시)
+        self.pdin_port = None  # 캐시된 pdin 경로의 IO-Link 포트 번호
+        self.port = port
+        self.master = master  # 토픽에서 얻은 IO-Link 마스터 ID
+        self.info_interval = info_interval
+        self.last_info_time = 0
+        self.messages = 0
+        self.errors = 0
+
+    def find_pdin(self, payload):
+        """pdin 16진수 데이터 찾기 (캐시된 경로 우선)"""
+        if self.pdin_path is not None:
+            entry = payload.get(self.pdin_path)
+            if entry:
+                hex_data = entry.get('data')
+                if hex_data:
+                    return hex_data
+        for path in self.pdin_paths:
+            entry = payload.get(path)
+            if entry:
+                hex_data = entry.get('data')
+                if hex_data:
+                    self.pdin_path = path
+                    match = _PORT_PATTERN.search(path)
+                    self.pdin_port = match.group(1) if match else None
+                    return hex_data
+        return None
+
+
+class MqttRouter:
+    """토픽 -> 디바이스 디코더 디스패처"""
+
+    def __init__(self, default_handler=None, info_extractor=None):
+        self._decoders = {}
+        self._routes = {}
+        self._resolved = {}  # 와일드카드 토픽 -> 마스터별 라우트
+        self._lock = threading.Lock()
+        # 라우트가 없는 토픽 처리 (topic, data, context)
+        self.default_handler = default_handler
+        # 센서 디바이스 정보 추출 함수 (data, payload, port)
+        self.info_extractor = info_extractor
+
+    def register_decoder(self, device_id, decode, handle, name=None):
+        """IO-Link 디바이스 ID에 디코더 등록"""
+        with self._lock:
+            self._decoders[device_id] = DeviceDecoder(device_id, decode, handle, name)
+
+    def add_route(self, topic, device_id, pdin_paths, port=None, info_interval=None):
+        """토픽을 디바이스에 연결 (info_interval: 센서 정보 추출 간격, 초)"""
+        with self._lock:
+            self._routes[topic] = TopicRoute(topic, device_id, pdin_paths, port, info_interval)
+            self._resolved.clear()
+
+    def topics(self):
+        return list(self._routes.keys())
+
+    def resolve(self, topic):
+        """토픽에 해당하는 라우트 (등록된 토픽 -> 마스터별 캐시 -> 마지막 토픽 레벨 순)"""
+        route = self._routes.get(topic)
+        if route is not None:
+            return route
+        route = self._resolved.get(topic)
+        if route is not None:
+            return route
+        master, _, device_topic = topic.rpartition('/')
+        template = self._routes.get(device_topic) if master else None
+        if template is None:
+            return None
+        # 마스터마다 pdin 경로 캐시와 통계를 따로 유지
+        route = TopicRoute(topic, template.device_id, template.pdin_paths, template.port,
+                           template.info_interval, master=master)
+        with self._lock:
+            if len(self._resolved) < MAX_RESOLVED_TOPICS:
+                self._resolved[topic] = route
+        return route
+
+    def dispatch(self, topic, data, context=None):
+        """파싱된 MQTT 메시지를 해당 디바이스 디코더로 전달
+
+        context에는 master/port/device 태그를 채워 핸들러로 넘김
+        (등록되지 않은 토픽도 수신 시각/수신 연결의 master가 든 context를 default_handler로 넘김)
+        """
+        route = self.resolve(topic)
+        if route is None:
+            if self.default_handler is not None:
+                self.default_handler(topic, data, context)
+            return
+
+        route.messages += 1
+        decoder = self._decoders.get(route.device_id)
+        if decoder is None:
+            route.errors += 1
+            log.warning("⚠️ No decoder registered for device %s (topic: %s)", route.device_id, topic)
+            return
+
+        payload = data.get('data', {}).get('payload', {})
+
+        if route.info_interval is not None and self.info_extractor is not None:
+            now = time.time()
+            if now - route.last_info_time >= route.info_interval:
+                route.last_info_time = now
+                try:
+                    self.info_extractor(data, payload, port=route.port)
+                except Exception as e:
+                    log.warning("❌ 센서 정보 추출 중 오류: %s", e)
+
+        hex_data = route.find_pdin(payload)
+        if not hex_data:
+            route.errors += 1
+            log.warning("⚠️ Hex data not found in %s message structure (topic: %s)", decoder.name, topic)
+            log.debug("📋 Message structure: %s", lazy(json.dumps, data, indent=2, ensure_ascii=False))
+            return
+
+        decoded = decoder.decode(hex_data)
+        if decoded is None:
+            route.errors += 1
+            log.warning("⚠️ Failed to decode %s data (topic: %s)", decoder.name, topic)
+            return
+
+        if context is not None:
+            if route.master is not None:
+                context['master'] = route.master
+            context['port'] = route.pdin_port
+            context['device'] = decoder.name
+        decoder.handle(topic, decoded, context)
+
+    def get_stats(self):
+        with self._lock:
+            routes = list(self._routes.items()) + list(self._resolved.items())
+        return {
+            topic: {
+                'device_id': route.device_id,
+                'master': route.master,
+                'pdin_path': route.pdin_path,
+                'messages': route.messages,
+                'errors': route.errors
+            }
+            for topic, route in routes
+        }
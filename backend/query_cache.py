@@ -0,0 +1,130 @@
+"""
+히스토리 조회 결과 캐시 모듈
+- 키: (bucket, measurement, fields, range, window, ...) -> 조회 결과
+- 만료 시각: 가장 최근 집계 구간이 끝나는 시각 (구간 경계에 맞춘 TTL)
+- 같은 키로 동시에 들어온 요청은 InfluxDB 조회 한 번으로 합침 (single-flight)
+- 항목 수/셀 수 상한을 넘으면 가장 오래 사용되지 않은 항목부터 제거 (LRU)
+"""
+import threading
+import time
+from collections import OrderedDict
+
+
+class _InFlight:
+    """진행 중인 조회 (대기자는 done 이벤트를 기다렸다가 결과를 같이 받음)"""
+
+    __slots__ = ('done', 'value', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+def window_expiry(window_seconds, now=None):
+    """현재 열려 있는 구간이 닫히는 시각 (epoch 초, 구간 경계 정렬)"""
+    now = time.time() if now is None else now
+    return (now // window_seconds + 1) * window_seconds
+
+
+class QueryCache:
+    """만료 시각 + LRU 기반 조회 결과 캐시"""
+
+    def __init__(self, max_entries=256, max_cells=2000000):
+        self.max_entries = max_entries
+        # 캐시에 보관할 총 값 개수 상한 (행 수 x 컬럼 수, 메모리 상한 근사치)
+        self.max_cells = max_cells
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (expires_at, cells, value)
+        self._inflight = {}
+        self._cells = 0
+        self._stats = {
+            'hits': 0,
+            'misses': 0,
+            'coalesced': 0,
+            'expired': 0,
+            'evicted': 0,
+            'errors': 0
+        }
+
+    def get_or_load(self, key, loader, expires_at, size=None):
+        """캐시된 값 반환, 없으면 loader()로 조회 (동시 요청은 한 번만 조회)
+
+        expires_at: 만료 시각 (epoch 초) 또는 값을 받아 만료 시각을 돌려주는 함수
+        size: 값을 받아 셀 수를 돌려주는 함수 (LRU 메모리 상한용)
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > time.time():
+                    self._entries.move_to_end(key)
+                    self._stats['hits'] += 1
+                    return entry[2]
+                self._remove(key)
+                self._stats['expired'] += 1
+            flight = self._inflight.get(key)
+            if flight is not None:
+                self._stats['coalesced'] += 1
+                leader = False
+            else:
+                flight = self._inflight[key] = _InFlight()
+                self._stats['misses'] += 1
+                leader = True
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            value = loader()
+        except Exception as e:
+            flight.error = e
+            with self._lock:
+                self._stats['errors'] += 1
+                del self._inflight[key]
+            flight.done.set()
+            raise
+
+        flight.value = value
+        expiry = expires_at(value) if callable(expires_at) else expires_at
+        cells = size(value) if size is not None else 1
+        with self._lock:
+            del self._inflight[key]
+            if expiry > time.time() and cells <= self.max_cells:
+                if key in self._entries:
+                    self._remove(key)
+                self._entries[key] = (expiry, cells, value)
+                self._cells += cells
+                self._evict()
+        flight.done.set()
+        return value
+
+    def invalidate(self, match=None):
+        """항목 삭제 (match(key)가 참인 항목만, 생략 시 전체)"""
+        with self._lock:
+            for key in [k for k in self._entries if match is None or match(k)]:
+                self._remove(key)
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['entries'] = len(self._entries)
+            stats['cells'] = self._cells
+            stats['inflight'] = len(self._inflight)
+        lookups = stats['hits'] + stats['misses'] + stats['coalesced']
+        stats['hit_ratio'] = round((stats['hits'] + stats['coalesced']) / lookups, 3) if lookups else None
+        stats['max_entries'] = self.max_entries
+        stats['max_cells'] = self.max_cells
+        return stats
+
+    def _remove(self, key):
+        _, cells, _ = self._entries.pop(key)
+        self._cells -= cells
+
+    def _evict(self):
+        while self._entries and (len(self._entries) > self.max_entries or self._cells > self.max_cells):
+            key = next(iter(self._entries))
+            self._remove(key)
+            self._stats['evicted'] += 1
@@ -0,0 +1,179 @@
+"""
+롤업 계층 모듈
+- 수집 시점에 10s/1m/5m/30m 등 계층별 구간 집계(필드별 mean/min/max/count)를 계속 유지
+- 가장 촘촘한 계층만 샘플을 받고, 닫힌 구간은 다음 계층 구간에 병합 (샘플당 비용은 계층 수와 무관)
+- 닫힌 구간은 emit(tier, bucket, measurement, window)로 넘겨 <원본 버킷>_<계층 이름> 버킷에 기록
+- 이미 기록한 구간에 늦게 도착한 샘플/하위 구간은 버리고 집계만 함 (같은 시각 포인트로 덮어써 피크/개수가 사라지지 않도록)
+- 롤업 버킷이 없으면 보존 기간을 지정해 생성 (provision_rollup_buckets)
+"""
+import threading
+import time
+
+from influxdb_client import BucketRetentionRules
+
+from downsampler import IntervalWindow
+from log_config import get_logger
+
+log = get_logger('influx')
+
+
+class RollupTier:
+    """롤업 계층 하나 (이름은 Flux 기간 문자열, retention은 초 단위, 0이면 무기한)"""
+
+    __slots__ = ('name', 'seconds', 'retention')
+
+    def __init__(self, name, seconds, retention=0):
+        self.name = name
+        self.seconds = seconds
+        self.retention = retention
+
+    def bucket_for(self, source_bucket):
+        return f'{source_bucket}_{self.name}'
+
+    def __repr__(self):
+        return f'RollupTier({self.name})'
+
+
+def make_tiers(config):
+    """(이름, 초, 보존 기간) 목록 -> 촘촘한 순으로 정렬된 RollupTier 목록"""
+    return sorted((RollupTier(*entry) for entry in config), key=lambda tier: tier.seconds)
+
+
+class RollupAggregator:
+    """수집 샘플을 롤업 계층별 구간으로 집계"""
+
+    def __init__(self, emit, tiers, flush_grace=2.0):
+        self._emit = emit
+        self.tiers = list(tiers)
+        # 구간 종료 후 늦게 도착하는 샘플을 기다리는 시간 (초)
+        self.flush_grace = flush_grace
+        self._windows = [{} for _ in self.tiers]  # 계층별 (bucket, measurement, 태그) -> 현재 구간
+        self._emitted_until = [{} for _ in self.tiers]  # 계층별 키 -> 마지막으로 닫은 구간의 끝 (epoch 초)
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+        self.samples = 0
+        self.late_samples = 0
+        self.dropped_samples = 0
+        self.dropped_windows = {tier.name: 0 for tier in self.tiers}
+        self.emitted = {tier.name: 0 for tier in self.tiers}
+
+    def add(self, bucket, measurement, values, ts=None, tags=None):
+        """원본 샘플 추가 (values: 필드명 -> 값, ts: epoch 초, tags: 시리즈 태그)"""
+        ts = time.time() if ts is None else ts
+        key = (bucket, measurement, tuple(sorted(tags.items())) if tags else ())
+        closed = []
+        with self._lock:
+            self.samples += 1
+            windows = self._windows[0]
+            window = windows.get(key)
+            if window is not None and ts >= window.end:
+                self._close(0, key, window, closed)
+                window = None
+            if window is None:
+                if ts < self._emitted_until[0].get(key, ts):
+                    # 이미 닫은 구간의 샘플: 같은 start로 새 구간을 열면 앞서 기록한 포인트를 덮어씀
+                    self.late_samples += 1
+                    self.dropped_samples += 1
+                    return
+                seconds = self.tiers[0].seconds
+                window = windows[key] = IntervalWindow(ts - ts % seconds, seconds, tags)
+            elif ts < window.start:
+                self.late_samples += 1  # 이미 닫힌 구간의 샘플은 현재 구간에 합침
+            window.add(values)
+        self._emit_all(closed)
+
+    def _close(self, level, key, window, closed):
+        """level 계층의 구간을 닫고 다음 계층에 병합 (잠금 보유 상태에서 호출)"""
+        del self._windows[level][key]
+        self._emitted_until[level][key] = window.end
+        closed.append((self.tiers[level], key, window))
+        if level + 1 >= len(self.tiers):
+            return
+        windows = self._windows[level + 1]
+        upper = windows.get(key)
+        if upper is not None and window.start >= upper.end:
+            self._close(level + 1, key, upper, closed)
+            upper = None
+        if upper is None:
+            if window.start < self._emitted_until[level + 1].get(key, window.start):
+                # 상위 구간을 이미 닫은 뒤 도착한 하위 구간은 상위 계층에 병합하지 않음
+                self.dropped_windows[self.tiers[level + 1].name] += 1
+                return
+            seconds = self.tiers[level + 1].seconds
+            upper = windows[key] = IntervalWindow(window.start - window.start % seconds, seconds, window.tags)
+        upper.merge(window)
+
+    def flush_expired(self, now=None):
+        """종료 시각이 지난 구간을 촘촘한 계층부터 닫음 (샘플이 끊겨도 상위 계층까지 기록되도록)"""
+        now = time.time() if now is None else now
+        closed = []
+        with self._lock:
+            for level in range(len(self.tiers)):
+                for key, window in list(self._windows[level].items()):
+                    if now >= window.end + self.flush_grace:
+                        self._close(level, key, window, closed)
+        self._emit_all(closed)
+
+    def flush_all(self):
+        closed = []
+        with self._lock:
+            for level in range(len(self.tiers)):
+                for key, window in list(self._windows[level].items()):
+                    self._close(level, key, window, closed)
+        self._emit_all(closed)
+
+    def start(self, tick=1.0):
+        """만료 구간을 주기적으로 기록하는 백그라운드 스레드 시작"""
+        if self._thread is not None:
+            return
+        def run():
+            while not self._stop_event.wait(tick):
+                try:
+                    self.flush_expired()
+                except Exception as e:
+                    log.exception("❌ Rollup flush error: %s", e)
+        self._thread = threading.Thread(target=run, name='rollup', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+        self.flush_all()
+
+    def get_stats(self):
+        with self._lock:
+            open_windows = {tier.name: len(windows) for tier, windows in zip(self.tiers, self._windows)}
+        return {
+            'samples': self.samples,
+            'late_samples': self.late_samples,
+            'dropped_samples': self.dropped_samples,
+            'dropped_windows': dict(self.dropped_windows),
+            'emitted_windows': dict(self.emitted),
+            'open_windows': open_windows
+        }
+
+    def _emit_all(self, closed):
+        for tier, (bucket, measurement, _), window in closed:
+            if not window.fields:
+                continue
+            self.emitted[tier.name] += 1
+            try:
+                self._emit(tier, bucket, measurement, window)
+            except Exception as e:
+                log.exception("❌ Rollup emit error (%s %s): %s", bucket, tier.name, e)
+
+
+def provision_rollup_buckets(buckets_api, org, source_buckets, tiers):
+    """원본 버킷마다 계층별 롤업 버킷이 없으면 생성 (생성/확인된 버킷 이름 목록 반환)"""
+    ready = []
+    for source_bucket in source_buckets:
+        for tier in tiers:
+            name = tier.bucket_for(source_bucket)
+            if buckets_api.find_bucket_by_name(name) is None:
+                rules = BucketRetentionRules(type='expire', every_seconds=tier.retention) if tier.retention else None
+                buckets_api.create_bucket(bucket_name=name, retention_rules=rules, org=org)
+                log.info("✅ Created rollup bucket %s (retention: %ss)", name, tier.retention or 'infinite')
+            ready.append(name)
+    return ready
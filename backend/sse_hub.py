@@ -0,0 +1,112 @@
+"""
+SSE 브로드캐스트 허브 모듈
+- 구독자(브라우저 연결)마다 유한 크기 링 버퍼를 두고 모든 샘플을 복제 전달
+- 새 구독자에게 최근 N개 샘플 재전송 (replay)
+- 느린 구독자는 가장 오래된 샘플부터 버림 (drop-oldest)
+- 구독자가 없으면 replay 버퍼만 유지하므로 메모리가 무한히 늘지 않음
+"""
+import threading
+import time
+from collections import deque
+
+
+class Subscription:
+    """구독자 한 명의 링 버퍼"""
+
+    def __init__(self, hub, buffer_size):
+        self.hub = hub
+        self.id = None
+        self._buffer = deque(maxlen=buffer_size)
+        self._cond = threading.Condition()
+        self.created_at = time.time()
+        self.delivered = 0
+        self.dropped = 0
+        self.last_delivered_seq = 0
+
+    def push(self, seq, published_at, item):
+        with self._cond:
+            if len(self._buffer) == self._buffer.maxlen:
+                # drop-oldest: deque(maxlen)이 가장 오래된 항목을 자동으로 제거
+                self.dropped += 1
+            self._buffer.append((seq, published_at, item))
+            self._cond.notify()
+
+    def get(self, timeout=None):
+        """다음 샘플 반환 (timeout 동안 없으면 None)"""
+        with self._cond:
+            if not self._buffer and not self._cond.wait_for(lambda: self._buffer, timeout=timeout):
+                return None
+            seq, _, item = self._buffer.popleft()
+            self.delivered += 1
+            self.last_delivered_seq = seq
+            return item
+
+    def get_stats(self):
+        """구독자별 지연(lag) 통계"""
+        with self._cond:
+            pending = len(self._buffer)
+            oldest_age = time.time() - self._buffer[0][1] if pending else 0.0
+        return {
+            'id': self.id,
+            'connected_seconds': round(time.time() - self.created_at, 1),
+            'pending': pending,
+            'lag_messages': max(self.hub.last_seq - self.last_delivered_seq, 0),
+            'oldest_pending_age_ms': round(oldest_age * 1000, 1),
+            'delivered': self.delivered,
+            'dropped': self.dropped
+        }
+
+
+class BroadcastHub:
+    """발행된 샘플을 모든 구독자에게 전달하는 pub/sub 허브"""
+
+    def __init__(self, name, buffer_size=256, replay_size=30):
+        self.name = name
+        self.buffer_size = buffer_size
+        self._history = deque(maxlen=replay_size)
+        self._lock = threading.Lock()
+        # 발행 시 복사하지 않도록 구독자 목록은 불변 튜플로 교체
+        self._subscribers = ()
+        self._next_id = 0
+        self.last_seq = 0
+        self.published = 0
+
+    def publish(self, item):
+        """샘플 발행 (비용: 구독자 수에 비례)"""
+        with self._lock:
+            self.last_seq += 1
+            seq = self.last_seq
+            self.published += 1
+            published_at = time.time()
+            self._history.append((seq, published_at, item))
+            subscribers = self._subscribers
+        for sub in subscribers:
+            sub.push(seq, published_at, item)
+
+    def subscribe(self, replay=True):
+        """새 구독자 등록 (replay=True면 최근 샘플을 먼저 받음)"""
+        sub = Subscription(self, self.buffer_size)
+        with self._lock:
+            self._next_id += 1
+            sub.id = self._next_id
+            if replay:
+                for seq, published_at, item in self._history:
+                    sub.push(seq, published_at, item)
+            sub.last_delivered_seq = self._history[0][0] - 1 if replay and self._history else self.last_seq
+            self._subscribers = self._subscribers + (sub,)
+        return sub
+
+    def unsubscribe(self, sub):
+        with self._lock:
+            self._subscribers = tuple(s for s in self._subscribers if s is not sub)
+
+    def get_stats(self):
+        subscribers = self._subscribers
+        return {
+            'name': self.name,
+            'published': self.published,
+            'subscriber_count': len(subscribers),
+            'replay_size': len(self._history),
+            'buffer_size': self.buffer_size,
+            'subscribers': [sub.get_stats() for sub in subscribers]
+        }
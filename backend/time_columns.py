@@ -0,0 +1,85 @@
+"""
+시간 컬럼 변환 모듈
+- 입력: epoch ns int64 배열 또는 datetime64 배열 (flux_reader 결과의 _time 컬럼 등, 모두 UTC)
+- 출력: epoch ms int64 배열 (히스토리/차트 응답), 'YYYY-MM-DD HH:MM:SS' UTC/KST 문자열 컬럼 (내보내기), ISO 8601 문자열
+- 변환/범위 필터는 datetime64 연산으로 배열 전체에 한 번에 적용 (행마다 datetime 객체/strftime/tzinfo 확인 없음)
+- 문자열은 np.datetime_as_string으로 만든 뒤 'T' 구분자만 유니코드 코드 배열에서 바꿈
+"""
+from datetime import datetime, timezone
+
+import numpy as np
+
+KST_OFFSET = np.timedelta64(9, 'h')  # KST = UTC + 9시간
+
+_T = ord('T')
+
+
+def as_datetime64(times):
+    """epoch ns int64 배열/datetime64 배열 -> datetime64[ns] 배열 (복사하지 않을 수 있으면 그대로)"""
+    times = np.asarray(times)
+    if times.dtype.kind in 'iu':
+        return times.astype(np.int64, copy=False).view('datetime64[ns]')
+    return times.astype('datetime64[ns]', copy=False)
+
+
+def to_datetime64(value):
+    """datetime(naive는 UTC로 간주)/datetime64/epoch 초 -> datetime64[ns] 스칼라 (범위 경계 비교용)"""
+    if isinstance(value, np.datetime64):
+        return value.astype('datetime64[ns]')
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return np.datetime64(value, 'ns')
+    return np.datetime64(int(round(value * 1e9)), 'ns')
+
+
+def epoch_ns(times):
+    return as_datetime64(times).view(np.int64)
+
+
+def epoch_ms(times):
+    """시간 배열 -> epoch ms int64 배열 (ms 미만은 버림)"""
+    return as_datetime64(times).astype('datetime64[ms]').view(np.int64)
+
+
+def range_mask(times, start=None, stop=None):
+    """start <= t < stop 인 행의 bool 배열 (경계는 to_datetime64가 받는 형식, None이면 제한 없음)"""
+    times = as_datetime64(times)
+    mask = np.ones(len(times), dtype=bool)
+    if start is not None:
+        mask &= times >= to_datetime64(start)
+    if stop is not None:
+        mask &= times < to_datetime64(stop)
+    return mask
+
+
+def _with_separator(strings, separator):
+    """np.datetime_as_string 결과의 날짜/시간 구분자 'T'를 separator로 (NaT는 그대로)"""
+    if separator == 'T' or not len(strings):
+        return strings
+    codes = strings.view(np.uint32).reshape(len(strings), -1)
+    column = codes[:, 10]
+    column[column == _T] = ord(separator)
+    return strings
+
+
+def format_times(times, unit='s', offset=None, separator=' '):
+    """시간 배열 -> 'YYYY-MM-DD HH:MM:SS' 문자열 목록 (unit 단위로 버림, offset만큼 이동한 벽시계 시각)"""
+    values = as_datetime64(times).astype(f'datetime64[{unit}]')
+    if offset is not None:
+        values = values + offset
+    return _with_separator(np.datetime_as_string(values, unit=unit), separator).tolist()
+
+
+def utc_strings(times, unit='s'):
+    return format_times(times, unit)
+
+
+def kst_strings(times, unit='s'):
+    return format_times(times, unit, offset=KST_OFFSET)
+
+
+def iso_strings(times, unit='ms'):
+    """시간 배열 -> ISO 8601 UTC 문자열 목록 (예: '2024-01-01T00:00:00.000Z')"""
+    values = as_datetime64(times).astype(f'datetime64[{unit}]')
+    return np.datetime_as_string(values, unit=unit, timezone='UTC').tolist()
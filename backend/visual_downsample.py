@@ -0,0 +1,106 @@
+"""
+차트용 시각적 다운샘플링 모듈
+- M4: 픽셀 구간마다 첫/마지막 행 + 필드별 최소/최대 행 (평균에 묻히는 스파이크 보존)
+- LTTB: 구간마다 이전 선택점/다음 구간 평균과 만드는 삼각형 면적이 가장 큰 점 하나
+- 필드가 여러 개면 필드별로 고른 행 인덱스의 합집합 사용 (모든 필드가 같은 타임스탬프 축 공유)
+- 선택은 NumPy 벡터 연산 (LTTB만 출력 구간 수만큼 반복), 결과는 원본 행 인덱스
+"""
+import numpy as np
+
+METHODS = ('m4', 'lttb')
+DEFAULT_METHOD = 'm4'
+
+
+def _group_bounds(keys):
+    """정렬된 keys에서 같은 값 묶음의 (첫 위치, 마지막 위치)"""
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    ends = np.r_[starts[1:], len(keys)] - 1
+    return starts, ends
+
+
+def m4_indices(timestamps, value_columns, buckets):
+    """시간축을 buckets개 구간으로 나눠 구간별 첫/마지막 행과 필드별 최소/최대 행 선택"""
+    t = np.asarray(timestamps, dtype=np.int64)
+    n = len(t)
+    if n == 0:
+        return np.empty(0, dtype=np.intp)
+    span = int(t[-1] - t[0]) + 1
+    bucket_ids = (t - t[0]) * buckets // span
+
+    # 첫/마지막 행은 값이 비어 있어도 포함 (빈 구간이 차트에서 끊김으로 보이도록)
+    starts, ends = _group_bounds(bucket_ids)
+    selected = [starts, ends]
+    for values in value_columns:
+        valid = np.flatnonzero(~np.isnan(values))
+        if len(valid) == 0:
+            continue
+        # 시간순이므로 구간별 행은 연속 -> reduceat으로 구간별 최소/최대를 한 번에 계산
+        valid_values = values[valid]
+        group_starts, _ = _group_bounds(bucket_ids[valid])
+        group_of = np.repeat(np.arange(len(group_starts)), np.diff(np.r_[group_starts, len(valid)]))
+        for reduce in (np.minimum, np.maximum):
+            extreme = reduce.reduceat(valid_values, group_starts)
+            # 구간 극값과 같은 값 중 첫 행
+            hits = np.flatnonzero(valid_values == extreme[group_of])
+            first, _ = _group_bounds(group_of[hits])
+            selected.append(valid[hits[first]])
+    return np.unique(np.concatenate(selected))
+
+
+def lttb_indices(timestamps, values, threshold):
+    """Largest-Triangle-Three-Buckets (값이 있는 행만 대상, threshold개 선택)"""
+    valid = np.flatnonzero(~np.isnan(values))
+    n = len(valid)
+    if threshold >= n or threshold < 3:
+        return valid
+    x = np.asarray(timestamps, dtype=np.float64)[valid]
+    y = values[valid]
+
+    # 첫/마지막 점 사이를 threshold - 2개 구간으로 나눔
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.intp)
+    selected = np.empty(threshold, dtype=np.intp)
+    selected[0] = 0
+    selected[-1] = n - 1
+    a = 0
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            next_lo, next_hi = edges[i + 1], edges[i + 2]
+            avg_x, avg_y = x[next_lo:next_hi].mean(), y[next_lo:next_hi].mean()
+        else:
+            avg_x, avg_y = x[n - 1], y[n - 1]
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(area.argmax())
+        selected[i + 1] = a
+    return valid[selected]
+
+
+def select_indices(timestamps, columns, max_points, method=DEFAULT_METHOD):
+    """max_points 이하로 줄일 행 인덱스 (이미 작으면 None)
+
+    필드별 선택의 합집합이 max_points를 넘으면 구간 수를 줄여 다시 선택
+    (구간 하나로도 넘는 작은 max_points, 예: M4에서 4 미만이면 같은 간격으로 골라냄)
+    """
+    n = len(timestamps)
+    if n <= max_points:
+        return None
+    timestamps = np.asarray(timestamps, dtype=np.int64)
+    value_columns = [np.asarray(column, dtype=np.float64) for column in columns]
+    fields = max(1, len(value_columns))
+    # 필드별 선택이 겹치지 않는 최악의 경우에도 max_points를 넘지 않도록 시작
+    if method == 'lttb':
+        target = max(3, max_points // fields)
+    else:
+        target = max(1, max_points // (2 + 2 * fields))
+    for _ in range(8):
+        if method == 'lttb':
+            parts = [lttb_indices(timestamps, values, target) for values in value_columns]
+            indices = np.unique(np.concatenate(parts + [np.array([0, n - 1], dtype=np.intp)]))
+        else:
+            indices = m4_indices(timestamps, value_columns, target)
+        if len(indices) <= max_points:
+            break
+        target = max(1, min(target - 1, int(target * max_points / len(indices))))
+    if len(indices) > max_points:
+        indices = np.unique(np.linspace(0, n - 1, max(max_points, 0)).round().astype(np.intp))
+    return indices
@@ -0,0 +1,182 @@
+"""
+VVB001 진동센서 process data(pdin) 디코딩 모듈
+- 단일 메시지: 미리 컴파일한 struct.Struct 레이아웃으로 한 번에 언팩
+- 배치: pdin 배열을 NumPy 구조화 dtype으로 한 번에 컬럼 변환
+  (특수 값 마스크 OL/UL/NoData/Invalid 및 상태 바이트 비트필드 포함)
+
+pdin 레이아웃 (빅 엔디안, 20바이트)
+  [0:2]   v-RMS (int16, x0.0001 m/s)
+  [4:6]   a-Peak (int16, x0.1 m/s²)
+  [8:10]  a-RMS (int16, x0.1 m/s²)
+  [10]    상태 바이트 (bit0: OUT1, bit1: OUT2, bit4-6: device status)
+  [12:14] 온도 (int16, x0.1 °C)
+  [16:18] Crest (int16, x0.1)
+"""
+import struct
+
+import numpy as np
+
+from log_config import get_logger
+
+log = get_logger('ingest')
+
+PDIN_LENGTH = 20
+PDIN_HEX_LENGTH = PDIN_LENGTH * 2
+
+DEVICE_STATUS_MAP = {
+    0: "Device is OK",
+    1: "Maintenance required",
+    2: "Out of specification",
+    3: "Function check",
+    4: "Offline",
+    5: "Device not available",
+    6: "No data available",
+    7: "Cyclic data not available"
+}
+
+SPECIAL_VALUES = {
+    32760: "OL",  # Overflow
+    -32760: "UL",  # Underflow
+    32764: "NoData",
+    -32768: "Invalid"
+}
+
+# 필드 이름과 스케일 (pdin 순서)
+FIELD_SCALES = (
+    ('v_rms', 0.0001),
+    ('a_peak', 0.1),
+    ('a_rms', 0.1),
+    ('temperature', 0.1),
+    ('crest', 0.1),
+)
+
+# 패딩 바이트는 x로 건너뛰고 필요한 6개 값만 언팩
+_PDIN_STRUCT = struct.Struct('>h2xh2xhBxh2xh2x')
+
+# 배치 디코딩용 구조화 dtype (위 struct 레이아웃과 동일)
+PDIN_DTYPE = np.dtype({
+    'names': ['v_rms', 'a_peak', 'a_rms', 'status_byte', 'temperature', 'crest'],
+    'formats': ['>i2', '>i2', '>i2', 'u1', '>i2', '>i2'],
+    'offsets': [0, 4, 8, 10, 12, 16],
+    'itemsize': PDIN_LENGTH
+})
+
+# 상태 바이트 256가지 값에 대한 (device_status, out1, out2) 미리 계산
+_STATUS_TABLE = tuple(
+    (DEVICE_STATUS_MAP.get((b >> 4) & 0x07, f"Unknown({(b >> 4) & 0x07})"), bool(b & 0x01), bool(b & 0x02))
+    for b in range(256)
+)
+
+_special_get = SPECIAL_VALUES.get
+
+
+def decode_vvb001(hex_data):
+    """VVB001 진동센서 데이터 디코딩 (빅 엔디안, 20바이트)"""
+    if len(hex_data) != PDIN_HEX_LENGTH:  # 20바이트 = 40자
+        log.warning("⚠️ Invalid hex data length: %s, expected %s", len(hex_data), PDIN_HEX_LENGTH)
+        return None
+    try:
+        v_rms_raw, a_peak_raw, a_rms_raw, status_byte, temp_raw, crest_raw = \
+            _PDIN_STRUCT.unpack(bytes.fromhex(hex_data))
+    except (ValueError, struct.error) as e:
+        log.warning("❌ Error decoding VVB001 data: %s", e)
+        return None
+
+    device_status, out1, out2 = _STATUS_TABLE[status_byte]
+
+    # 특수 값 체크
+    v_rms_special = _special_get(v_rms_raw)
+    a_peak_special = _special_get(a_peak_raw)
+    a_rms_special = _special_get(a_rms_raw)
+    temp_special = _special_get(temp_raw)
+    crest_special = _special_get(crest_raw)
+
+    return {
+        'v_rms': None if v_rms_special else v_rms_raw * 0.0001,
+        'a_peak': None if a_peak_special else a_peak_raw * 0.1,
+        'a_rms': None if a_rms_special else a_rms_raw * 0.1,
+        'temperature': None if temp_special else temp_raw * 0.1,
+        'crest': None if crest_special else crest_raw * 0.1,
+        'device_status': device_status,
+        'out1': out1,
+        'out2': out2,
+        'raw_values': {
+            'v_rms': v_rms_raw,
+            'a_peak': a_peak_raw,
+            'a_rms': a_rms_raw,
+            'temperature': temp_raw,
+            'crest': crest_raw,
+            'status_byte': status_byte
+        },
+        'special_values': {
+            'v_rms': v_rms_special,
+            'a_peak': a_peak_special,
+            'a_rms': a_rms_special,
+            'temperature': temp_special,
+            'crest': crest_special
+        }
+    }
+
+
+def decode_vvb001_buffer(buffer):
+    """연속된 pdin 바이트(20바이트 x N)를 컬럼으로 디코딩 (원시 캡처 재생/백필용)"""
+    records = np.frombuffer(buffer, dtype=PDIN_DTYPE)
+    return _records_to_columns(records, np.ones(len(records), dtype=bool))
+
+
+def decode_vvb001_batch(payloads):
+    """pdin 16진수 문자열(또는 bytes) 목록을 컬럼으로 디코딩
+
+    길이가 맞지 않거나 16진수가 아닌 항목은 valid=False, 값은 NaN으로 채움
+    """
+    count = len(payloads)
+    valid = np.zeros(count, dtype=bool)
+    chunks = []
+    for i, payload in enumerate(payloads):
+        if isinstance(payload, str):
+            if len(payload) == PDIN_HEX_LENGTH:
+                valid[i] = True
+                chunks.append(payload)
+        elif payload is not None and len(payload) == PDIN_LENGTH:
+            valid[i] = True
+            chunks.append(bytes(payload).hex())
+
+    try:
+        buffer = bytes.fromhex(''.join(chunks))
+    except ValueError:
+        # 잘못된 16진수가 섞여 있으면 해당 항목만 무효 처리
+        buffer = bytearray()
+        valid_idx = np.flatnonzero(valid)
+        for idx, chunk in zip(valid_idx, chunks):
+            try:
+                buffer += bytes.fromhex(chunk)
+            except ValueError:
+                valid[idx] = False
+
+    records = np.zeros(count, dtype=PDIN_DTYPE)
+    records[valid] = np.frombuffer(bytes(buffer), dtype=PDIN_DTYPE)
+    return _records_to_columns(records, valid)
+
+
+def _records_to_columns(records, valid):
+    status = records['status_byte'].astype(np.uint8)
+    columns = {
+        'count': len(records),
+        'valid': valid,
+        'raw': {'status_byte': status},
+        'special': {},
+        # 상태 바이트 비트필드
+        'device_status_code': (status >> 4) & 0x07,
+        'out1': (status & 0x01).astype(bool),
+        'out2': (status & 0x02).astype(bool)
+    }
+    for field, scale in FIELD_SCALES:
+        raw = records[field].astype(np.int16)
+        masks = {name: raw == value for value, name in SPECIAL_VALUES.items()}
+        is_special = masks['OL'] | masks['UL'] | masks['NoData'] | masks['Invalid']
+        values = raw * scale
+        values[is_special | ~valid] = np.nan
+        columns[field] = values
+        columns['raw'][field] = raw
+        columns['special'][field] = masks
+    return columns
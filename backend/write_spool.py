@@ -0,0 +1,261 @@
+"""
+InfluxDB 장애 대비 디스크 스풀 모듈
+- 쓰기 실패한 포인트를 line protocol로 세그먼트 파일에 append (fsync는 모아서)
+- InfluxDB ping이 성공하면 재생 워커가 오래된 세그먼트부터 큰 배치로 다시 기록
+- 전체 디스크 사용량 상한 초과 시 가장 오래된 세그먼트부터 삭제
+- 잘린/깨진 레코드는 건너뛰고, 다시 보내도 거부되는 배치(SpoolRejectedError)는 <세그먼트>.bad 파일로 격리
+  (전송 오류/5xx만 세그먼트를 남겨 다음 주기에 재시도)
+
+세그먼트 레코드 형식: "<bucket>\\t<org>\\t<line protocol>\\n"
+"""
+import os
+import threading
+import time
+
+from log_config import get_logger
+
+log = get_logger('influx')
+
+SEGMENT_SUFFIX = '.lp'
+QUARANTINE_SUFFIX = '.bad'
+
+
+class SpoolRejectedError(Exception):
+    """재생 배치가 영구적으로 거부됨 (잘못된 요청 등, 재시도해도 실패)"""
+
+
+class WriteAheadSpool:
+    """세그먼트 파일 기반 append-only 스풀"""
+
+    def __init__(self, directory, max_bytes=512 * 1024 * 1024, segment_bytes=8 * 1024 * 1024,
+                 fsync_interval=1.0, replay_batch_size=5000):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.segment_bytes = segment_bytes
+        self.fsync_interval = fsync_interval
+        self.replay_batch_size = replay_batch_size
+
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._segments = sorted(
+            int(name[:-len(SEGMENT_SUFFIX)]) for name in os.listdir(directory)
+            if name.endswith(SEGMENT_SUFFIX) and name[:-len(SEGMENT_SUFFIX)].isdigit()
+        )
+        self._sizes = {seq: os.path.getsize(self._path(seq)) for seq in self._segments}
+        self._active = None  # 현재 append 중인 파일 객체
+        self._active_seq = None
+        self._last_fsync = time.monotonic()
+        self._dirty = False
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._stats = {
+            'spooled_records': 0,
+            'replayed_records': 0,
+            'discarded_records': 0,
+            'discarded_segments': 0,
+            'replay_errors': 0,
+            'malformed_records': 0,
+            'rejected_records': 0,
+            'last_replay_rate': None,  # records/s
+            'last_replay_at': None
+        }
+
+    def has_pending(self):
+        """재생 대기 중인 데이터가 있는지 (장애 진행 중 여부)"""
+        with self._lock:
+            return any(self._sizes.get(seq, 0) > 0 for seq in self._segments)
+
+    def append(self, bucket, org, records):
+        """포인트/문자열 레코드를 스풀에 추가"""
+        chunk = ''.join(
+            f"{bucket}\t{org or ''}\t{_to_line(record)}\n" for record in records
+        ).encode('utf-8')
+        with self._lock:
+            if self._active is None or self._sizes[self._active_seq] >= self.segment_bytes:
+                self._roll()
+            self._active.write(chunk)
+            self._sizes[self._active_seq] += len(chunk)
+            self._dirty = True
+            self._stats['spooled_records'] += len(records)
+            if time.monotonic() - self._last_fsync >= self.fsync_interval:
+                self._fsync()
+            self._enforce_limit()
+
+    def sync(self):
+        with self._lock:
+            if self._dirty:
+                self._fsync()
+
+    def start_replay(self, write_func, ping_func, interval=5.0):
+        """재생 워커 시작 (write_func(bucket, org, lines), ping_func() -> bool)"""
+        if self._thread is not None:
+            return
+        def run():
+            last_attempt = 0
+            while not self._stop_event.wait(self.fsync_interval):
+                self.sync()
+                if not self.has_pending() or time.monotonic() - last_attempt < interval:
+                    continue
+                last_attempt = time.monotonic()
+                try:
+                    if not ping_func():
+                        continue
+                except Exception:
+                    continue
+                # 복구되면 세그먼트를 연속으로 재생 (실패하면 다음 주기에 재시도)
+                while not self._stop_event.is_set() and self.has_pending():
+                    if self.replay(write_func) is None:
+                        break
+        self._thread = threading.Thread(target=run, name='influx-spool-replay', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+        with self._lock:
+            if self._active is not None:
+                self._fsync()
+                self._active.close()
+                self._active = None
+
+    def replay(self, write_func):
+        """가장 오래된 세그먼트 하나를 큰 배치로 재기록 (성공 시 세그먼트 삭제, 실패 시 None)
+
+        write_func가 SpoolRejectedError를 내면 그 배치만 격리하고 나머지는 계속 재생
+        """
+        with self._lock:
+            if not self._segments:
+                return 0
+            seq = self._segments[0]
+            if seq == self._active_seq:
+                # 현재 쓰는 세그먼트는 닫고 새 세그먼트로 넘어간 뒤 재생
+                self._roll()
+        path = self._path(seq)
+        started = time.perf_counter()
+        replayed = 0
+        malformed = 0
+        rejected = []
+
+        def write(bucket, org, batch):
+            nonlocal replayed
+            try:
+                write_func(bucket, org or None, batch)
+                replayed += len(batch)
+            except SpoolRejectedError as e:
+                log.error("❌ Spool replay rejected %s records (segment %s, bucket %s): %s", len(batch), seq, bucket, e)
+                rejected.extend(f'{bucket}\t{org}\t{line}\n' for line in batch)
+
+        try:
+            batches = {}
+            # 깨진 바이트는 치환해서 읽고 해당 레코드만 건너뜀
+            with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                for raw in f:
+                    parts = raw[:-1].split('\t', 2) if raw.endswith('\n') else ()
+                    if len(parts) != 3 or not parts[2]:
+                        # 기록 도중 중단되어 잘린 레코드 (크래시/디스크 가득 참) 등
+                        malformed += 1
+                        continue
+                    bucket, org, line = parts
+                    batch = batches.setdefault((bucket, org), [])
+                    batch.append(line)
+                    if len(batch) >= self.replay_batch_size:
+                        write(bucket, org, batch)
+                        batches[(bucket, org)] = []
+            for (bucket, org), batch in batches.items():
+                if batch:
+                    write(bucket, org, batch)
+            if rejected:
+                with open(self._path(seq)[:-len(SEGMENT_SUFFIX)] + QUARANTINE_SUFFIX, 'a', encoding='utf-8') as f:
+                    f.writelines(rejected)
+        except FileNotFoundError:
+            # 용량 제한으로 이미 삭제된 세그먼트
+            with self._lock:
+                self._forget(seq)
+            return 0
+        except Exception as e:
+            # 세그먼트는 그대로 두고 다음 주기에 다시 시도 (일부 중복 기록 가능, 같은 타임스탬프라 덮어씀)
+            with self._lock:
+                self._stats['replay_errors'] += 1
+            log.warning("⚠️ Spool replay failed (segment %s): %s", seq, e)
+            return None
+
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self._forget(seq)
+            self._stats['replayed_records'] += replayed
+            self._stats['malformed_records'] += malformed
+            self._stats['rejected_records'] += len(rejected)
+            self._stats['last_replay_rate'] = round(replayed / elapsed, 1) if elapsed > 0 else None
+            self._stats['last_replay_at'] = time.time()
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        if malformed or rejected:
+            log.warning("⚠️ Spool segment %s: skipped %s malformed records, quarantined %s rejected records",
+                        seq, malformed, len(rejected))
+        log.info("✅ Spool replayed %s records from segment %s", replayed, seq)
+        return replayed
+
+    def last_replay_at(self):
+        """마지막으로 세그먼트 재생을 마친 시각 (epoch 초, 없으면 None)"""
+        with self._lock:
+            return self._stats['last_replay_at']
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['segments'] = len(self._segments)
+            stats['spool_bytes'] = sum(self._sizes.values())
+        stats['max_bytes'] = self.max_bytes
+        stats['directory'] = self.directory
+        return stats
+
+    def _path(self, seq):
+        return os.path.join(self.directory, f'{seq:012d}{SEGMENT_SUFFIX}')
+
+    def _roll(self):
+        if self._active is not None:
+            self._fsync()
+            self._active.close()
+        seq = (self._segments[-1] + 1) if self._segments else 1
+        self._active = open(self._path(seq), 'ab')
+        self._active_seq = seq
+        self._segments.append(seq)
+        self._sizes[seq] = 0
+
+    def _fsync(self):
+        self._active.flush()
+        os.fsync(self._active.fileno())
+        self._dirty = False
+        self._last_fsync = time.monotonic()
+
+    def _forget(self, seq):
+        if seq in self._segments:
+            self._segments.remove(seq)
+        self._sizes.pop(seq, None)
+
+    def _enforce_limit(self):
+        # 상한 초과 시 가장 오래된(현재 쓰는 중이 아닌) 세그먼트부터 삭제
+        while sum(self._sizes.values()) > self.max_bytes and len(self._segments) > 1:
+            seq = self._segments[0]
+            path = self._path(seq)
+            try:
+                with open(path, 'rb') as f:
+                    discarded = sum(chunk.count(b'\n') for chunk in iter(lambda: f.read(1 << 20), b''))
+                os.remove(path)
+            except OSError:
+                discarded = 0
+            self._forget(seq)
+            self._stats['discarded_records'] += discarded
+            self._stats['discarded_segments'] += 1
+            log.warning("⚠️ Spool size limit reached, discarded segment %s (%s records)", seq, discarded)
+
+
+def _to_line(record):
+    if isinstance(record, bytes):
+        return record.decode('utf-8')
+    if isinstance(record, str):
+        return record
+    return record.to_line_protocol()
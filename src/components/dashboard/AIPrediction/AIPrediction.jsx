@@ -33,25 +33,50 @@ const AIPrediction = ({ selectedRange, onSelectRange }) => {
   const sortableInstance = useRef(null)
 
   // 원본 데이터 불러오기 함수들을 먼저 정의
+  // 원본 데이터 응답 반영 (단건 조회와 일괄 조회가 함께 사용)
+  const applyOriginalTemp = useCallback((data, showMessage) => {
+    if (data.timestamps && data.timestamps.length > 0) {
+      setOriginalTemp({
+        timestamps: data.timestamps || [],
+        values: data.values || []
+      })
+      setUseOriginalTemp(true) // 예측용으로 원본 사용
+      if (showMessage) {
+        setStatusMessage({ type: 'success', text: '원본 온도 데이터를 불러왔습니다.' })
+      }
+    } else {
+      if (showMessage) {
+        setStatusMessage({ type: 'error', text: '원본 온도 데이터가 없습니다.' })
+      }
+    }
+  }, [])
+
+  const applyOriginalVib = useCallback((data, showMessage) => {
+    if (data.timestamps && data.timestamps.length > 0) {
+      setOriginalVib({
+        timestamps: data.timestamps || [],
+        v_rms: data.v_rms || [],
+        a_peak: data.a_peak || [],
+        a_rms: data.a_rms || [],
+        crest: data.crest || [],
+        temperature: data.temperature || []
+      })
+      setUseOriginalVib(true) // 예측용으로 원본 사용
+      if (showMessage) {
+        setStatusMessage({ type: 'success', text: '원본 진동 데이터를 불러왔습니다.' })
+      }
+    } else {
+      if (showMessage) {
+        setStatusMessage({ type: 'error', text: '원본 진동 데이터가 없습니다.' })
+      }
+    }
+  }, [])
+
   const fetchOriginalTemp = useCallback(async (showMessage = false) => {
     try {
       const response = await fetch(`/api/ai/original/temperature?range=${selectedRange}`)
       if (response.ok) {
-        const data = await response.json()
-        if (data.timestamps && data.timestamps.length > 0) {
-          setOriginalTemp({
-            timestamps: data.timestamps || [],
-            values: data.values || []
-          })
-          setUseOriginalTemp(true) // 예측용으로 원본 사용
-          if (showMessage) {
-            setStatusMessage({ type: 'success', text: '원본 온도 데이터를 불러왔습니다.' })
-          }
-        } else {
-          if (showMessage) {
-            setStatusMessage({ type: 'error', text: '원본 온도 데이터가 없습니다.' })
-          }
-        }
+        applyOriginalTemp(await response.json(), showMessage)
       } else {
         const errorData = await response.json().catch(() => ({ error: '원본 온도 데이터 불러오기 실패' }))
         if (showMessage) {
@@ -64,31 +89,13 @@ const AIPrediction = ({ selectedRange, onSelectRange }) => {
         setStatusMessage({ type: 'error', text: '원본 온도 데이터 불러오기 중 오류가 발생했습니다.' })
       }
     }
-  }, [selectedRange])
+  }, [selectedRange, applyOriginalTemp])
 
   const fetchOriginalVib = useCallback(async (showMessage = false) => {
     try {
       const response = await fetch(`/api/ai/original/vibration?range=${selectedRange}`)
       if (response.ok) {
-        const data = await response.json()
-        if (data.timestamps && data.timestamps.length > 0) {
-          setOriginalVib({
-            timestamps: data.timestamps || [],
-            v_rms: data.v_rms || [],
-            a_peak: data.a_peak || [],
-            a_rms: data.a_rms || [],
-            crest: data.crest || [],
-            temperature: data.temperature || []
-          })
-          setUseOriginalVib(true) // 예측용으로 원본 사용
-          if (showMessage) {
-            setStatusMessage({ type: 'success', text: '원본 진동 데이터를 불러왔습니다.' })
-          }
-        } else {
-          if (showMessage) {
-            setStatusMessage({ type: 'error', text: '원본 진동 데이터가 없습니다.' })
-          }
-        }
+        applyOriginalVib(await response.json(), showMessage)
       } else {
         const errorData = await response.json().catch(() => ({ error: '원본 진동 데이터 불러오기 실패' }))
         if (showMessage) {
@@ -101,18 +108,12 @@ const AIPrediction = ({ selectedRange, onSelectRange }) => {
         setStatusMessage({ type: 'error', text: '원본 진동 데이터 불러오기 중 오류가 발생했습니다.' })
       }
     }
-  }, [selectedRange])
+  }, [selectedRange, applyOriginalVib])
 
   useEffect(() => {
-    fetchAugmentedData()
     // 원본 데이터는 체크박스로 불러오므로 여기서는 자동으로 불러오지 않음
-    // 하지만 체크박스가 체크되어 있으면 자동으로 불러오기
-    if (showOriginalTemp) {
-      fetchOriginalTemp(false) // 자동 새로고침 시 메시지 표시 안 함
-    }
-    if (showOriginalVib) {
-      fetchOriginalVib(false) // 자동 새로고침 시 메시지 표시 안 함
-    }
+    // 하지만 체크박스가 체크되어 있으면 증강 데이터와 한 번의 요청으로 함께 불러오기 (메시지 표시 안 함)
+    fetchAugmentedData({ originalTemp: showOriginalTemp, originalVib: showOriginalVib })
 
     // 예측만 주기적으로 업데이트 (학습 중이 아닐 때만)
     let predictionInterval = null
@@ -132,14 +133,12 @@ const AIPrediction = ({ selectedRange, onSelectRange }) => {
         clearInterval(predictionInterval)
       }
     }
-  }, [selectedRange, training, showOriginalTemp, showOriginalVib, fetchOriginalTemp, fetchOriginalVib])
+  }, [selectedRange, training, showOriginalTemp, showOriginalVib])
 
   // 새로고침 이벤트 리스너
   useEffect(() => {
     const handleRefresh = () => {
-      fetchAugmentedData()
-      if (showOriginalTemp) fetchOriginalTemp(false) // 자동 새로고침 시 메시지 표시 안 함
-      if (showOriginalVib) fetchOriginalVib(false) // 자동 새로고침 시 메시지 표시 안 함
+      fetchAugmentedData({ originalTemp: showOriginalTemp, originalVib: showOriginalVib })
       if (!training) {
         fetchPrediction()
       }
@@ -373,56 +372,64 @@ const AIPrediction = ({ selectedRange, onSelectRange }) => {
     return () => clearInterval(progressInterval)
   }, [augmenting, training])
 
-  const fetchAugmentedData = async () => {
+  // 증강 데이터 (+ 체크된 원본 데이터)를 /api/history/batch 한 번으로 불러오기 (서버에서 시리즈별 병렬 조회)
+  const fetchAugmentedData = async ({ originalTemp = false, originalVib = false } = {}) => {
     try {
       setError(null)
-      const [tempRes, vibRes] = await Promise.all([
-        fetch(`/api/ai/augmented/temperature?range=${selectedRange}`),
-        fetch(`/api/ai/augmented/vibration?range=${selectedRange}`)
-      ])
+      const series = ['augmented_temperature', 'augmented_vibration']
+      if (originalTemp) series.push('temperature')
+      if (originalVib) series.push('vibration')
+      const response = await fetch('/api/history/batch', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ range: selectedRange, series })
+      })
 
-      if (tempRes.ok) {
-        const tempData = await tempRes.json()
-        if (tempData.error) {
-          setError(tempData.error)
-          setAugmentTempCompleted(false)
-        } else {
-          setAugmentedTemp({
-            timestamps: tempData.timestamps || [],
-            values: tempData.values || []
-          })
-          // 증강 데이터가 있으면 완료 상태로 표시
-          if (tempData.timestamps && tempData.timestamps.length > 0) {
-            setAugmentTempCompleted(true)
-          }
-        }
-      } else {
-        const errorData = await tempRes.json().catch(() => ({}))
+      if (!response.ok) {
+        const errorData = await response.json().catch(() => ({}))
         setError(errorData.error || '증강 데이터를 가져올 수 없습니다')
         setAugmentTempCompleted(false)
+        setAugmentVibCompleted(false)
+        return
       }
 
-      if (vibRes.ok) {
-        const vibData = await vibRes.json()
-        if (!vibData.error) {
-          setAugmentedVib({
-            timestamps: vibData.timestamps || [],
-            v_rms: vibData.v_rms || [],
-            a_peak: vibData.a_peak || [],
-            a_rms: vibData.a_rms || [],
-            crest: vibData.crest || [],
-            temperature: vibData.temperature || []
-          })
-          // 증강 데이터가 있으면 완료 상태로 표시
-          if (vibData.timestamps && vibData.timestamps.length > 0) {
-            setAugmentVibCompleted(true)
-          }
-        } else {
-          setAugmentVibCompleted(false)
+      const results = (await response.json()).series || {}
+      const tempData = results.augmented_temperature || {}
+      const vibData = results.augmented_vibration || {}
+
+      if (tempData.error) {
+        setError(tempData.error)
+        setAugmentTempCompleted(false)
+      } else {
+        setAugmentedTemp({
+          timestamps: tempData.timestamps || [],
+          values: tempData.values || []
+        })
+        // 증강 데이터가 있으면 완료 상태로 표시
+        if (tempData.timestamps && tempData.timestamps.length > 0) {
+          setAugmentTempCompleted(true)
+        }
+      }
+
+      if (!vibData.error) {
+        setAugmentedVib({
+          timestamps: vibData.timestamps || [],
+          v_rms: vibData.v_rms || [],
+          a_peak: vibData.a_peak || [],
+          a_rms: vibData.a_rms || [],
+          crest: vibData.crest || [],
+          temperature: vibData.temperature || []
+        })
+        // 증강 데이터가 있으면 완료 상태로 표시
+        if (vibData.timestamps && vibData.timestamps.length > 0) {
+          setAugmentVibCompleted(true)
         }
       } else {
         setAugmentVibCompleted(false)
       }
+
+      if (results.temperature && !results.temperature.error) applyOriginalTemp(results.temperature, false)
+      if (results.vibration && !results.vibration.error) applyOriginalVib(results.vibration, false)
     } catch (error) {
       console.error('증강 데이터 가져오기 실패:', error)
       setError('데이터를 불러오는 중 오류가 발생했습니다')
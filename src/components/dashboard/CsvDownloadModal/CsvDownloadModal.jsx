@@ -1,6 +1,14 @@
 import { useState, useEffect } from 'react'
 import './CsvDownloadModal.css'
 
+// 내보내기 파일 형식 (format 파라미터 값, 라벨, 확장자)
+const EXPORT_FORMATS = [
+  { value: 'csv', label: 'CSV', extension: '.csv' },
+  { value: 'csv.gz', label: 'CSV (gzip)', extension: '.csv.gz' },
+  { value: 'csv.zst', label: 'CSV (zstd)', extension: '.csv.zst' },
+  { value: 'parquet', label: 'Parquet', extension: '.parquet' }
+]
+
 const CsvDownloadModal = ({ isOpen, onClose, panelId }) => {
   const [selectedQuickRange, setSelectedQuickRange] = useState(null)
   const [startDate, setStartDate] = useState('')
@@ -8,6 +16,10 @@ const CsvDownloadModal = ({ isOpen, onClose, panelId }) => {
   const [endDate, setEndDate] = useState('')
   const [endTime, setEndTime] = useState('')
   const [isDownloading, setIsDownloading] = useState(false)
+  const [downloadProgress, setDownloadProgress] = useState(null) // 내보내기 작업 진행 상황 { rows, bytes }
+  const [exportFormat, setExportFormat] = useState('csv')
+  const [availableFormats, setAvailableFormats] = useState(['csv'])
+  const [joinSensors, setJoinSensors] = useState(false) // 온도+진동을 시간 정렬해 한 파일로
 
   // 모달이 열릴 때 현재 시간으로 초기화
   useEffect(() => {
@@ -36,6 +48,17 @@ const CsvDownloadModal = ({ isOpen, onClose, panelId }) => {
       setStartDate(formatDate(start))
       setStartTime(formatTime(start))
       setSelectedQuickRange(null)
+
+      // 서버에서 쓸 수 있는 파일 형식 (parquet/zstd는 선택 패키지가 있어야 함)
+      fetch('/api/export/formats')
+        .then((response) => (response.ok ? response.json() : null))
+        .then((data) => {
+          if (data && data.formats) {
+            setAvailableFormats(data.formats)
+            if (!data.formats.includes(exportFormat)) setExportFormat('csv')
+          }
+        })
+        .catch(() => setAvailableFormats(['csv']))
     }
   }, [isOpen])
 
@@ -130,36 +153,60 @@ const CsvDownloadModal = ({ isOpen, onClose, panelId }) => {
         endTimeKST
       })
       
-      // panelId에 따라 적절한 API 엔드포인트 선택
+      // panelId에 따라 내보내기 종류 선택 (결합 선택 시 온도+진동)
       const isVibrationPanel = panelId === 'panel7'
-      const apiEndpoint = isVibrationPanel 
-        ? `/api/export/vibration/csv?start_time_kst=${encodeURIComponent(startTimeKST)}&end_time_kst=${encodeURIComponent(endTimeKST)}`
-        : `/api/export/temperature/csv?start_time_kst=${encodeURIComponent(startTimeKST)}&end_time_kst=${encodeURIComponent(endTimeKST)}`
+      const kind = joinSensors ? 'joined' : (isVibrationPanel ? 'vibration' : 'temperature')
       
-      // 백엔드 API 호출 (KST 시간 문자열로 전송)
-      const response = await fetch(apiEndpoint)
+      // 내보내기 작업 생성 (서버 워커에서 실행, 같은 요청은 완성된 파일 재사용)
+      const response = await fetch('/api/export/jobs', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({
+          kind,
+          start_time_kst: startTimeKST,
+          end_time_kst: endTimeKST,
+          format: exportFormat
+        })
+      })
 
       if (!response.ok) {
-        throw new Error('CSV 다운로드 실패')
+        const errorData = await response.json().catch(() => ({}))
+        throw new Error(errorData.error || 'CSV 다운로드 실패')
+      }
+
+      // 작업이 끝날 때까지 진행 상황 조회
+      let job = await response.json()
+      while (job.status === 'queued' || job.status === 'running') {
+        setDownloadProgress({ rows: job.rows, bytes: job.bytes })
+        await new Promise((resolve) => setTimeout(resolve, 1000))
+        const statusRes = await fetch(`/api/export/jobs/${job.id}`)
+        if (!statusRes.ok) {
+          throw new Error('내보내기 작업 상태를 확인할 수 없습니다')
+        }
+        job = await statusRes.json()
       }
 
-      // Blob으로 변환하여 다운로드
-      const blob = await response.blob()
-      const url = window.URL.createObjectURL(blob)
+      if (job.status !== 'done') {
+        throw new Error(job.error || 'CSV 다운로드 실패')
+      }
+
+      // 완성된 파일은 브라우저가 직접 받음 (메모리에 올리지 않고, 끊기면 Range로 이어받기)
       const a = document.createElement('a')
-      a.href = url
-      const filenamePrefix = isVibrationPanel ? 'vibration' : 'temperature'
-      a.download = `${filenamePrefix}_${startDate}_${startTime.replace(':', '')}_to_${endDate}_${endTime.replace(':', '')}.csv`
+      a.href = `/api/export/jobs/${job.id}/download`
+      const filenamePrefix = kind
+      const extension = EXPORT_FORMATS.find((format) => format.value === exportFormat)?.extension || '.csv'
+      a.download = `${filenamePrefix}_${startDate}_${startTime.replace(':', '')}_to_${endDate}_${endTime.replace(':', '')}${extension}`
       document.body.appendChild(a)
       a.click()
-      window.URL.revokeObjectURL(url)
       document.body.removeChild(a)
 
+      setDownloadProgress(null)
       setIsDownloading(false)
       onClose()
     } catch (error) {
       console.error('CSV 다운로드 오류:', error)
-      alert('CSV 다운로드 중 오류가 발생했습니다.')
+      alert(`CSV 다운로드 중 오류가 발생했습니다.\n${error.message}`)
+      setDownloadProgress(null)
       setIsDownloading(false)
     }
   }
@@ -317,6 +364,42 @@ const CsvDownloadModal = ({ isOpen, onClose, panelId }) => {
             </div>
           </div>
 
+          {/* 데이터 */}
+          <div className="csv-quick-select">
+            <label className="csv-section-label">데이터:</label>
+            <div className="csv-quick-buttons csv-data-buttons">
+              <button
+                className={`csv-quick-button ${!joinSensors ? 'active' : ''}`}
+                onClick={() => setJoinSensors(false)}
+              >
+                {panelId === 'panel7' ? '진동' : '온도'}
+              </button>
+              <button
+                className={`csv-quick-button ${joinSensors ? 'active' : ''}`}
+                onClick={() => setJoinSensors(true)}
+              >
+                온도+진동 (시간 정렬)
+              </button>
+            </div>
+          </div>
+
+          {/* 파일 형식 */}
+          <div className="csv-quick-select">
+            <label className="csv-section-label">파일 형식:</label>
+            <div className="csv-quick-buttons csv-format-buttons">
+              {EXPORT_FORMATS.map((format) => (
+                <button
+                  key={format.value}
+                  className={`csv-quick-button ${exportFormat === format.value ? 'active' : ''}`}
+                  onClick={() => setExportFormat(format.value)}
+                  disabled={!availableFormats.includes(format.value)}
+                >
+                  {format.label}
+                </button>
+              ))}
+            </div>
+          </div>
+
           {/* 선택된 범위 표시 */}
           <div className="csv-selected-range">
             <svg width="16" height="16" viewBox="0 0 16 16" fill="none" xmlns="http://www.w3.org/2000/svg">
@@ -340,7 +423,11 @@ const CsvDownloadModal = ({ isOpen, onClose, panelId }) => {
             onClick={handleDownload}
             disabled={isDownloading}
           >
-            {isDownloading ? '다운로드 중...' : '다운로드'}
+            {isDownloading
+              ? (downloadProgress && downloadProgress.rows > 0
+                ? `준비 중... ${downloadProgress.rows.toLocaleString()}행 (${(downloadProgress.bytes / 1048576).toFixed(1)} MB)`
+                : '준비 중...')
+              : '다운로드'}
           </button>
         </div>
       </div>
@@ -1,4 +1,30 @@
 import { useState, useEffect, useRef, useCallback } from 'react'
+import { fetchHistory } from '../utils/columnar'
+
+const RANGE_MS = { '1h': 3600000, '6h': 21600000, '24h': 86400000, '7d': 604800000 }
+const VIBRATION_FIELDS = ['v_rms', 'a_peak', 'a_rms', 'crest', 'temperature']
+
+// since 커서 증분 응답을 기존 히스토리에 병합 (since 이후 구간 + 열린 마지막 구간만 교체)
+const mergeHistory = (prev, data, fields, range) => {
+  if (!data.delta) {
+    const next = { timestamps: data.timestamps || [] }
+    fields.forEach(field => { next[field] = data[field] || [] })
+    return next
+  }
+  const prevTimestamps = prev.timestamps || []
+  let end = prevTimestamps.length
+  while (end > 0 && prevTimestamps[end - 1] >= data.since) end--
+  const timestamps = prevTimestamps.slice(0, end).concat(data.timestamps || [])
+  // 범위 밖으로 밀려난 앞쪽 구간 제거
+  const oldest = timestamps.length > 0 ? timestamps[timestamps.length - 1] - (RANGE_MS[range] || RANGE_MS['1h']) : 0
+  let start = 0
+  while (start < timestamps.length && timestamps[start] <= oldest) start++
+  const next = { timestamps: timestamps.slice(start) }
+  fields.forEach(field => {
+    next[field] = (prev[field] || []).slice(0, end).concat(data[field] || []).slice(start)
+  })
+  return next
+}
 
 export const useSensorData = (selectedRange) => {
   const [temperature, setTemperature] = useState(null)
@@ -16,6 +42,9 @@ export const useSensorData = (selectedRange) => {
   const selectedRangeRef = useRef(selectedRange)
   const vibrationTemperatureRef = useRef(null)
   const isFetchingRef = useRef(false)  // 요청 진행 중 플래그
+  // 마지막으로 받은 닫힌 구간 커서 (다음 폴링은 이 시각 이후만 요청)
+  const temperatureCursorRef = useRef(null)
+  const vibrationCursorRef = useRef(null)
 
   // InfluxDB에서 온도 히스토리 데이터 가져오기
   const fetchTemperatureHistory = useCallback(async (range) => {
@@ -40,24 +69,23 @@ export const useSensorData = (selectedRange) => {
     const requestRange = targetRange
     
     try {
-      const response = await fetch(`/api/influxdb/temperature?range=${requestRange}`, {
+      const cursor = temperatureCursorRef.current
+      const sinceParam = cursor !== null ? `&since=${cursor}` : ''
+      const { ok, data } = await fetchHistory(`/api/influxdb/temperature?range=${requestRange}${sinceParam}`, {
         signal: abortController.signal
       })
       
-      if (response.ok) {
-        const data = await response.json()
+      if (ok) {
         const currentRange = selectedRangeRef.current
         const isAborted = abortController.signal.aborted
         
         if (requestRange === currentRange && !isAborted) {
           if (data.timestamps && data.timestamps.length > 0) {
             if (selectedRangeRef.current === requestRange) {
-              setTemperatureHistory({
-                timestamps: data.timestamps || [],
-                values: data.values || []
-              })
+              setTemperatureHistory(prev => mergeHistory(prev, data, ['values'], requestRange))
             }
           }
+          temperatureCursorRef.current = data.cursor ?? null
         }
       }
     } catch (error) {
@@ -83,6 +111,7 @@ export const useSensorData = (selectedRange) => {
       abortControllerRef.current = null
     }
     isFetchingRef.current = false
+    temperatureCursorRef.current = null
     
     setTemperatureHistory({ timestamps: [], values: [] })
     setDataZoomRange({ start: 0, end: 100 })
@@ -112,21 +141,22 @@ export const useSensorData = (selectedRange) => {
     const targetRange = range || selectedRangeRef.current
     
     try {
-      const response = await fetch(`/api/influxdb/vibration?range=${targetRange}`)
-      if (response.ok) {
-        const data = await response.json()
-        if (data.timestamps && data.timestamps.length > 0) {
-          setVibrationHistory({
-            timestamps: data.timestamps || [],
-            v_rms: data.v_rms || [],
-            a_peak: data.a_peak || [],
-            a_rms: data.a_rms || [],
-            crest: data.crest || [],
-            temperature: data.temperature || []
-          })
+      const cursor = vibrationCursorRef.current
+      const sinceParam = cursor !== null ? `&since=${cursor}` : ''
+      const { ok, data } = await fetchHistory(`/api/influxdb/vibration?range=${targetRange}${sinceParam}`)
+      if (ok) {
+        // 요청 중 범위가 바뀌었으면 버림
+        if (targetRange !== selectedRangeRef.current) {
+          return
+        }
+        if (data.delta) {
+          setVibrationHistory(prev => mergeHistory(prev, data, VIBRATION_FIELDS, targetRange))
+        } else if (data.timestamps && data.timestamps.length > 0) {
+          setVibrationHistory(mergeHistory(null, data, VIBRATION_FIELDS, targetRange))
         } else {
           setVibrationHistory({ timestamps: [], v_rms: [], a_peak: [], a_rms: [], crest: [], temperature: [] })
         }
+        vibrationCursorRef.current = data.cursor ?? null
       }
     } catch (error) {
       console.error('진동센서 히스토리 데이터 가져오기 실패:', error)
@@ -135,6 +165,7 @@ export const useSensorData = (selectedRange) => {
 
   // selectedRange가 변경되면 진동센서 데이터도 로드
   useEffect(() => {
+    vibrationCursorRef.current = null
     setVibrationHistory({ timestamps: [], v_rms: [], a_peak: [], a_rms: [], crest: [], temperature: [] })
     fetchVibrationHistory(selectedRangeRef.current)
     
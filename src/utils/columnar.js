@@ -0,0 +1,52 @@
+// 히스토리 API 바이너리 컬럼 포맷 디코더 (backend/columnar.py)
+// 버퍼는 리틀엔디언, 8바이트 정렬이라 TypedArray로 바로 읽음 (브라우저는 모두 리틀엔디언)
+
+export const COLUMNAR_MIMETYPE = 'application/vnd.dashboard.columnar'
+
+const PREAMBLE_SIZE = 12
+
+export const decodeColumnar = (buffer) => {
+  const view = new DataView(buffer)
+  const magic = String.fromCharCode(...new Uint8Array(buffer, 0, 4))
+  if (magic !== 'TSCB') {
+    throw new Error('Not a columnar time-series payload')
+  }
+  const headerLength = view.getUint32(8, true)
+  const header = JSON.parse(new TextDecoder().decode(new Uint8Array(buffer, PREAMBLE_SIZE, headerLength)))
+  const base = PREAMBLE_SIZE + headerLength
+  const rows = header.rows
+
+  const { columns, ...meta } = header
+  const result = { ...meta, count: rows }
+  columns.forEach(column => {
+    const offset = base + column.offset
+    const values = column.type === 'int64'
+      ? Array.from(new BigInt64Array(buffer, offset, rows), Number)
+      : Array.from(new Float64Array(buffer, offset, rows))
+    // 유효성 비트가 0인 구간은 JSON 응답과 같이 null
+    if (column.validity !== null) {
+      const bits = new Uint8Array(buffer, base + column.validity, Math.ceil(rows / 8))
+      for (let i = 0; i < rows; i++) {
+        if (!(bits[i >> 3] & (1 << (i & 7)))) values[i] = null
+      }
+    }
+    result[column.name] = values
+  })
+  return result
+}
+
+// 바이너리 컬럼 포맷을 요청하고 서버가 JSON으로 답하면 그대로 사용
+export const fetchHistory = async (url, options = {}) => {
+  const response = await fetch(url, {
+    ...options,
+    headers: { ...(options.headers || {}), Accept: `${COLUMNAR_MIMETYPE}, application/json;q=0.9` }
+  })
+  if (!response.ok) {
+    return { ok: false, data: null }
+  }
+  const contentType = response.headers.get('Content-Type') || ''
+  const data = contentType.startsWith(COLUMNAR_MIMETYPE)
+    ? decodeColumnar(await response.arrayBuffer())
+    : await response.json()
+  return { ok: true, data }
+}